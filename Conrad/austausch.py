@@ -1,7 +1,68 @@
+import ast
 import json
+import os
 import random
 import matplotlib.pyplot as plt
 
+
+class AustauschBandit:
+    """
+    Lernt aus den Bewertungen, welche Zutat in welchem Geschmacksprofil ("Slot",
+    z.B. "süß") gut ankommt, und wählt Austausch-Zutaten per Thompson Sampling.
+
+    Pro (Slot, Zutat) werden nur zwei Zahlen gespeichert: Erfolge und Misserfolge
+    einer Beta-Verteilung. Eine Bewertung von 1 bis 5 Sternen zählt anteilig,
+    (Sterne - 1) / 4 als Erfolg und der Rest als Misserfolg. Ein Update kostet O(1).
+    """
+
+    def __init__(self, pfad='austausch_bandit.json'):
+        self.pfad = pfad
+        self.arme = {}  # Slot -> {Zutat: [Erfolge, Misserfolge]}
+
+    def aktualisiere(self, slot, zutat, anzahl, sterne_summe):
+        # anzahl Bewertungen mit zusammen sterne_summe Sternen (für das Nachspielen gebündelt)
+        erfolg = (sterne_summe - anzahl) / 4
+        arm = self.arme.setdefault(slot, {}).setdefault(zutat, [0.0, 0.0])
+        arm[0] += erfolg
+        arm[1] += anzahl - erfolg
+
+    def waehle(self, slot, kandidaten):
+        # Thompson Sampling: eine Stichprobe aus Beta(1 + Erfolge, 1 + Misserfolge) pro Kandidat
+        arme = self.arme.get(slot, {})
+        def stichprobe(zutat):
+            erfolge, misserfolge = arme.get(zutat, (0.0, 0.0))
+            return random.betavariate(1 + erfolge, 1 + misserfolge)
+        return max(kandidaten, key=stichprobe)
+
+    def nachspielen(self, rezepte_db, spirituosen_db):
+        """
+        Baut den Zustand aus den gespeicherten Bewertungen auf (ein Schritt pro
+        Cocktail, nicht pro Bewertung). Zutaten werden ihrem Slot aus der
+        Spirituosen-Datenbank zugeordnet.
+        """
+        slot_von = {zutat: slot for slot, zutat in spirituosen_db.items()}
+        for cocktail, bewertungen in rezepte_db.items():
+            for zutat, _ in ast.literal_eval(cocktail):
+                if zutat in slot_von:
+                    self.aktualisiere(slot_von[zutat], zutat, len(bewertungen), sum(bewertungen))
+
+    def speichern(self):
+        tmp_pfad = self.pfad + '.tmp'
+        with open(tmp_pfad, 'w', encoding='utf-8') as file:
+            json.dump(self.arme, file, ensure_ascii=False, separators=(',', ':'))
+        os.replace(tmp_pfad, self.pfad)
+
+    @classmethod
+    def laden(cls, pfad='austausch_bandit.json'):
+        # Rückgabe None, falls noch kein Zustand gespeichert wurde
+        if not os.path.exists(pfad):
+            return None
+        bandit = cls(pfad)
+        with open(pfad, 'r', encoding='utf-8') as file:
+            bandit.arme = json.load(file)
+        return bandit
+
+
 class CocktailGenerator:
     def __init__(self):
         self.rezepte_db = {}
@@ -12,6 +73,7 @@ class CocktailGenerator:
             "sauer": "Gin",
             "scharf": "Chili-Wodka"
         }
+        self.slots = {}  # Zutat -> Geschmacksprofil, für das sie im aktuellen Cocktail steht
         self.load_data()
 
     def load_data(self):
@@ -22,6 +84,19 @@ class CocktailGenerator:
         except FileNotFoundError:
             self.rezepte_db = {}
 
+        # Laufende Summen pro Cocktail: [Anzahl, Summe], werden bei jeder Bewertung aktualisiert
+        self.bewertungs_summen = {
+            cocktail: [len(bewertungen), sum(bewertungen)]
+            for cocktail, bewertungen in self.rezepte_db.items()
+        }
+
+        # Zustand des Austausch-Lerners laden oder einmalig aus den Bewertungen aufbauen
+        self.bandit = AustauschBandit.laden()
+        if self.bandit is None:
+            self.bandit = AustauschBandit()
+            self.bandit.nachspielen(self.rezepte_db, self.spirituosen_db)
+            self.bandit.speichern()
+
     def save_data(self):
         with open('cocktail_rezepte_db.json', 'w', encoding='utf-8') as file:
             json.dump(self.rezepte_db, file, indent=4, ensure_ascii=False)
@@ -71,6 +146,7 @@ class CocktailGenerator:
         }
 
         cocktail = {}
+        self.slots = {}
         total_volume = 200 - alkohol_volume  # Gesamtvolumen in ml
 
         for answer in selected_answers:
@@ -80,6 +156,7 @@ class CocktailGenerator:
                 if ingredient:
                     volume = total_volume // len(selected_answers)  # Gleichmäßige Verteilung
                     cocktail[ingredient] = volume
+                    self.slots[ingredient] = profile
 
         if alkohol_volume > 0:
             cocktail['Alkohol'] = alkohol_volume
@@ -87,23 +164,28 @@ class CocktailGenerator:
         return cocktail
 
     def sammle_feedback(self, cocktail):
-        print("Bitte bewerte den Cocktail mit Sternen (1 bis 5): ")
-        feedback = input("Deine Bewertung: ")
-        try:
-            feedback = int(feedback)
-            if feedback < 1 or feedback > 5:
-                print("Ungültige Bewertung! Es wird als 3 Sterne gewertet.")
+        while True:
+            print("Bitte bewerte den Cocktail mit Sternen (1 bis 5): ")
+            feedback = input("Deine Bewertung: ")
+            try:
+                feedback = int(feedback)
+                if feedback < 1 or feedback > 5:
+                    print("Ungültige Bewertung! Es wird als 3 Sterne gewertet.")
+                    feedback = 3
+            except ValueError:
+                print("Ungültige Eingabe! Es wird als 3 Sterne gewertet.")
                 feedback = 3
-        except ValueError:
-            print("Ungültige Eingabe! Es wird als 3 Sterne gewertet.")
-            feedback = 3
 
-        self.speichere_bewertung(cocktail, feedback)
-        if feedback < 3:  # Wenn die Bewertung schlecht ist, optimiere das Rezept
+            self.speichere_bewertung(cocktail, feedback)
+            if feedback >= 3:
+                print("Das Rezept bleibt unverändert.")
+                return
+            # Wenn die Bewertung schlecht ist, optimiere das Rezept
             print("Das Rezept wird aufgrund der schlechten Bewertung angepasst.")
             self.optimiere_rezept(cocktail)
-        else:
-            print("Das Rezept bleibt unverändert.")
+            # Die Bewertung des angepassten Rezepts fließt wieder in den Lerner ein
+            if input("Möchtest du das angepasste Rezept bewerten? (j/n): ").strip().lower() != "j":
+                return
 
     def speichere_bewertung(self, cocktail, feedback):
         cocktail_tuple = tuple(cocktail.items())
@@ -111,20 +193,37 @@ class CocktailGenerator:
             self.rezepte_db[str(cocktail_tuple)] = []
 
         self.rezepte_db[str(cocktail_tuple)].append(feedback)
+        summe = self.bewertungs_summen.setdefault(str(cocktail_tuple), [0, 0])
+        summe[0] += 1
+        summe[1] += feedback
         self.save_data()
 
+        slot_von = {zutat: slot for slot, zutat in self.spirituosen_db.items()}
+        for zutat in cocktail:
+            slot = self.slots.get(zutat, slot_von.get(zutat))
+            if slot is not None:
+                self.bandit.aktualisiere(slot, zutat, 1, feedback)
+        self.bandit.speichern()
+
     def optimiere_rezept(self, cocktail):
+        spirituosen = list(dict.fromkeys(self.spirituosen_db.values()))
+        slot_von = {zutat: slot for slot, zutat in self.spirituosen_db.items()}
         for ingredient in list(cocktail.keys()):  # Originalzutaten durchgehen
-            if ingredient in self.spirituosen_db.values():
-                # Wähle eine neue Zutat, die nicht die gleiche ist
-                new_ingredient = random.choice(list(self.spirituosen_db.values()))
-                while new_ingredient == ingredient:
-                    new_ingredient = random.choice(list(self.spirituosen_db.values()))
+            if ingredient in spirituosen:
+                # Neue Zutat, die nicht die gleiche ist und noch nicht im Cocktail steht,
+                # gewählt nach den bisherigen Bewertungen im selben Geschmacksprofil
+                kandidaten = [z for z in spirituosen if z != ingredient and z not in cocktail]
+                if not kandidaten:
+                    continue
+                slot = self.slots.pop(ingredient, slot_von[ingredient])
+                new_ingredient = self.bandit.waehle(slot, kandidaten)
 
                 print(f"Zutat {ingredient} wurde durch {new_ingredient} ersetzt.")
                 cocktail[new_ingredient] = cocktail.pop(ingredient)
+                self.slots[new_ingredient] = slot
 
         print(f"Optimiertes Rezept: {cocktail}")
+        return cocktail
 
     def analysiere_modifikationen(self):
         print("\nModifikationen der Rezepte:")
@@ -145,8 +244,8 @@ class CocktailGenerator:
 
     def auswertung(self):
         print("\nBewertung der Cocktails:")
-        for cocktail, bewertungen in self.rezepte_db.items():
-            average_feedback = sum(bewertungen) / len(bewertungen)
+        for cocktail, (anzahl, summe) in self.bewertungs_summen.items():
+            average_feedback = summe / anzahl
             print(f"Cocktail: {cocktail} - Durchschnittliche Bewertung: {average_feedback:.2f} Sterne")
 
 if __name__ == "__main__":
@@ -18,11 +18,20 @@
 
 
 
+import os
+import sys
+
 import tensorflow as tf
 from tensorflow.keras.layers import Input, Dense
 from tensorflow.keras.models import Model
+from tensorflow.keras.callbacks import EarlyStopping
+from tensorflow.keras.optimizers import Adam
 import numpy as np
 
+# Nächste-Nachbarn-Index aus code_final (taste_index.py)
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "code_final"))
+from taste_index import TasteIndex
+
 
 # Geschmacksprofile der Zutaten (süß, sauer, bitter, fruchtig, würzig) - Werte zwischen 0 und 1 (geschätzt) 
 
@@ -46,6 +55,7 @@ ingredients = {
 
 ingredient_names = list(ingredients.keys())
 ingredient_profiles = np.array(list(ingredients.values()))
+ingredient_index = TasteIndex(ingredient_profiles, ingredient_names)
 
 # Autoencoder-Architektur
 input_dim = ingredient_profiles.shape[1]
@@ -60,11 +70,19 @@ decoded = Dense(input_dim, activation='sigmoid')(encoded)
 # Autoencoder-Modell
 autoencoder = Model(inputs=input_layer, outputs=decoded)
 
-# Compile Modell
-autoencoder.compile(optimizer='adam', loss='mse')
+# Compile Modell (alle 15 Zutaten passen in einen Batch, daher höhere Lernrate)
+autoencoder.compile(optimizer=Adam(learning_rate=0.01), loss='mse')
 
 # Trainiere das Modell auf die Zutaten-Geschmacksprofile
-autoencoder.fit(ingredient_profiles, ingredient_profiles, epochs=1000, batch_size=4, verbose=0)
+# Höchstens 500 Epochen, Abbruch sobald sich der Loss 50 Epochen lang um weniger als 1e-4 verbessert
+history = autoencoder.fit(
+    ingredient_profiles, ingredient_profiles,
+    epochs=500, batch_size=len(ingredient_profiles), verbose=0,
+    callbacks=[EarlyStopping(monitor='loss', patience=50, min_delta=1e-4, restore_best_weights=True)],
+)
+# Loss der tatsächlich verwendeten Gewichte (min(history) kann zu anderen Gewichten gehören)
+final_loss = autoencoder.evaluate(ingredient_profiles, ingredient_profiles, batch_size=len(ingredient_profiles), verbose=0)
+print(f"Training nach {len(history.history['loss'])} Epochen beendet, Loss: {final_loss:.5f}")
 
 # Funktion zur Umwandlung einer Geschmacksanfrage in ein Profil
 def parse_taste_input(taste_input):
@@ -84,8 +102,8 @@ def parse_taste_input(taste_input):
 
 def generate_cocktail(user_profile):
     compressed_profile = autoencoder.predict(np.array([user_profile]))[0]
-    closest_idx = np.argmin(np.sum(np.square(ingredient_profiles - compressed_profile), axis=1))
-    return ingredient_names[closest_idx]
+    _, closest_idx = ingredient_index.query(compressed_profile, k=1)
+    return ingredient_names[closest_idx[0]]
 
 # Beispielablauf
 taste_input = input("Gib deinen gewünschten Geschmack ein (z.B. '0.4 süß, 0.8 sauer'): ")
@@ -0,0 +1,175 @@
+"""
+Vorberechnete Antworttabelle für den Fragebogen.
+
+Der Fragebogen besteht aus Q Fragen mit je zwei Antworten, dazu kommen die Wahl
+alkoholisch/nicht-alkoholisch und die Anzahl k Zutaten. Es gibt also nur
+endlich viele verschiedene Anfragen. 'materialize_answer_table' in
+cocktail_code.py berechnet alle Kombinationen vorab; ein Vorschlag ist danach
+ein Nachschlagen im dict (O(1)) statt Autoencoder + Mischung.
+
+Schlüssel: je Frage 2 Bit (0 = übersprungen, 1 = Option 1, 2 = Option 2),
+dahinter k (16 Bit, höchstens MAX_K) und alkoholisch, bit-gepackt in eine Ganzzahl.
+
+Gespeichert wird kompakt als .npz:
+  answers    shape=(N, Q) uint8      Antwortcodes
+  k          shape=(N,)   uint16
+  alcoholic  shape=(N,)   bool
+  profiles   shape=(N, 2, 5) float32 rekonstruierte Profile (alkoholisch oder
+                                     NaN, nicht-alkoholisch)
+  mix_index  shape=(N, K) int32      Index der Zutat in 'names' (-1 = leer)
+  mix_ml     shape=(N, K) float32    Menge in ml
+
+Anfragen, die nicht vorberechnet sind (z.B. übersprungene Fragen oder bei zu
+vielen Fragen zum Aufzählen), werden beim ersten Auftreten eingetragen und mit
+'save' gespeichert. Die Version (Daten, Modelle, Löser) wird mitgespeichert;
+passt sie nicht mehr, beginnt die Tabelle leer.
+"""
+
+import os
+
+import numpy as np
+
+from atomic_file import atomic_write
+
+
+ANSWER_TABLE_PATH = "code_final/answer_table.npz"
+MAX_K = 2 ** 16 - 1
+
+
+def answer_codes(answers):
+    """
+    Antworten ("1", "2", sonst übersprungen) als Codes 1, 2 bzw. 0.
+    """
+    return [1 if a == "1" else 2 if a == "2" else 0 for a in answers]
+
+
+def pack_key(codes, k, alcoholic):
+    if not 0 <= k <= MAX_K:
+        raise ValueError(f"k muss zwischen 0 und {MAX_K} liegen.")
+    key = 0
+    for code in reversed(codes):
+        key = (key << 2) | int(code)
+    return (key << 17) | (int(k) << 1) | int(bool(alcoholic))
+
+
+class AnswerTable:
+    def __init__(self, names, n_questions, version, n_features=5):
+        self.names = list(names)
+        self.n_questions = n_questions
+        self.version = version
+        self.size = 0
+        self.answers = np.zeros((0, n_questions), dtype=np.uint8)
+        self.k = np.zeros(0, dtype=np.uint16)
+        self.alcoholic = np.zeros(0, dtype=bool)
+        self.profiles = np.zeros((0, 2, n_features), dtype=np.float32)
+        self.mix_index = np.full((0, 0), -1, dtype=np.int32)
+        self.mix_ml = np.zeros((0, 0), dtype=np.float32)
+        self.dirty = False
+        self.hits = 0
+        self.misses = 0
+        self._rows = {}
+        self._name_index = {name: i for i, name in enumerate(self.names)}
+
+    def __len__(self):
+        return self.size
+
+    def __contains__(self, key):
+        return key in self._rows
+
+    def _reserve(self, rows, width):
+        # Kapazität verdoppeln statt bei jedem Eintrag neu anzulegen
+        capacity = len(self.k)
+        if rows > capacity:
+            capacity = max(rows, 2 * capacity, 64)
+        if capacity == len(self.k) and width <= self.mix_index.shape[1]:
+            return
+        width = max(width, self.mix_index.shape[1])
+
+        def grown(array, shape, fill):
+            new = np.full(shape, fill, dtype=array.dtype)
+            new[tuple(slice(0, n) for n in array.shape)] = array
+            return new
+
+        self.answers = grown(self.answers, (capacity, self.n_questions), 0)
+        self.k = grown(self.k, (capacity,), 0)
+        self.alcoholic = grown(self.alcoholic, (capacity,), False)
+        self.profiles = grown(self.profiles, (capacity,) + self.profiles.shape[1:], np.nan)
+        self.mix_index = grown(self.mix_index, (capacity, width), -1)
+        self.mix_ml = grown(self.mix_ml, (capacity, width), 0.0)
+
+    def get(self, codes, k, alcoholic):
+        """
+        Rückgabe: (Mischung {Zutat: ml}, rekonstruiertes Profil alkoholisch oder None,
+        rekonstruiertes Profil nicht-alkoholisch) oder None, falls nicht eingetragen.
+        """
+        row = self._rows.get(pack_key(codes, k, alcoholic))
+        if row is None:
+            self.misses += 1
+            return None
+        self.hits += 1
+        mix = {
+            self.names[i]: round(float(ml), 2)
+            for i, ml in zip(self.mix_index[row], self.mix_ml[row])
+            if i >= 0
+        }
+        reconstructed_alc, reconstructed_non_alc = self.profiles[row].astype(float)
+        if np.isnan(reconstructed_alc).all():
+            reconstructed_alc = None
+        return mix, reconstructed_alc, reconstructed_non_alc
+
+    def put(self, codes, k, alcoholic, mix, reconstructed_alc, reconstructed_non_alc):
+        key = pack_key(codes, k, alcoholic)
+        row = self._rows.get(key, self.size)
+        self._reserve(row + 1, len(mix))
+        self.answers[row] = codes
+        self.k[row] = k
+        self.alcoholic[row] = alcoholic
+        self.profiles[row, 0] = np.nan if reconstructed_alc is None else reconstructed_alc
+        self.profiles[row, 1] = reconstructed_non_alc
+        self.mix_index[row] = -1
+        self.mix_ml[row] = 0.0
+        self.mix_index[row, :len(mix)] = [self._name_index[name] for name in mix]
+        self.mix_ml[row, :len(mix)] = list(mix.values())
+        if row == self.size:
+            self._rows[key] = row
+            self.size += 1
+        self.dirty = True
+
+    def save(self, path=ANSWER_TABLE_PATH):
+        n = self.size
+        with atomic_write(path) as f:
+            np.savez(
+                f,
+                version=np.array(self.version),
+                names=np.array(self.names),
+                answers=self.answers[:n],
+                k=self.k[:n],
+                alcoholic=self.alcoholic[:n],
+                profiles=self.profiles[:n],
+                mix_index=self.mix_index[:n],
+                mix_ml=self.mix_ml[:n],
+            )
+        self.dirty = False
+
+    @classmethod
+    def load(cls, names, n_questions, version, path=ANSWER_TABLE_PATH):
+        """
+        Lädt die gespeicherte Tabelle. Fehlt sie oder passt die Version (bzw. der
+        Zutatenkatalog) nicht, wird eine leere Tabelle zurückgegeben.
+        """
+        table = cls(names, n_questions, version)
+        if not os.path.exists(path):
+            return table
+        with np.load(path) as f:
+            if str(f["version"]) != version or f["names"].tolist() != table.names or f["answers"].shape[1] != n_questions:
+                return table
+            table.answers = f["answers"]
+            table.k = f["k"]
+            table.alcoholic = f["alcoholic"]
+            table.profiles = f["profiles"]
+            table.mix_index = f["mix_index"]
+            table.mix_ml = f["mix_ml"]
+        table.size = len(table.k)
+        for row, (codes, k, alcoholic) in enumerate(zip(table.answers.tolist(), table.k.tolist(), table.alcoholic.tolist())):
+            table._rows[pack_key(codes, k, alcoholic)] = row
+        return table
@@ -0,0 +1,51 @@
+"""
+Atomares Schreiben von Dateien.
+
+Geschrieben wird in eine temporäre Datei neben dem Ziel, die erst nach dem
+vollständigen Schreiben per os.replace umbenannt wird. Andere Prozesse sehen
+daher immer entweder die alte oder die komplette neue Datei.
+"""
+
+import contextlib
+import os
+import stat
+import tempfile
+
+# umask einmal beim Import lesen (os.umask gilt für den ganzen Prozess und
+# sollte nicht zur Laufzeit neben anderen Threads umgestellt werden)
+_UMASK = os.umask(0)
+os.umask(_UMASK)
+
+
+def _file_mode(path):
+    # Rechte der bisherigen Datei übernehmen, sonst wie open() (0666 abzüglich umask);
+    # mkstemp selbst legt die Datei nur für den Besitzer lesbar an (0600)
+    try:
+        return stat.S_IMODE(os.stat(path).st_mode)
+    except FileNotFoundError:
+        return 0o666 & ~_UMASK
+
+
+@contextlib.contextmanager
+def atomic_write(path, mode="wb", fsync=False):
+    """
+    Wie open(path, mode), aber atomar. Text (mode="w") wird als UTF-8 geschrieben.
+    Die temporäre Datei bekommt einen eindeutigen Namen (tempfile.mkstemp), damit
+    sich gleichzeitige Schreiber nicht gegenseitig stören.
+    Mit fsync=True liegen die Daten vor dem Umbenennen sicher auf der Festplatte.
+    Bei einem Fehler bleibt die alte Datei erhalten und die temporäre wird gelöscht.
+    """
+    directory, filename = os.path.split(os.path.abspath(path))
+    fd, tmp_path = tempfile.mkstemp(prefix=filename + ".", suffix=".tmp", dir=directory)
+    try:
+        with open(fd, mode, encoding=None if "b" in mode else "utf-8") as f:
+            yield f
+            if fsync:
+                f.flush()
+                os.fsync(f.fileno())
+        os.chmod(tmp_path, _file_mode(path))
+        os.replace(tmp_path, path)
+    except BaseException:
+        with contextlib.suppress(FileNotFoundError):
+            os.remove(tmp_path)
+        raise
@@ -0,0 +1,73 @@
+"""
+Benchmark der Mischungs-Löser aus 'mix_solver.py'.
+
+Misst die Lösungszeit und das mittlere Residuum der Mischung für synthetische
+Zutatenkataloge wachsender Größe (85 bis einige tausend Zutaten) und verschiedene k.
+Die Beam Search ("beam") liefert dabei jeweils '--top' unterschiedliche Mischungen.
+
+Aufruf (aus dem Projektordner):
+    python code_final/benchmark_mix_solver.py
+    python code_final/benchmark_mix_solver.py --sizes 85 1000 --ks 3 5 --repeats 20
+"""
+
+import argparse
+import time
+
+import numpy as np
+
+from mix_solver import PinvSolver, beam_search_mixes, mix_residual, solve_mix_weights
+
+
+def lstsq_top_k(solver, target, k):
+    # Ursprüngliches Verfahren: lstsq, Clipping, Normalisieren, Top k
+    w = np.maximum(solver.solve(target), 0)
+    if w.sum() == 0:
+        w = np.ones_like(w)
+    if k < len(w):
+        w[np.argsort(-w)[k:]] = 0
+    if w.sum() == 0:
+        w[:k] = 1.0
+    return w / w.sum()
+
+
+def run_benchmark(sizes, ks, modes, repeats, top=5, seed=0):
+    rng = np.random.default_rng(seed)
+    results = []
+    for size in sizes:
+        ingredient_profiles = rng.random((size, 5))
+        targets = rng.random((repeats, 5)) * 0.8 + 0.1
+        solver = PinvSolver(ingredient_profiles)
+        for k in ks:
+            for mode in modes:
+                # "pool" wächst kombinatorisch mit k, für große k nur mit kleinen Katalogen
+                if mode == "pool" and k > 4 and size > 1000:
+                    continue
+                residuals = []
+                start = time.perf_counter()
+                for target in targets:
+                    if mode == "lstsq":
+                        w = lstsq_top_k(solver, target, k)
+                        residuals.append(mix_residual(w, ingredient_profiles, target))
+                    elif mode == "beam":
+                        residuals.append(beam_search_mixes(ingredient_profiles, target, k, n_results=top)[0][2])
+                    else:
+                        _, residual = solve_mix_weights(ingredient_profiles, target, k, mode=mode)
+                        residuals.append(residual)
+                elapsed = (time.perf_counter() - start) / repeats
+                results.append((size, k, mode, elapsed * 1000, float(np.mean(residuals))))
+    return results
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Benchmark der Mischungs-Löser")
+    parser.add_argument("--sizes", type=int, nargs="+", default=[85, 500, 2000, 5000])
+    parser.add_argument("--ks", type=int, nargs="+", default=[2, 3, 5, 8])
+    parser.add_argument("--modes", nargs="+", default=["lstsq", "nnls", "greedy", "pool", "beam"],
+                        help="'pool' ist eine Heuristik (Branch and Bound nur über einen Kandidatenpool)")
+    parser.add_argument("--repeats", type=int, default=10)
+    parser.add_argument("--top", type=int, default=5, help="Anzahl Mischungen der Beam Search")
+    args = parser.parse_args()
+
+    print(f"{'Zutaten':>8} {'k':>3} {'Modus':>7} {'ms/Lösung':>10} {'Residuum':>9}")
+    for size, k, mode, ms, residual in run_benchmark(args.sizes, args.ks, args.modes, args.repeats, args.top):
+        print(f"{size:>8} {k:>3} {mode:>7} {ms:>10.3f} {residual:>9.4f}")
@@ -0,0 +1,196 @@
+"""
+End-to-End-Benchmark der Vorschlags-Pipeline.
+
+Für synthetische Kataloge wachsender Größe (Fragen aus der echten JSON-Datei,
+zufällige Zutaten, ca. 30% alkoholisch) und zufällige Nutzerprofile werden die
+einzelnen Stufen gemessen:
+  load      load_cocktail_data (JSON parsen)
+  catalog   Katalog kompilieren + Zutatengruppen vorbereiten
+  train     Encoder einsatzbereit machen (Keras-Training oder PCA, ohne Cache)
+  predict   ein 'predict' pro Nutzer bzw. eines für alle Nutzer
+  mix       create_mix_profile pro Nutzer bzw. create_mix_profiles für alle
+  rating    save_rating-Äquivalent (append_rating in einen temporären Log)
+  e2e       recommend_batch für alle Nutzer (Vorschläge pro Sekunde)
+
+Zu jeder Stufe werden Laufzeit und Spitzen-Speicher (tracemalloc) erfasst, ohne
+die Stufe dafür zusätzlich auszuführen (siehe '_measure'). Trainierte Autoencoder
+landen in einem temporären Cache-Ordner, nicht in 'code_final/model_cache'.
+Mit --output werden die Ergebnisse als JSON gespeichert (inkl. Commit-Hash), um
+Commits miteinander zu vergleichen.
+
+Aufruf (aus dem Projektordner):
+    python code_final/benchmark_pipeline.py
+    python code_final/benchmark_pipeline.py --sizes 85 1000 10000 --users 1000 --ks 3 5 --output bench.json
+"""
+
+import argparse
+import json
+import os
+import subprocess
+import tempfile
+import time
+import tracemalloc
+from datetime import datetime
+
+import numpy as np
+
+import cocktail_code
+from catalog_compiler import load_catalog
+from cocktail_code import (
+    DATA_PATH,
+    create_mix_profile,
+    create_mix_profiles,
+    get_autoencoders,
+    load_cocktail_data,
+    load_ingredient_groups,
+    profile_from_answers,
+    recommend_batch,
+    train_numpy_autoencoder,
+)
+from model_cache import ModelCache
+from projection_engine import PCAProjection
+from ratings_store import append_rating
+
+
+def synthetic_catalog(n_ingredients, questions, rng):
+    ingredients = {
+        f"Zutat {i}": {
+            "taste": [round(float(x), 3) for x in rng.random(5)],
+            "alcoholic": bool(rng.random() < 0.3),
+        }
+        for i in range(n_ingredients)
+    }
+    return {"ingredients": ingredients, "questions": questions}
+
+
+def _traced(fn):
+    tracemalloc.start()
+    try:
+        start = time.perf_counter()
+        result = fn()
+        seconds = time.perf_counter() - start
+        return result, seconds, tracemalloc.get_traced_memory()[1]
+    finally:
+        tracemalloc.stop()
+
+
+def _measure(fn, repeats=1):
+    # fn läuft insgesamt 'repeats' Mal, bei mehreren Wiederholungen einmal mehr:
+    # Der erste (kalte) Durchlauf zählt nicht zur Laufzeit und liefert den
+    # Spitzen-Speicher. Mit repeats=1 (z.B. Training) werden Laufzeit und Speicher
+    # im selben Durchlauf gemessen, die Laufzeit enthält dann den Aufwand von
+    # tracemalloc ("traced": true).
+    result, seconds, peak = _traced(fn)
+    if repeats == 1:
+        return result, {"ms": seconds * 1000, "peak_kb": peak / 1024, "traced": True}
+    start = time.perf_counter()
+    for _ in range(repeats):
+        result = fn()
+    seconds = (time.perf_counter() - start) / repeats
+    return result, {"ms": seconds * 1000, "peak_kb": peak / 1024, "traced": False}
+
+
+def _git_commit():
+    try:
+        return subprocess.run(["git", "rev-parse", "--short", "HEAD"], capture_output=True, text=True).stdout.strip()
+    except OSError:
+        return None
+
+
+def benchmark_size(n_ingredients, questions, n_users, ks, encoder, workdir, rng):
+    json_path = os.path.join(workdir, f"catalog_{n_ingredients}.json")
+    with open(json_path, "w", encoding="utf-8") as f:
+        json.dump(synthetic_catalog(n_ingredients, questions, rng), f, ensure_ascii=False)
+    catalog_path = os.path.join(workdir, f"catalog_{n_ingredients}.bin")
+    stages = {}
+
+    data, stages["load"] = _measure(lambda: load_cocktail_data(json_path))
+    groups, stages["catalog"] = _measure(lambda: load_ingredient_groups(data, load_catalog(json_path, catalog_path)))
+    names, profiles, solver = groups[False]
+
+    if encoder == "autoencoder":
+        model, stages["train"] = _measure(lambda: train_numpy_autoencoder(profiles))
+    else:
+        model, stages["train"] = _measure(lambda: PCAProjection.fit(profiles, sigmoid=encoder == "pca_sigmoid"), repeats=10)
+
+    answers = rng.choice(["1", "2"], size=(n_users, len(questions)))
+    users = np.array([profile_from_answers(questions, row) for row in answers])
+    _, stages["predict_single"] = _measure(lambda: [model.predict(u[None, :]) for u in users], repeats=5)
+    reconstructed, stages["predict_batch"] = _measure(lambda: model.predict(users), repeats=5)
+    for stage in ("predict_single", "predict_batch"):
+        stages[stage]["us_per_user"] = stages[stage]["ms"] * 1000 / n_users
+
+    log_path = os.path.join(workdir, f"ratings_{n_ingredients}.jsonl")
+    entry = {
+        "timestamp": datetime.now().isoformat(timespec="seconds"),
+        "user_profile": users[0].tolist(),
+        "cocktail_mix": {names[0]: 200.0},
+        "rating": 4,
+    }
+    _, stages["rating"] = _measure(lambda: append_rating(entry, log_path=log_path, legacy_path=log_path + ".none"), repeats=50)
+
+    # Encoder für recommend_batch vorab in den (temporären) Cache, damit kein
+    # gemessener Durchlauf trainiert
+    get_autoencoders([p for n, p, _ in groups.values() if n], encoder=encoder)
+
+    per_k = {}
+    for k in ks:
+        k = min(k, len(names))
+        result = {}
+        _, result["mix_single"] = _measure(
+            lambda: [create_mix_profile(r, profiles, names, k, solver=solver) for r in reconstructed], repeats=5)
+        _, result["mix_batch"] = _measure(lambda: create_mix_profiles(reconstructed, profiles, names, k, solver=solver), repeats=5)
+        _, result["e2e"] = _measure(
+            lambda: recommend_batch(data, users, k, rng.random(n_users) < 0.5, groups=groups), repeats=5)
+        for stage in result.values():
+            stage["suggestions_per_s"] = n_users / (stage["ms"] / 1000)
+        per_k[str(k)] = result
+    return {"ingredients": n_ingredients, "users": n_users, "stages": stages, "per_k": per_k}
+
+
+def run_benchmark(sizes, n_users, ks, encoder="pca", seed=0):
+    rng = np.random.default_rng(seed)
+    questions = load_cocktail_data(DATA_PATH)["questions"]
+    model_cache = cocktail_code.MODEL_CACHE
+    with tempfile.TemporaryDirectory() as workdir:
+        # Autoencoder der synthetischen Kataloge nicht in code_final/model_cache speichern
+        cocktail_code.MODEL_CACHE = ModelCache(os.path.join(workdir, "model_cache"), DATA_PATH)
+        try:
+            results = [benchmark_size(size, questions, n_users, ks, encoder, workdir, rng) for size in sizes]
+        finally:
+            cocktail_code.MODEL_CACHE = model_cache
+    return {
+        "commit": _git_commit(),
+        "timestamp": datetime.now().isoformat(timespec="seconds"),
+        "encoder": encoder,
+        "results": results,
+    }
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="End-to-End-Benchmark der Vorschlags-Pipeline")
+    parser.add_argument("--sizes", type=int, nargs="+", default=[85, 1000, 10000])
+    parser.add_argument("--users", type=int, default=500)
+    parser.add_argument("--ks", type=int, nargs="+", default=[3, 5])
+    parser.add_argument("--encoder", default="pca", choices=["autoencoder", "pca", "pca_sigmoid"],
+                        help="'autoencoder' trainiert mit Keras (benötigt TensorFlow)")
+    parser.add_argument("--output", help="Ergebnisse zusätzlich als JSON speichern")
+    args = parser.parse_args()
+
+    # recommend_batch (e2e) holt den Encoder über get_autoencoder, dort soll
+    # dasselbe Verfahren wie in der Stufe 'train' verwendet werden
+    cocktail_code.ENCODER = args.encoder
+
+    report = run_benchmark(args.sizes, args.users, args.ks, args.encoder)
+    for result in report["results"]:
+        print(f"\n{result['ingredients']} Zutaten, {result['users']} Nutzer")
+        for stage, m in result["stages"].items():
+            print(f"  {stage:<16} {m['ms']:>10.3f} ms{'*' if m['traced'] else ' '} {m['peak_kb']:>10.1f} KiB")
+        for k, stages in result["per_k"].items():
+            for stage, m in stages.items():
+                print(f"  {stage + ' k=' + k:<16} {m['ms']:>10.3f} ms  {m['peak_kb']:>10.1f} KiB {m['suggestions_per_s']:>10.0f} Vorschläge/s")
+    print("\n* einmaliger Durchlauf mit tracemalloc, die Laufzeit enthält dessen Aufwand")
+    if args.output:
+        with open(args.output, "w", encoding="utf-8") as f:
+            json.dump(report, f, indent=2)
+        print(f"\nErgebnisse gespeichert in {args.output}")
@@ -0,0 +1,64 @@
+"""
+Benchmark des Geschmacks-Index aus 'taste_index.py'.
+
+Misst für synthetische Kataloge (100, 10.000 und 1.000.000 Zutaten) die Bauzeit
+des Index sowie die Latenz von k-NN-Abfragen (einzeln und als Batch) für den
+KD-Baum und die vektorisierte Brute-Force-Suche.
+
+Aufruf (aus dem Projektordner):
+    python code_final/benchmark_taste_index.py
+    python code_final/benchmark_taste_index.py --sizes 100 10000 --queries 500
+"""
+
+import argparse
+import time
+
+import numpy as np
+
+from taste_index import TasteIndex
+
+
+def _per_query_us(fn, queries):
+    start = time.perf_counter()
+    for q in queries:
+        fn(q)
+    return (time.perf_counter() - start) / len(queries) * 1e6
+
+
+def run_benchmark(sizes, n_queries, k, seed=0):
+    rng = np.random.default_rng(seed)
+    results = []
+    for size in sizes:
+        profiles = rng.random((size, 5))
+        alcoholic = rng.random(size) < 0.4
+        queries = rng.random((n_queries, 5))
+
+        for variant, brute_force_below in (("baum", 0), ("brute", size + 1)):
+            # Sehr kleine Kataloge haben keinen sinnvollen Baum
+            if variant == "baum" and size < 2:
+                continue
+            index = TasteIndex(profiles, alcoholic=alcoholic, brute_force_below=brute_force_below)
+            start = time.perf_counter()
+            index.query(queries[0], k)
+            index.query(queries[0], k, alcoholic=True)
+            build_ms = (time.perf_counter() - start) * 1000
+
+            single_us = _per_query_us(lambda q: index.query(q, k), queries)
+            filtered_us = _per_query_us(lambda q: index.query(q, k, alcoholic=True), queries)
+            start = time.perf_counter()
+            index.query(queries, k)
+            batch_us = (time.perf_counter() - start) / n_queries * 1e6
+            results.append((size, variant, build_ms, single_us, filtered_us, batch_us))
+    return results
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Benchmark des Geschmacks-Index")
+    parser.add_argument("--sizes", type=int, nargs="+", default=[100, 10_000, 1_000_000])
+    parser.add_argument("--queries", type=int, default=200)
+    parser.add_argument("--k", type=int, default=5)
+    args = parser.parse_args()
+
+    print(f"{'Zutaten':>9} {'Variante':>8} {'Aufbau ms':>10} {'us/Abfrage':>11} {'gefiltert':>10} {'Batch us':>9}")
+    for size, variant, build_ms, single_us, filtered_us, batch_us in run_benchmark(args.sizes, args.queries, args.k):
+        print(f"{size:>9} {variant:>8} {build_ms:>10.1f} {single_us:>11.1f} {filtered_us:>10.1f} {batch_us:>9.1f}")
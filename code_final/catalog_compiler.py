@@ -0,0 +1,167 @@
+"""
+Kompilierter Zutatenkatalog als binäre, spaltenorientierte Datei.
+
+Die JSON-Datei 'cocktail_data_quest.json' bleibt die Quelle. Aus ihr wird
+'cocktail_catalog.bin' erzeugt, die per Memory-Mapping geladen wird. Mehrere
+Worker-Prozesse teilen sich dieselben Seiten im Page-Cache, ohne die Daten zu
+kopieren oder das JSON erneut zu parsen.
+
+Aufbau der Datei (alle Abschnitte auf 64 Byte ausgerichtet):
+  Header     Magic, Anzahl Zutaten/Merkmale/Alkoholische, Abschnitts-Offsets,
+             Größe + Änderungszeit + SHA-256 der Quelldatei
+  taste      float32 (M, F)  - Zeilen sortiert: erst alkoholisch, dann nicht-alkoholisch
+                               (innerhalb der Gruppen in JSON-Reihenfolge)
+  alcoholic  uint8 (M)       - Flag pro Zeile
+  source_idx int32 (M)       - Position der Zeile in der JSON-Datei
+  name_offs  uint32 (M + 1)  - Start/Ende jedes Namens im Namensblock
+  names      UTF-8           - alle Namen hintereinander
+
+Durch die Sortierung sind die Profile jeder Gruppe ein zusammenhängender
+Ausschnitt der Matrix (Views ohne Kopie).
+
+Aufruf (aus dem Projektordner):
+    python code_final/catalog_compiler.py    # Katalog (neu) erzeugen
+"""
+
+import json
+import os
+import struct
+
+import numpy as np
+
+from atomic_file import atomic_write
+from model_cache import file_fingerprint
+
+
+CATALOG_PATH = "code_final/cocktail_catalog.bin"
+
+_MAGIC = b"CKTCAT01"
+# magic, M, F, n_alc, 5 Offsets, Länge Namensblock, Quellgröße, Quell-mtime_ns, SHA-256
+_HEADER = struct.Struct("<8sIII5QQQQ32s")
+_ALIGN = 64
+
+
+def _align(offset):
+    return (offset + _ALIGN - 1) // _ALIGN * _ALIGN
+
+
+def _source_info(json_path):
+    st = os.stat(json_path)
+    return st.st_size, st.st_mtime_ns
+
+
+def _sha256(path):
+    return bytes.fromhex(file_fingerprint(path))
+
+
+def compile_catalog(json_path, catalog_path=CATALOG_PATH):
+    """
+    Erzeugt die Binärdatei aus der JSON-Datei (atomar über eine temporäre Datei,
+    damit laufende Prozesse ihre alte Abbildung weiter nutzen können).
+    """
+    with open(json_path, "r", encoding="utf-8") as f:
+        ingredients = json.load(f)["ingredients"]
+
+    names = list(ingredients)
+    alcoholic = np.array([ingredients[n]["alcoholic"] for n in names], dtype=bool)
+    # Stabile Sortierung: alkoholische Zutaten zuerst, Reihenfolge innerhalb erhalten
+    order = np.concatenate([np.flatnonzero(alcoholic), np.flatnonzero(~alcoholic)]).astype(np.int32)
+    taste = np.array([ingredients[names[i]]["taste"] for i in order], dtype=np.float32).reshape(len(names), -1)
+    encoded = [names[i].encode("utf-8") for i in order]
+    name_offsets = np.zeros(len(names) + 1, dtype=np.uint32)
+    name_offsets[1:] = np.cumsum([len(e) for e in encoded])
+    blob = b"".join(encoded)
+
+    sections = [taste.tobytes(), alcoholic[order].astype(np.uint8).tobytes(), order.tobytes(), name_offsets.tobytes(), blob]
+    offsets = []
+    position = _align(_HEADER.size)
+    for section in sections:
+        offsets.append(position)
+        position = _align(position + len(section))
+
+    size, mtime_ns = _source_info(json_path)
+    header = _HEADER.pack(
+        _MAGIC, len(names), taste.shape[1], int(alcoholic.sum()),
+        *offsets, len(blob), size, mtime_ns, _sha256(json_path),
+    )
+
+    with atomic_write(catalog_path) as f:
+        f.write(header)
+        for offset, section in zip(offsets, sections):
+            f.write(b"\0" * (offset - f.tell()))
+            f.write(section)
+
+
+class CompiledCatalog:
+    """
+    Schreibgeschützte, per Memory-Mapping geladene Sicht auf den kompilierten Katalog.
+    """
+
+    def __init__(self, catalog_path=CATALOG_PATH):
+        self.path = catalog_path
+        self._buffer = np.memmap(catalog_path, dtype=np.uint8, mode="r")
+        (magic, self.n_ingredients, self.n_features, self.n_alcoholic,
+         taste_off, alc_off, src_off, name_off, blob_off, blob_len,
+         self.source_size, self.source_mtime_ns, self.source_sha256) = _HEADER.unpack_from(self._buffer, 0)
+        if magic != _MAGIC:
+            raise ValueError(f"{catalog_path} ist kein kompilierter Cocktail-Katalog.")
+
+        m = self.n_ingredients
+        self.taste = np.ndarray((m, self.n_features), dtype=np.float32, buffer=self._buffer, offset=taste_off)
+        self.alcoholic = np.ndarray((m,), dtype=np.bool_, buffer=self._buffer, offset=alc_off)
+        self.source_index = np.ndarray((m,), dtype=np.int32, buffer=self._buffer, offset=src_off)
+        self._name_offsets = np.ndarray((m + 1,), dtype=np.uint32, buffer=self._buffer, offset=name_off)
+        self._names_blob = self._buffer[blob_off:blob_off + blob_len]
+        self._names = None
+
+        # Vorberechnete Gruppen-Views (Zeilenbereiche der sortierten Matrix)
+        self.alcoholic_slice = slice(0, self.n_alcoholic)
+        self.non_alcoholic_slice = slice(self.n_alcoholic, m)
+
+    def name(self, i):
+        start, end = self._name_offsets[i], self._name_offsets[i + 1]
+        return bytes(self._names_blob[start:end]).decode("utf-8")
+
+    @property
+    def names(self):
+        if self._names is None:
+            self._names = [self.name(i) for i in range(self.n_ingredients)]
+        return self._names
+
+    def group(self, alcoholic):
+        """
+        (Namen, Profile) einer Gruppe. Die Profile sind eine View auf die Datei (float32).
+        """
+        rows = self.alcoholic_slice if alcoholic else self.non_alcoholic_slice
+        return self.names[rows], self.taste[rows]
+
+    def is_current(self, json_path):
+        """
+        Prüft, ob der Katalog zur JSON-Datei passt (schnell über Größe/Änderungszeit,
+        bei Abweichung über den SHA-256 Hash).
+        """
+        if _source_info(json_path) == (self.source_size, self.source_mtime_ns):
+            return True
+        return _sha256(json_path) == self.source_sha256
+
+
+def load_catalog(json_path, catalog_path=CATALOG_PATH):
+    """
+    Lädt den kompilierten Katalog und erzeugt ihn neu, falls er fehlt, defekt
+    ist oder nicht mehr zur JSON-Datei passt.
+    """
+    if os.path.exists(catalog_path):
+        try:
+            catalog = CompiledCatalog(catalog_path)
+            if catalog.is_current(json_path):
+                return catalog
+        except (ValueError, struct.error):
+            pass
+    compile_catalog(json_path, catalog_path)
+    return CompiledCatalog(catalog_path)
+
+
+if __name__ == "__main__":
+    compile_catalog("code_final/cocktail_data_quest.json")
+    catalog = CompiledCatalog()
+    print(f"{catalog.n_ingredients} Zutaten ({catalog.n_alcoholic} alkoholisch) nach {CATALOG_PATH} kompiliert.")
@@ -0,0 +1,113 @@
+"""
+Erweitern des Zutatenkatalogs 'cocktail_data_quest.json' um neue Zutaten.
+
+Neue Zutaten werden geprüft (Name noch nicht vorhanden, 5 Geschmackswerte
+zwischen 0 und 1, 'alcoholic' als Wahrheitswert) und an die JSON-Datei angehängt.
+Die JSON-Datei ist von Hand formatiert; die neuen Einträge werden daher im selben
+Format als Text hinter der letzten Zutat eingefügt, der Rest der Datei bleibt
+unverändert. Die Datei wird atomar ersetzt, damit parallel laufende Prozesse nie
+eine halb geschriebene Datei lesen.
+
+Das Aktualisieren von Zutatengruppen, Katalog und Autoencodern übernimmt
+'extend_catalog' in cocktail_code.py.
+"""
+
+import json
+import re
+
+from atomic_file import atomic_write
+
+
+_INGREDIENTS_START = re.compile(r'(?<!\\)"ingredients"\s*:\s*\{')
+
+
+def validate_ingredient(name, info, existing, n_features=5):
+    """
+    Prüft eine neue Zutat und gibt sie normalisiert zurück:
+    {"taste": [float, ...], "alcoholic": bool}. Wirft ValueError bei Fehlern.
+    """
+    name = name.strip()
+    if not name:
+        raise ValueError("Der Name der Zutat darf nicht leer sein.")
+    if name in existing:
+        raise ValueError(f"Die Zutat '{name}' ist bereits vorhanden.")
+    taste = [float(x) for x in info["taste"]]
+    if len(taste) != n_features:
+        raise ValueError(f"'{name}': Es werden genau {n_features} Geschmackswerte benötigt.")
+    # So formuliert, dass auch NaN abgelehnt wird
+    if not all(0.0 <= x <= 1.0 for x in taste):
+        raise ValueError(f"'{name}': Geschmackswerte müssen zwischen 0 und 1 liegen.")
+    if not isinstance(info["alcoholic"], bool):
+        raise ValueError(f"'{name}': 'alcoholic' muss true oder false sein.")
+    return {"taste": taste, "alcoholic": info["alcoholic"]}
+
+
+def _closing_brace(text, start):
+    # Index der schließenden Klammer zum Objekt, das bei text[start] == "{" beginnt
+    depth = 0
+    in_string = escaped = False
+    for i in range(start, len(text)):
+        c = text[i]
+        if in_string:
+            if escaped:
+                escaped = False
+            elif c == "\\":
+                escaped = True
+            elif c == '"':
+                in_string = False
+        elif c == '"':
+            in_string = True
+        elif c in "{[":
+            depth += 1
+        elif c in "}]":
+            depth -= 1
+            if depth == 0:
+                return i
+    raise ValueError("Die JSON-Datei ist unvollständig.")
+
+
+def _format_ingredient(name, info):
+    # Gleiches Format wie die vorhandenen Einträge (Geschmackswerte in einer Zeile)
+    return (f'        {json.dumps(name, ensure_ascii=False)}: {{\n'
+            f'          "taste": {json.dumps(info["taste"])},\n'
+            f'          "alcoholic": {json.dumps(info["alcoholic"])}\n'
+            f'        }}')
+
+
+def _append_ingredients(text, new_ingredients):
+    """
+    Fügt die Einträge als Text am Ende des Objekts "ingredients" ein.
+    Rückgabe: neuer Text oder None, falls das Objekt nicht gefunden wurde.
+    """
+    match = _INGREDIENTS_START.search(text)
+    if match is None:
+        return None
+    end = _closing_brace(text, match.end() - 1)
+    last = len(text[:end].rstrip())
+    separator = "\n" if text[last - 1] == "{" else ",\n"
+    entries = ",\n".join(_format_ingredient(name, info) for name, info in new_ingredients.items())
+    return text[:last] + separator + entries + text[last:]
+
+
+def add_ingredients(data, new_ingredients, json_path):
+    """
+    Fügt neue Zutaten ({Name: {"taste": [...], "alcoholic": bool}}) zu 'data' hinzu
+    und hängt sie an die JSON-Datei an. Rückgabe: die geprüften Zutaten.
+    """
+    n_features = len(data.get("taste_labels", [None] * 5))
+    checked = {}
+    for name, info in new_ingredients.items():
+        checked[name.strip()] = validate_ingredient(name, info, {**data["ingredients"], **checked}, n_features)
+
+    updated = {**data, "ingredients": {**data["ingredients"], **checked}}
+    with open(json_path, "r", encoding="utf-8") as f:
+        text = _append_ingredients(f.read(), checked)
+    # Nur wenn das Ergebnis genau den neuen Daten entspricht, sonst die Datei komplett neu schreiben
+    with atomic_write(json_path, "w") as f:
+        if text is not None and json.loads(text) == updated:
+            f.write(text)
+        else:
+            json.dump(updated, f, ensure_ascii=False, indent=4)
+    # Erst nach erfolgreichem Schreiben, damit 'data' bei einem Fehler zur Datei passt
+    data["ingredients"].update(checked)
+    return checked
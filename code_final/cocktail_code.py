@@ -14,8 +14,11 @@ Die Daten können beliebig erweitert werden, um die Auswahl an Zutaten und Gesch
 
 Wenn alkoholisch gewählt wird, wird festgelegt, dass 30% des Getränkes aus alkoholhaltigen Zutaten bestehen.
 
-Die Implemntierung von Supervides Learning ist noch in Überlegung 
-Die Implementierung von Supervised Learning ist noch in Überlegung 
+Abgegebene Bewertungen werden für Supervised Learning genutzt: Ein Bewertungsmodell
+(rating_model.py, offline mit 'python code_final/rating_model.py train' trainiert)
+sagt aus Nutzerprofil und Mischung die zu erwartende Bewertung voraus. Ist es
+vorhanden, werden mehrere Varianten der Mischung erzeugt und die mit der besten
+vorhergesagten Bewertung vorgeschlagen.
 
 Author: Florian, Conrad
 Date: 29.01.2025
@@ -25,32 +28,105 @@ Date: 29.01.2025
 
 
 
+import time
+
+_START_TIME = time.perf_counter()
+
+import atexit
+import importlib
+import itertools
 import json
+import logging
+import multiprocessing
 import os
+import subprocess
+import sys
 import numpy as np
-import tensorflow as tf
-from tensorflow.keras.layers import Input, Dense
-from tensorflow.keras.models import Model
+from concurrent.futures import ProcessPoolExecutor
 from datetime import datetime
 
+from answer_table import MAX_K, AnswerTable, answer_codes, pack_key
+from catalog_compiler import CATALOG_PATH, compile_catalog, load_catalog
+from catalog_extension import add_ingredients
+from mix_solver import PinvSolver, beam_search_mixes, mix_residual, solve_mix_weights
+from model_cache import ModelCache, file_fingerprint
+from numpy_autoencoder import NumpyAutoencoder
+from parallel_training import limit_threads, train_parallel
+from projection_engine import PCAProjection
+from rating_model import RATING_MODEL_PATH, RatingModel
+from ratings_query import RatingStats
+from ratings_store import append_rating, iter_ratings
+from tracing import TRACER
+
+
+DATA_PATH = "code_final/cocktail_data_quest.json"
+MODEL_CACHE_DIR = "code_final/model_cache"
+
+# Löser für den Mischungsschritt: "lstsq" (ursprüngliches Verfahren), "nnls", "greedy", "pool" oder "beam"
+MIX_MODE = "lstsq"
+
+# Mit einem trainierten Bewertungsmodell (rating_model.py) werden Varianten der Mischung
+# mit diesen Lösern erzeugt und die mit der besten vorhergesagten Bewertung gewählt
+RERANK_MODES = ("lstsq", "nnls", "greedy")
+# Zusätzlich so viele unterschiedliche Mischungen aus der Beam Search
+BEAM_RESULTS = 5
+_RATING_MODEL = []
+
+# Vorberechnete Vorschläge (answer_table.py): '--materialize' berechnet alle
+# Antwortkombinationen für k = 1..ANSWER_TABLE_K_MAX, sofern es nicht mehr als
+# ANSWER_TABLE_MAX_ENTRIES Einträge sind. Alles andere wird beim ersten Auftreten eingetragen.
+ANSWER_TABLE_K_MAX = 8
+ANSWER_TABLE_MAX_ENTRIES = 200_000
+ANSWER_TABLE_CHUNK = 256
+_ANSWER_TABLE = []
+
+# Verfahren für die Rekonstruktion des Nutzerprofils: "autoencoder" (Keras-Training)
+# oder "pca" / "pca_sigmoid" (geschlossene Lösung ohne Training, siehe projection_engine.py)
+ENCODER = "autoencoder"
 
-def load_cocktail_data():
+# Training des Autoencoders: höchstens MAX_EPOCHS Epochen, Abbruch, sobald sich der
+# Loss EARLY_STOPPING_PATIENCE Epochen lang um weniger als EARLY_STOPPING_MIN_DELTA
+# verbessert. Passt die Zutatengruppe in einen Batch (bis FULL_BATCH_MAX_ROWS Zeilen),
+# wird mit dem ganzen Datensatz pro Schritt und höherer Lernrate trainiert.
+MAX_EPOCHS = 500
+EARLY_STOPPING_PATIENCE = 50
+EARLY_STOPPING_MIN_DELTA = 1e-4
+FULL_BATCH_MAX_ROWS = 4096
+FULL_BATCH_LEARNING_RATE = 0.01
+
+# Nach dem Hinzufügen von Zutaten wird der vorhandene Autoencoder nur kurz weitertrainiert
+FINE_TUNE_EPOCHS = 100
+FINE_TUNE_PATIENCE = 10
+
+# Trainierte Autoencoder werden pro Zutatengruppe gecacht (siehe model_cache.py)
+MODEL_CACHE = ModelCache(MODEL_CACHE_DIR, DATA_PATH)
+TRACER.gauge("model_cache_memory_hits", lambda: MODEL_CACHE.memory_hits)
+TRACER.gauge("model_cache_disk_hits", lambda: MODEL_CACHE.disk_hits)
+TRACER.gauge("model_cache_misses", lambda: MODEL_CACHE.misses)
+
+LOG = logging.getLogger(__name__)
+
+
+def load_cocktail_data(json_path=DATA_PATH):
     """
     Lädt die Cocktail-Daten (Zutaten + Fragen) aus der JSON-Datei
     'code_final/cocktail_data_quest.json' (ggf. Pfad anpassen).
     """
-    json_path = "code_final/cocktail_data_quest.json"
-    with open(json_path, "r", encoding="utf-8") as f:
+    with TRACER.span("load_data"), open(json_path, "r", encoding="utf-8") as f:
         data = json.load(f)
     return data
 
 
-def build_and_train_autoencoder(ingredient_profiles, latent_dim=3, epochs=500, batch_size=4):
+def build_autoencoder(input_dim, latent_dim=3, learning_rate=0.001):
     """
-    Erstellt einen einfachen Autoencoder und trainiert ihn auf den
-    übergebenen Profilen (np.array shape=(n_samples, n_features)).
+    Erstellt einen einfachen (untrainierten) Autoencoder input_dim -> latent_dim -> input_dim.
+
+    TensorFlow wird erst hier importiert, damit Menü und Bewertungsanzeige ohne
+    den mehrsekündigen Import starten.
     """
-    input_dim = ingredient_profiles.shape[1]
+    from tensorflow.keras.layers import Input, Dense
+    from tensorflow.keras.models import Model
+    from tensorflow.keras.optimizers import Adam
     
     # Encoder
     input_layer = Input(shape=(input_dim,))
@@ -61,7 +137,37 @@ def build_and_train_autoencoder(ingredient_profiles, latent_dim=3, epochs=500, b
     
     # Autoencoder
     autoencoder = Model(inputs=input_layer, outputs=decoded)
-    autoencoder.compile(optimizer='adam', loss='mse')
+    autoencoder.compile(optimizer=Adam(learning_rate=learning_rate), loss='mse')
+    return autoencoder
+
+
+def build_and_train_autoencoder(ingredient_profiles, latent_dim=3, epochs=MAX_EPOCHS, batch_size=None,
+                                patience=EARLY_STOPPING_PATIENCE, min_delta=EARLY_STOPPING_MIN_DELTA,
+                                initial_weights=None):
+    """
+    Erstellt einen einfachen Autoencoder und trainiert ihn auf den
+    übergebenen Profilen (np.array shape=(n_samples, n_features)).
+    
+    'epochs' ist nur die Obergrenze: Das Training endet, sobald sich der Loss
+    'patience' Epochen lang um weniger als 'min_delta' verbessert hat, und die
+    besten Gewichte werden wiederhergestellt. Mit batch_size=None wird bei bis zu
+    FULL_BATCH_MAX_ROWS Zeilen mit dem ganzen Datensatz trainiert.
+    Gelaufene Epochen und Loss stehen anschließend in 'autoencoder.history'.
+    Mit 'initial_weights' wird von vorhandenen Gewichten aus weitertrainiert.
+    """
+    from tensorflow.keras.callbacks import EarlyStopping
+    
+    n_samples = ingredient_profiles.shape[0]
+    learning_rate = 0.001
+    if batch_size is None:
+        if n_samples <= FULL_BATCH_MAX_ROWS:
+            batch_size = n_samples
+            learning_rate = FULL_BATCH_LEARNING_RATE
+        else:
+            batch_size = 32
+    autoencoder = build_autoencoder(ingredient_profiles.shape[1], latent_dim, learning_rate)
+    if initial_weights is not None:
+        autoencoder.set_weights(initial_weights)
     
     # Training
     autoencoder.fit(
@@ -69,26 +175,144 @@ def build_and_train_autoencoder(ingredient_profiles, latent_dim=3, epochs=500, b
         ingredient_profiles,
         epochs=epochs,
         batch_size=batch_size,
+        callbacks=[EarlyStopping(monitor="loss", patience=patience, min_delta=min_delta, restore_best_weights=True)],
         verbose=0  # Falls du Trainingsausgaben sehen willst, setze auf 1 oder 2
     )
     
     return autoencoder
 
 
-def create_mix_profile(reconstructed_profile, ingredient_profiles, ingredient_names, k, total_volume=200.0):
+def train_numpy_autoencoder(ingredient_profiles, latent_dim=3, epochs=MAX_EPOCHS, batch_size=None,
+                            patience=EARLY_STOPPING_PATIENCE, initial_weights=None):
+    """
+    Trainiert den Autoencoder mit Keras und gibt ihn als NumPy-Modell zurück.
+    Das Modell merkt sich die Anzahl gelaufener Epochen und den Loss seiner
+    Gewichte. Der Loss wird nach dem Training mit 'evaluate' berechnet: Ältere
+    Keras-Versionen stellen die besten Gewichte nur wieder her, wenn das Training
+    tatsächlich vorzeitig abgebrochen wurde, min(history) kann dann zu anderen
+    Gewichten gehören.
+    """
+    autoencoder = build_and_train_autoencoder(
+        ingredient_profiles, latent_dim, epochs, batch_size, patience=patience, initial_weights=initial_weights)
+    model = NumpyAutoencoder.from_keras(autoencoder)
+    model.epochs_run = len(autoencoder.history.history["loss"])
+    model.final_loss = float(autoencoder.evaluate(
+        ingredient_profiles, ingredient_profiles, batch_size=len(ingredient_profiles), verbose=0))
+    return model
+
+
+def _record_training(models):
+    # Nur Protokoll und Metriken, die Ausgabe für Nutzer übernimmt z.B. 'warm_up'
+    for model in models:
+        LOG.info("Autoencoder trainiert: %d Epochen, Loss %.5f", model.epochs_run, model.final_loss)
+        TRACER.count("training_runs")
+        TRACER.count("training_epochs", model.epochs_run)
+        TRACER.observe("training_final_loss", model.final_loss)
+
+
+def fine_tune_autoencoder(model, ingredient_profiles, epochs=FINE_TUNE_EPOCHS):
     """
-    Berechnet per Least Squares ein Gewichtungsprofil der Zutaten und wählt
-    anschließend nur die Top k Zutaten aus, normalisiert die Gewichte und
-    rechnet sie auf ml um.
+    Trainiert ein vorhandenes Modell (z.B. nach dem Hinzufügen von Zutaten) von
+    seinen aktuellen Gewichten aus für wenige Epochen weiter, statt neu zu beginnen.
+    """
+    with TRACER.span("fine_tune"):
+        tuned = train_numpy_autoencoder(
+            ingredient_profiles, model.latent_dim, epochs, patience=FINE_TUNE_PATIENCE,
+            initial_weights=model.get_weights())
+    _record_training([tuned])
+    return tuned
+
+
+def _train_traced(ingredient_profiles, latent_dim=3, epochs=MAX_EPOCHS, batch_size=None):
+    with TRACER.span("train"):
+        model = train_numpy_autoencoder(ingredient_profiles, latent_dim, epochs, batch_size)
+    _record_training([model])
+    return model
+
+
+def get_autoencoder(ingredient_profiles, latent_dim=3, epochs=MAX_EPOCHS, batch_size=None, encoder=None):
+    """
+    Liefert einen trainierten Autoencoder für die Zutatengruppe. Bereits trainierte
+    Modelle werden aus dem Cache geladen, statt erneut trainiert zu werden.
+
+    Für die Vorhersage wird das NumPy-Modell (numpy_autoencoder.py) verwendet,
+    TensorFlow wird nur zum Trainieren benötigt.
+    Mit encoder="pca" oder "pca_sigmoid" (Standard: ENCODER) wird stattdessen eine
+    PCA-Projektion berechnet, die dieselbe Schnittstelle hat.
+    """
+    encoder = encoder or ENCODER
+    with TRACER.span("encoder"):
+        if encoder != "autoencoder":
+            return PCAProjection.fit(ingredient_profiles, latent_dim, sigmoid=encoder == "pca_sigmoid")
+        return MODEL_CACHE.get(
+            ingredient_profiles,
+            latent_dim,
+            epochs,
+            batch_size,
+            build_fn=NumpyAutoencoder.zeros,
+            train_fn=_train_traced,
+        )
+
+
+def train_numpy_autoencoders(profile_groups, latent_dim=3, epochs=MAX_EPOCHS, batch_size=None):
+    """
+    Trainiert die Autoencoder mehrerer Zutatengruppen parallel in einem Prozesspool
+    (siehe parallel_training.py).
+    """
+    with TRACER.span("train"):
+        models = train_parallel(train_numpy_autoencoder, profile_groups, latent_dim, epochs, batch_size)
+    _record_training(models)
+    return models
+
+
+def get_autoencoders(profile_groups, latent_dim=3, epochs=MAX_EPOCHS, batch_size=None, encoder=None):
+    """
+    Wie 'get_autoencoder' für mehrere Zutatengruppen. Nicht gecachte Gruppen
+    werden gleichzeitig statt nacheinander trainiert.
+    """
+    encoder = encoder or ENCODER
+    if encoder != "autoencoder":
+        return [get_autoencoder(p, latent_dim, encoder=encoder) for p in profile_groups]
+    return MODEL_CACHE.get_many(
+        profile_groups,
+        latent_dim,
+        epochs,
+        batch_size,
+        build_fn=NumpyAutoencoder.zeros,
+        train_many_fn=train_numpy_autoencoders,
+    )
+
+
+def warm_up(groups):
+    """
+    Trainiert (bzw. lädt) die Autoencoder aller Zutatengruppen beim Start parallel,
+    damit der erste Gast nicht auf das Training warten muss.
+    """
+    t = time.perf_counter()
+    get_autoencoders([profiles for names, profiles, _ in groups.values() if names])
+    if ENCODER == "autoencoder":
+        # Modelle früherer Zutatengruppen werden nicht mehr gebraucht
+        MODEL_CACHE.prune(_model_keys(groups))
+    print(f"Autoencoder bereit nach {time.perf_counter() - t:.1f} s "
+          f"(trainiert: {MODEL_CACHE.misses}, aus dem Cache: {MODEL_CACHE.disk_hits + MODEL_CACHE.memory_hits})")
+
+
+def lstsq_mix_weights(reconstructed_profile, ingredient_profiles, k, solver=None):
+    """
+    Berechnet per Least Squares ein Gewichtungsprofil der Zutaten und behält
+    anschließend nur die Top k Gewichte (normalisiert auf Summe 1).
     
-    Rückgabe: dict {Zutat: ml} mit genau k Zutaten (eventuell werden Zutaten
-              mit 0 ml hinzugefügt, wenn weniger als k Zutaten aktiv waren).
+    Ist ein vorberechneter 'solver' (siehe mix_solver.py) angegeben, wird dieser
+    statt 'np.linalg.lstsq' verwendet.
     """
     A = ingredient_profiles.T  # shape (features, M)
     b = reconstructed_profile
     
     # Unbeschränktes Least-Squares
-    w, _, _, _ = np.linalg.lstsq(A, b, rcond=None)
+    if solver is not None:
+        w = solver.solve(b)
+    else:
+        w, _, _, _ = np.linalg.lstsq(A, b, rcond=None)
     
     # Negative Gewichte auf 0 setzen
     w = np.maximum(w, 0)
@@ -111,9 +335,12 @@ def create_mix_profile(reconstructed_profile, ingredient_profiles, ingredient_na
         sum_w_new = w.sum()
         if sum_w_new > 0:
             w /= sum_w_new
-        else:
+        elif k > 0:
             w[mask] = 1.0 / k
+    return w
 
+
+def _mixture_from_weights(w, ingredient_names, k, total_volume):
     # Berechne Volumen in ml
     volumes = w * total_volume
     
@@ -132,24 +359,345 @@ def create_mix_profile(reconstructed_profile, ingredient_profiles, ingredient_na
     return mixture
 
 
-def save_rating(user_profile, cocktail_mix, rating):
+def create_mix_profile(reconstructed_profile, ingredient_profiles, ingredient_names, k, total_volume=200.0, solver=None, mode="lstsq", return_residual=False):
     """
-    Speichert eine abgegebene Bewertung in einer JSON-Datei (z.B. 'cocktail_ratings.json').
+    Berechnet ein Gewichtungsprofil der Zutaten mit k Zutaten, normalisiert die
+    Gewichte und rechnet sie auf ml um.
+    
+    mode:
+      - "lstsq": unbeschränktes Least Squares, negative Gewichte auf 0, Top k
+      - "nnls", "greedy", "pool", "beam": nicht-negative Mischung mit höchstens k Zutaten
+        (siehe mix_solver.solve_mix_weights)
+    
+    Rückgabe: dict {Zutat: ml} mit genau k Zutaten (eventuell werden Zutaten
+              mit 0 ml hinzugefügt, wenn weniger als k Zutaten aktiv waren).
+              Mit return_residual=True zusätzlich der Abstand zwischen dem Profil
+              der fertigen Mischung und dem Zielprofil: (dict, residuum).
+    """
+    with TRACER.span("mix"):
+        if mode == "lstsq":
+            w = lstsq_mix_weights(reconstructed_profile, ingredient_profiles, k, solver=solver)
+        else:
+            w, _ = solve_mix_weights(ingredient_profiles, reconstructed_profile, k, mode=mode)
+    if TRACER.enabled:
+        TRACER.observe("mix_residual", mix_residual(w, ingredient_profiles, reconstructed_profile))
+
+    mixture = _mixture_from_weights(w, ingredient_names, k, total_volume)
+    if return_residual:
+        return mixture, mix_residual(w, ingredient_profiles, reconstructed_profile)
+    return mixture
+
+
+def create_mix_profiles(reconstructed_profiles, ingredient_profiles, ingredient_names, ks, total_volume=200.0, solver=None):
+    """
+    Batch-Variante von 'create_mix_profile' für N rekonstruierte Profile auf einmal
+    (np.array shape=(N, n_features)). Das Least-Squares wird für alle Profile in einem
+    einzigen Aufruf gelöst (Matrix als rechte Seite), Clipping, Normalisierung und
+    Top-k-Auswahl laufen vektorisiert.
+
+    ks: int oder np.array shape=(N,) mit der Anzahl Zutaten pro Profil.
+    Rückgabe: Liste mit N dicts {Zutat: ml}, identisch zu 'create_mix_profile'.
+    """
+    B = np.atleast_2d(reconstructed_profiles)
+    n_profiles, n_ingredients = B.shape[0], ingredient_profiles.shape[0]
+    ks = np.broadcast_to(np.asarray(ks, dtype=int), (n_profiles,))
+    rows = np.arange(n_profiles)
+
+    with TRACER.span("mix_batch"):
+        # Unbeschränktes Least-Squares für alle Profile, W shape (N, M)
+        if solver is not None:
+            W = solver.solve(B)
+        else:
+            W = np.linalg.lstsq(ingredient_profiles.T, B.T, rcond=None)[0].T
+        W = np.maximum(W, 0)
+
+        # Normalisieren => Zeilensumme 1 (Zeilen ohne positives Gewicht: gleichverteilt)
+        sum_w = W.sum(axis=1)
+        W[sum_w == 0] = 1.0 / n_ingredients
+        W[sum_w > 0] /= sum_w[sum_w > 0, None]
+
+        # Nur Top k Gewichte pro Zeile behalten
+        truncate = ks < n_ingredients
+        if truncate.any():
+            order = np.argsort(-W, axis=1)
+            rank = np.empty_like(order)
+            rank[rows[:, None], order] = np.arange(n_ingredients)
+            mask = rank < ks[:, None]
+            W_trunc = np.where(mask, W, 0.0)
+            sum_new = W_trunc.sum(axis=1)
+            positive = sum_new > 0
+            W_trunc[positive] /= sum_new[positive, None]
+            # Alle Top-k Gewichte 0 => gleichverteilt auf die k Zutaten
+            for row in np.flatnonzero(~positive & (ks > 0)):
+                W_trunc[row, mask[row]] = 1.0 / ks[row]
+            W[truncate] = W_trunc[truncate]
+    if TRACER.enabled:
+        for residual in np.linalg.norm(W @ ingredient_profiles - B, axis=1):
+            TRACER.observe("mix_residual", residual)
+
+    volumes = W * total_volume
+
+    mixtures = []
+    for row in range(n_profiles):
+        k = ks[row]
+        active = np.flatnonzero(volumes[row] > 1e-6)
+        mixture = {ingredient_names[i]: round(float(volumes[row, i]), 2) for i in active}
+        # Falls weniger als k Zutaten aktiv sind, ergänzen wir mit 0 ml
+        if len(mixture) < k:
+            remaining_ingredients = [name for name in ingredient_names if name not in mixture]
+            for ingredient in remaining_ingredients[:k - len(mixture)]:
+                mixture[ingredient] = 0.0
+        mixtures.append(mixture)
+    return mixtures
+
+
+def create_mix_candidates(reconstructed_profile, ingredient_profiles, ingredient_names, k, total_volume=200.0, n_results=BEAM_RESULTS):
+    """
+    Mehrere unterschiedliche Mischungen mit k Zutaten per Beam Search
+    (mix_solver.beam_search_mixes), die besten zuerst.
+    Rückgabe: Liste von (dict {Zutat: ml}, Residuum)
+    """
+    with TRACER.span("mix_beam"):
+        results = beam_search_mixes(ingredient_profiles, reconstructed_profile, k, n_results=n_results)
+    candidates = []
+    for support, x, residual in results:
+        w = np.zeros(len(ingredient_names))
+        w[support] = x
+        candidates.append((_mixture_from_weights(w, ingredient_names, k, total_volume), residual))
+    return candidates
+
+
+def candidate_mixes(reconstructed_profile, user_profile, ingredient_profiles, ingredient_names, k, total_volume=200.0, solver=None):
+    """
+    Varianten einer Mischung für das Re-Ranking: jeder Löser aus RERANK_MODES,
+    jeweils für das rekonstruierte und das ursprüngliche Nutzerprofil als Ziel,
+    dazu die Ergebnisse der Beam Search für das rekonstruierte Profil.
+    Rückgabe: Liste verschiedener dicts {Zutat: ml}.
+    """
+    candidates = []
+    for target in (reconstructed_profile, user_profile):
+        for mode in RERANK_MODES:
+            mix = create_mix_profile(target, ingredient_profiles, ingredient_names, k, total_volume=total_volume, solver=solver, mode=mode)
+            if mix not in candidates:
+                candidates.append(mix)
+    for mix, _ in create_mix_candidates(reconstructed_profile, ingredient_profiles, ingredient_names, k, total_volume):
+        if mix not in candidates:
+            candidates.append(mix)
+    return candidates
+
+
+def get_rating_model():
+    """
+    Lädt das Bewertungsmodell einmalig (None, solange keines trainiert wurde).
+    """
+    if not _RATING_MODEL:
+        _RATING_MODEL.append(RatingModel.load())
+    return _RATING_MODEL[0]
 
-    Wenn die Datei nicht existiert, wird sie neu erstellt und eine leere Struktur
-    angelegt. Anschließend wird der neue Eintrag appended.
+
+def ingredient_group(all_ingredients, alcoholic):
+    """
+    Filtert die Zutaten nach alkoholisch/nicht-alkoholisch.
+    Rückgabe: (Liste der Namen, np.array der Profile shape=(M, n_features))
+    """
+    items = [(name, info["taste"]) for name, info in all_ingredients.items() if info["alcoholic"] == alcoholic]
+    names = [x[0] for x in items]
+    profiles = np.array([x[1] for x in items])
+    return names, profiles
+
+
+def load_ingredient_groups(data, catalog=None):
+    """
+    Bereitet beide Zutatengruppen einmalig beim Laden vor.
+    Mit einem kompilierten Katalog (catalog_compiler.py) sind die Profile Views auf
+    die gemappte Datei, statt aus dem JSON neu aufgebaut zu werden.
+    Rückgabe: dict {alkoholisch (bool): (Namen, Profile, PinvSolver oder None)}
+    """
+    groups = {}
+    for alcoholic in (True, False):
+        if catalog is not None:
+            names, profiles = catalog.group(alcoholic)
+        else:
+            names, profiles = ingredient_group(data["ingredients"], alcoholic)
+        solver = PinvSolver(profiles) if names else None
+        groups[alcoholic] = (names, profiles, solver)
+    return groups
+
+
+def split_k(ks, n_alc_available, n_non_alc_available):
+    """
+    Teilt die gewünschte Anzahl Zutaten k (int oder np.array) wie im Fragebogen auf:
+    30% alkoholisch (mindestens 1), der Rest nicht-alkoholisch. Hat eine Gruppe
+    nicht genügend Zutaten, wird die Verteilung angepasst.
+    Rückgabe: (num_alc, num_non_alc)
+    """
+    ks = np.asarray(ks, dtype=int)
+    num_alc = np.maximum(1, np.round(0.3 * ks).astype(int))
+    num_alc = np.minimum(num_alc, n_alc_available)
+    num_non_alc = ks - num_alc
+    too_many = num_non_alc > n_non_alc_available
+    num_non_alc = np.where(too_many, n_non_alc_available, num_non_alc)
+    num_alc = np.where(too_many, ks - num_non_alc, num_alc)
+    return num_alc, num_non_alc
+
+
+def recommend_batch(data, user_profiles, ks=3, alcoholic=False, total_volume=200.0, groups=None):
     """
-    ratings_file = "code_final/cocktail_ratings.json"
+    Programmatischer Einstiegspunkt für viele Nutzer gleichzeitig (z.B. Tablets auf
+    einer Veranstaltung), ohne Abfragen über input().
+
+    - user_profiles: np.array shape=(N, 5) mit den gemittelten Geschmacksprofilen
+    - ks: int oder Array shape=(N,) mit der gewünschten Anzahl Zutaten
+    - alcoholic: bool oder Array shape=(N,) (alkoholische Variante ja/nein)
+
+    Pro Zutatengruppe wird genau ein 'predict' für alle betroffenen Nutzer ausgeführt
+    und das Least-Squares für alle gemeinsam gelöst. 'groups' sind die mit
+    'load_ingredient_groups' vorbereiteten Zutatengruppen (sonst werden sie neu erstellt).
+    Rückgabe: Liste mit N dicts {Zutat: ml}
+    """
+    user_profiles = np.atleast_2d(np.asarray(user_profiles, dtype=float))
+    n_users = user_profiles.shape[0]
+    ks = np.broadcast_to(np.asarray(ks, dtype=int), (n_users,))
+    alcoholic = np.broadcast_to(np.asarray(alcoholic, dtype=bool), (n_users,))
+
+    if groups is None:
+        groups = load_ingredient_groups(data)
+    alc_names, alc_profiles, alc_solver = groups[True]
+    non_alc_names, non_alc_profiles, non_alc_solver = groups[False]
+
+    num_alc, num_non_alc = split_k(ks, len(alc_names), len(non_alc_names))
+    # Nicht-alkoholische Nutzer bekommen alle k Zutaten aus der nicht-alkoholischen Gruppe
+    num_non_alc = np.where(alcoholic, num_non_alc, ks)
+    volume_non_alc = np.where(alcoholic, total_volume * 0.7, total_volume)
+
+    mixes = [{} for _ in range(n_users)]
+
+    # Nicht-alkoholische Gruppe (betrifft alle Nutzer)
+    if non_alc_names:
+        autoencoder_non_alc = get_autoencoder(non_alc_profiles)
+        with TRACER.span("predict"):
+            reconstructed = autoencoder_non_alc.predict(user_profiles)
+        for volume in np.unique(volume_non_alc):
+            idx = np.flatnonzero(volume_non_alc == volume)
+            group_mixes = create_mix_profiles(reconstructed[idx], non_alc_profiles, non_alc_names, num_non_alc[idx], total_volume=volume, solver=non_alc_solver)
+            for i, mix in zip(idx, group_mixes):
+                mixes[i].update(mix)
+
+    # Alkoholische Gruppe (nur Nutzer mit alkoholischer Variante)
+    alc_idx = np.flatnonzero(alcoholic)
+    if alc_names and alc_idx.size > 0:
+        autoencoder_alc = get_autoencoder(alc_profiles)
+        with TRACER.span("predict"):
+            reconstructed = autoencoder_alc.predict(user_profiles[alc_idx])
+        group_mixes = create_mix_profiles(reconstructed, alc_profiles, alc_names, num_alc[alc_idx], total_volume=total_volume * 0.3, solver=alc_solver)
+        for i, mix in zip(alc_idx, group_mixes):
+            # Alkoholische Zutaten stehen wie im Fragebogen vorne
+            mixes[i] = {**mix, **mixes[i]}
+
+    return mixes
+
+
+def extend_catalog(data, groups, new_ingredients, json_path=DATA_PATH):
+    """
+    Fügt neue Zutaten ({Name: {"taste": [5 Werte], "alcoholic": bool}}) hinzu und
+    macht sie sofort für Vorschläge verfügbar:
+      1. bisherige Autoencoder der betroffenen Gruppen holen (vor der Änderung der
+         Profile, da sich damit ihr Cache-Schlüssel ändert)
+      2. Zutaten in die JSON-Datei schreiben (catalog_extension.py)
+      3. Zutatengruppen ergänzen, Pseudoinverse inkrementell aktualisieren
+      4. kompilierten Katalog für andere Prozesse neu schreiben
+      5. Autoencoder ausgehend von den bisherigen Gewichten kurz nachtrainieren,
+         unter dem neuen Schlüssel cachen und die alten Gewichte löschen
+         (die Modelle der übrigen Gruppe bleiben unverändert im Cache)
+    'groups' (aus load_ingredient_groups) wird direkt aktualisiert.
+    Rückgabe: dict mit der Dauer der Schritte in ms (inkl. "total").
+    """
+    timings = {}
+    start = time.perf_counter()
     
-    # Falls Datei nicht existiert, Grundstruktur anlegen
-    if not os.path.exists(ratings_file):
-        with open(ratings_file, "w", encoding="utf-8") as f:
-            json.dump({"ratings": []}, f, ensure_ascii=False, indent=2)
+    def lap(name):
+        nonlocal start
+        now = time.perf_counter()
+        timings[name] = (now - start) * 1000
+        start = now
     
-    # Bestehende Daten laden
-    with open(ratings_file, "r", encoding="utf-8") as f:
-        data = json.load(f)
+    affected = sorted({bool(info["alcoholic"]) for info in new_ingredients.values()})
+    old_models = {}
+    if ENCODER == "autoencoder":
+        old_models = {alc: get_autoencoder(groups[alc][1]) for alc in affected if groups[alc][0]}
+    lap("old_models")
+    
+    added = add_ingredients(data, new_ingredients, json_path)
+    lap("json")
+    
+    for alc in affected:
+        names, profiles, solver = groups[alc]
+        new_names = [name for name, info in added.items() if info["alcoholic"] == alc]
+        # Gleicher dtype wie die vorhandenen Profile (kompilierter Katalog: float32)
+        dtype = profiles.dtype if len(names) else np.float32
+        new_profiles = np.array([added[name]["taste"] for name in new_names], dtype=dtype)
+        profiles = np.vstack([profiles, new_profiles]) if len(names) else new_profiles
+        if solver is None:
+            solver = PinvSolver(profiles)
+        else:
+            for profile in new_profiles:
+                solver.add_profile(profile)
+        groups[alc] = (list(names) + new_names, profiles, solver)
+    lap("groups")
     
+    compile_catalog(json_path)
+    lap("catalog")
+    
+    for alc, old_model in old_models.items():
+        MODEL_CACHE.get(
+            groups[alc][1], old_model.latent_dim, MAX_EPOCHS, None,
+            build_fn=NumpyAutoencoder.zeros,
+            train_fn=lambda profiles, latent_dim, epochs, batch_size, old_model=old_model: fine_tune_autoencoder(old_model, profiles),
+        )
+    if old_models:
+        # Nur die Modelle der erweiterten Gruppen sind veraltet, die anderen bleiben gültig
+        MODEL_CACHE.prune(_model_keys(groups))
+    lap("models")
+    
+    # Die Antworttabelle gehört zur alten Datenversion und wird beim nächsten Zugriff neu geladen
+    _ANSWER_TABLE.clear()
+    
+    timings["total"] = sum(timings.values())
+    return timings
+
+
+def extend_catalog_dialog(data, groups):
+    """
+    Menüpunkt 'Rezeptdatenbank erweitern': fragt eine neue Zutat ab, fügt sie hinzu
+    und zeigt, wie lange es dauert, bis sie für Vorschläge verfügbar ist.
+    """
+    labels = data.get("taste_labels", ["süß", "sauer", "bitter", "fruchtig", "würzig"])
+    name = input("\nName der neuen Zutat: ").strip()
+    try:
+        taste = [float(input(f"  {label} (0 bis 1): ").replace(",", ".")) for label in labels]
+    except ValueError:
+        print("Ungültige Eingabe, die Zutat wird nicht gespeichert.")
+        return
+    alcoholic = input("Alkoholisch? (j/n): ").strip().lower() == "j"
+    
+    try:
+        timings = extend_catalog(data, groups, {name: {"taste": taste, "alcoholic": alcoholic}})
+    except ValueError as exc:
+        print(f"Die Zutat wurde nicht gespeichert: {exc}")
+        return
+    print(f"'{name}' wurde hinzugefügt und ist nach {timings['total']:.0f} ms verfügbar "
+          f"(davon Autoencoder: {timings['models']:.0f} ms).")
+
+
+def save_rating(user_profile, cocktail_mix, rating):
+    """
+    Speichert eine abgegebene Bewertung im Ratings-Log 'cocktail_ratings.jsonl'
+    (siehe ratings_store.py).
+
+    Der Eintrag wird als eine Zeile angehängt, die Datei wird nicht neu geschrieben.
+    Bewertungen aus dem alten Format 'cocktail_ratings.json' werden beim ersten
+    Zugriff automatisch übernommen.
+    """
     # Neuen Eintrag erstellen
     new_entry = {
         "timestamp": datetime.now().isoformat(timespec="seconds"),
@@ -158,45 +706,248 @@ def save_rating(user_profile, cocktail_mix, rating):
         "rating": rating
     }
     
-    # An die Liste anhängen
-    data["ratings"].append(new_entry)
-    
-    # Zurückschreiben in die Datei
-    with open(ratings_file, "w", encoding="utf-8") as f:
-        json.dump(data, f, ensure_ascii=False, indent=2)
+    # An den Log anhängen
+    with TRACER.span("save_rating"):
+        append_rating(new_entry)
     
     print("Deine Bewertung wurde erfolgreich gespeichert!")
 
-def show_ratings():
+def show_ratings(page_size=10):
     """
-    Liest die bereits gespeicherten Bewertungen aus der JSON-Datei und zeigt
-    sie in der Konsole an. Falls keine Bewertungen existieren, wird eine
-    entsprechende Meldung ausgegeben.
+    Zeigt eine Zusammenfassung (aus den laufend gepflegten Aggregaten, siehe
+    ratings_query.py) und anschließend die gespeicherten Bewertungen seitenweise
+    an. Der Ratings-Log wird dabei zeilenweise gelesen. Falls keine Bewertungen
+    existieren, wird eine entsprechende Meldung ausgegeben.
     """
-    ratings_file = "code_final/cocktail_ratings.json"
-    
-    if not os.path.exists(ratings_file):
-        print("Keine Bewertungen vorhanden (Datei nicht gefunden).")
-        return
-    
-    with open(ratings_file, "r", encoding="utf-8") as f:
-        data = json.load(f)
-    
-    if "ratings" not in data or len(data["ratings"]) == 0:
+    stats = RatingStats.load()
+    summary = stats.summary()
+    if summary["count"] == 0:
         print("Keine Bewertungen vorhanden.")
         return
     
     print("\n--- Vorhandene Bewertungen ---")
-    for i, entry in enumerate(data["ratings"], start=1):
+    print(f"Anzahl: {summary['count']}, Durchschnitt: {summary['mean']:.2f} Sterne")
+    print("Verteilung: " + ", ".join(f"{stars}*: {n}" for stars, n in summary["histogram"].items()))
+    top = stats.top_ingredients(3, min_count=2)
+    if top:
+        print("Beliebteste Zutaten: " + ", ".join(f"{name} ({mean:.2f})" for name, mean in top))
+    print()
+    
+    for i, entry in enumerate(iter_ratings(), start=1):
         print(f"Bewertung Nr. {i}:")
         print(f"  - Zeitpunkt:    {entry['timestamp']}")
         print(f"  - User-Profil:  {entry['user_profile']}")
         print(f"  - Cocktail-Mix: {entry['cocktail_mix']}")
         print(f"  - Bewertung:    {entry['rating']}")
         print()
+        if i % page_size == 0 and i < summary["count"]:
+            if input("Enter für weitere Bewertungen, q zum Beenden: ").strip().lower() == "q":
+                break
+
+
+def profile_from_answers(questions, answers):
+    """
+    Berechnet das Geschmacksprofil aus den Antworten ("1" oder "2") auf die Fragen:
+    Mittelwert der Geschmacksvektoren der gewählten Optionen. Ungültige Antworten
+    werden übersprungen.
+    """
+    user_profile = np.zeros(5)
+    valid_answers = 0
+    for q, ans in zip(questions, answers):
+        if ans == "1":
+            user_profile += np.array(q["option1_taste"])
+            valid_answers += 1
+        elif ans == "2":
+            user_profile += np.array(q["option2_taste"])
+            valid_answers += 1
+    if valid_answers > 0:
+        user_profile /= valid_answers
+    return user_profile
+
+
+def suggest_cocktail(data, groups, user_profile, alcoholic, k, total_volume=200.0):
+    """
+    Berechnet den Vorschlag für ein Nutzerprofil (ohne Abfragen über input()):
+    - nicht-alkoholisch: k nicht-alkoholische Zutaten
+    - alkoholisch: k wird aufgeteilt (30% alkoholisch, mindestens 1, siehe split_k)
+      und die Mischungen werden getrennt berechnet
+    Mit trainiertem Bewertungsmodell werden Varianten erzeugt und die beste gewählt.
+    Rückgabe: (Mischung {Zutat: ml} oder None, rekonstruiertes Profil alkoholisch
+              oder None, rekonstruiertes Profil nicht-alkoholisch)
+    """
+    if not alcoholic:
+        # Nur nicht-alkoholische Zutaten verwenden
+        ingredient_names, ingredient_profiles, solver = groups[False]
+        if not ingredient_names:
+            return None, None, None
+        autoencoder = get_autoencoder(ingredient_profiles)
+        with TRACER.span("predict"):
+            reconstructed_profile = autoencoder.predict(np.array([user_profile]))[0]
+        final_mix = create_mix_profile(reconstructed_profile, ingredient_profiles, ingredient_names, k, total_volume=total_volume, solver=solver, mode=MIX_MODE)
+        reconstructed_profile_alc = None
+    
+    else:
+        # Alkoholische Variante: Wir teilen k in zwei Gruppen auf:
+        # z.B. 30% der Zutaten (mindestens 1) sollen alkoholisch sein, der Rest nicht-alkoholisch.
+        # Falls in einer Gruppe nicht genügend Zutaten vorhanden sind, passen wir die Verteilung an.
+        alc_names, alc_profiles, alc_solver = groups[True]
+        non_alc_names, non_alc_profiles, non_alc_solver = groups[False]
+        num_alc, num_non_alc = map(int, split_k(k, len(alc_names), len(non_alc_names)))
+    
+        # Beide Autoencoder werden bei Bedarf gleichzeitig trainiert
+        autoencoder_alc, autoencoder_non_alc = get_autoencoders([alc_profiles, non_alc_profiles])
+    
+        # Alkoholische Gruppe
+        with TRACER.span("predict"):
+            reconstructed_profile_alc = autoencoder_alc.predict(np.array([user_profile]))[0]
+        final_mix_alc = create_mix_profile(reconstructed_profile_alc, alc_profiles, alc_names, num_alc, total_volume=total_volume * 0.3, solver=alc_solver, mode=MIX_MODE)
+    
+        # Nicht-alkoholische Gruppe
+        with TRACER.span("predict"):
+            reconstructed_profile = autoencoder_non_alc.predict(np.array([user_profile]))[0]
+        final_mix_non_alc = create_mix_profile(reconstructed_profile, non_alc_profiles, non_alc_names, num_non_alc, total_volume=total_volume * 0.7, solver=non_alc_solver, mode=MIX_MODE)
+    
+        # Beide Gruppen kombinieren
+        final_mix = {**final_mix_alc, **final_mix_non_alc}
+    
+    # Mit trainiertem Bewertungsmodell: Varianten erzeugen und die beste wählen
+    rating_model = get_rating_model()
+    if rating_model is not None:
+        with TRACER.span("rerank"):
+            if not alcoholic:
+                candidates = candidate_mixes(reconstructed_profile, user_profile, ingredient_profiles, ingredient_names, k, total_volume, solver)
+            else:
+                alc_candidates = candidate_mixes(reconstructed_profile_alc, user_profile, alc_profiles, alc_names, num_alc, total_volume * 0.3, alc_solver)
+                non_alc_candidates = candidate_mixes(reconstructed_profile, user_profile, non_alc_profiles, non_alc_names, num_non_alc, total_volume * 0.7, non_alc_solver)
+                candidates = [{**a, **n} for a in alc_candidates for n in non_alc_candidates]
+            final_mix, _ = rating_model.rerank(user_profile, [final_mix] + candidates)
+    return final_mix, reconstructed_profile_alc, reconstructed_profile
+
+
+def answer_table_version(json_path=DATA_PATH):
+    """
+    Alles, wovon ein Vorschlag abhängt: Daten, Verfahren, Löser und Bewertungsmodell.
+    """
+    parts = [file_fingerprint(json_path)[:16], ENCODER, MIX_MODE, str(MAX_EPOCHS)]
+    if os.path.exists(RATING_MODEL_PATH):
+        parts.append(file_fingerprint(RATING_MODEL_PATH)[:16])
+    return "-".join(parts)
+
+
+def get_answer_table(data):
+    """
+    Lädt die Antworttabelle einmalig (leer, falls keine passende gespeichert ist).
+    """
+    if not _ANSWER_TABLE:
+        _ANSWER_TABLE.append(AnswerTable.load(list(data["ingredients"]), len(data["questions"]), answer_table_version()))
+    return _ANSWER_TABLE[0]
+
+
+def save_answer_table():
+    if _ANSWER_TABLE and _ANSWER_TABLE[0].dirty:
+        _ANSWER_TABLE[0].save()
 
 
-def questionnaire_and_cocktail_generator(data):
+def suggest_from_answers(data, groups, answers, alcoholic, k):
+    """
+    Wie 'suggest_cocktail', aber über die Antworten auf die Fragen: Der Vorschlag
+    wird in der Antworttabelle nachgeschlagen und nur bei einem Fehltreffer
+    berechnet (und eingetragen). Ist k größer als der Katalog, wird direkt
+    berechnet (mehr Zutaten als vorhanden ändern den Vorschlag nicht, und k
+    passt dann eventuell nicht mehr in den Schlüssel).
+    """
+    if k > min(len(data["ingredients"]), MAX_K):
+        return suggest_cocktail(data, groups, profile_from_answers(data["questions"], answers), alcoholic, k)
+    table = get_answer_table(data)
+    codes = answer_codes(answers)
+    entry = table.get(codes, k, alcoholic)
+    if entry is not None:
+        TRACER.count("answer_table_hits")
+        return entry
+    TRACER.count("answer_table_misses")
+    result = suggest_cocktail(data, groups, profile_from_answers(data["questions"], answers), alcoholic, k)
+    if result[0] is not None:
+        table.put(codes, k, alcoholic, *result)
+    return result
+
+
+def _suggest_for_codes(data, groups, codes, k, alcoholic):
+    answers = [str(code) for code in codes]
+    return suggest_cocktail(data, groups, profile_from_answers(data["questions"], answers), alcoholic, k)
+
+
+def _model_keys(groups, latent_dim=3):
+    # Cache-Schlüssel der Autoencoder, wie sie 'get_autoencoder' verwendet
+    return [MODEL_CACHE.fingerprint(profiles, latent_dim, MAX_EPOCHS, None) for names, profiles, _ in groups.values() if names]
+
+
+def _materialize_chunk(json_path, catalog_path, encoder, mix_mode, model_keys, entries):
+    # Läuft in einem eigenen Prozess (spawn): Einstellungen des Hauptprozesses
+    # übernehmen, denselben kompilierten Katalog laden und prüfen, dass die
+    # Autoencoder aus dem Cache kommen, statt neu trainiert zu werden
+    global ENCODER, MIX_MODE
+    ENCODER, MIX_MODE = encoder, mix_mode
+    data = load_cocktail_data(json_path)
+    groups = load_ingredient_groups(data, load_catalog(json_path, catalog_path))
+    if _model_keys(groups) != model_keys:
+        raise RuntimeError("Die Zutatengruppen im Worker passen nicht zu denen des Hauptprozesses.")
+    if encoder == "autoencoder" and any(MODEL_CACHE.load_weights(key) is None for key in model_keys):
+        raise RuntimeError("Die Autoencoder liegen nicht im Cache, der Worker müsste neu trainieren.")
+    return [_suggest_for_codes(data, groups, *entry) for entry in entries]
+
+
+def materialize_answer_table(data, groups, k_max=ANSWER_TABLE_K_MAX, max_workers=None):
+    """
+    Berechnet die Vorschläge für alle Antwortkombinationen (2^Q), k = 1..k_max und
+    beide Varianten und speichert die Antworttabelle. Die Kombinationen werden in
+    Blöcken auf einen Prozesspool verteilt. Bei mehr als ANSWER_TABLE_MAX_ENTRIES
+    Einträgen wird nichts vorberechnet, die Tabelle füllt sich dann beim Servieren.
+    Rückgabe: Anzahl neu berechneter Einträge
+    """
+    table = get_answer_table(data)
+    n_questions = len(data["questions"])
+    n_entries = 2 ** n_questions * k_max * 2
+    if n_entries > ANSWER_TABLE_MAX_ENTRIES:
+        print(f"{n_entries} Kombinationen sind zu viele zum Vorberechnen, die Tabelle wird beim Servieren gefüllt.")
+        return 0
+
+    entries = [
+        (list(codes), k, alcoholic)
+        for codes in itertools.product((1, 2), repeat=n_questions)
+        for k in range(1, k_max + 1)
+        for alcoholic in (False, True)
+    ]
+    entries = [e for e in entries if pack_key(*e) not in table]
+    if not entries:
+        return 0
+
+    # Autoencoder einmal im Hauptprozess trainieren, die Worker laden sie aus dem Cache
+    get_autoencoders([profiles for names, profiles, _ in groups.values() if names])
+    chunks = [entries[i:i + ANSWER_TABLE_CHUNK] for i in range(0, len(entries), ANSWER_TABLE_CHUNK)]
+    if len(chunks) == 1 or max_workers == 1:
+        results = [_suggest_for_codes(data, groups, *entry) for entry in entries]
+    else:
+        with ProcessPoolExecutor(
+            max_workers=min(len(chunks), max_workers or os.cpu_count() or 1),
+            mp_context=multiprocessing.get_context("spawn"),
+            initializer=limit_threads,
+            initargs=(1,),
+        ) as pool:
+            model_keys = _model_keys(groups)
+            futures = [
+                pool.submit(_materialize_chunk, DATA_PATH, CATALOG_PATH, ENCODER, MIX_MODE, model_keys, chunk)
+                for chunk in chunks
+            ]
+            results = [result for f in futures for result in f.result()]
+
+    for (codes, k, alcoholic), result in zip(entries, results):
+        if result[0] is not None:
+            table.put(codes, k, alcoholic, *result)
+    table.save()
+    return len(entries)
+
+
+def questionnaire_and_cocktail_generator(data, groups=None):
     """
     - Erfasst das Geschmacksprofil des Nutzers
     - Fragt nach bevorzugter Variante (alkoholisch/nicht-alkoholisch)
@@ -204,26 +955,21 @@ def questionnaire_and_cocktail_generator(data):
     - Bei nicht-alkoholischer Variante: Wähle k nicht-alkoholische Zutaten.
     - Bei alkoholischer Variante: Teile k in zwei Gruppen (z. B. 30% alkoholisch, 70% nicht-alkoholisch)
       und berechne die Mischungen separat, sodass insgesamt genau k Zutaten ausgewählt werden.
+    
+    'groups' sind die mit 'load_ingredient_groups' vorbereiteten Zutatengruppen.
     """
     # 4.1) Geschmacks-Profil sammeln
     questions = data["questions"]
-    user_profile = np.zeros(5)
-    valid_answers = 0
+    answers = []
     for q in questions:
         print("\n" + q["question"])
         print("1) " + q["option1_text"])
         print("2) " + q["option2_text"])
         ans = input("Deine Wahl (1/2): ")
-        if ans == "1":
-            user_profile += np.array(q["option1_taste"])
-            valid_answers += 1
-        elif ans == "2":
-            user_profile += np.array(q["option2_taste"])
-            valid_answers += 1
-        else:
+        if ans not in ("1", "2"):
             print("Ungültige Eingabe, überspringe diese Frage.")
-    if valid_answers > 0:
-        user_profile /= valid_answers
+        answers.append(ans)
+    user_profile = profile_from_answers(questions, answers)
     
     # Alkoholisch oder nicht?
     print("\nBevorzugst du eine alkoholische (a) oder nicht-alkoholische (n) Variante?")
@@ -243,55 +989,14 @@ def questionnaire_and_cocktail_generator(data):
         print("Ungültige Eingabe, setze k=3")
         k = 3
     
-    total_volume = 200.0
-    all_ingredients = data["ingredients"]
-    
-    if alc_pref == "n":
-        # Nur nicht-alkoholische Zutaten verwenden
-        filtered_items = [(name, info["taste"]) for name, info in all_ingredients.items() if not info["alcoholic"]]
-        if not filtered_items:
-            print("Keine passenden Zutaten gefunden!")
-            return
-        ingredient_names = [x[0] for x in filtered_items]
-        ingredient_profiles = np.array([x[1] for x in filtered_items])
-        autoencoder = build_and_train_autoencoder(ingredient_profiles)
-        reconstructed_profile = autoencoder.predict(np.array([user_profile]))[0]
-        final_mix = create_mix_profile(reconstructed_profile, ingredient_profiles, ingredient_names, k, total_volume=total_volume)
-    
-    else:
-        # Alkoholische Variante: Wir teilen k in zwei Gruppen auf:
-        # z.B. 30% der Zutaten (mindestens 1) sollen alkoholisch sein, der Rest nicht-alkoholisch.
-        num_alc = max(1, round(0.3 * k))
-        num_non_alc = k - num_alc
-        
-        # Filter Zutaten
-        alcoholic_items = [(name, info["taste"]) for name, info in all_ingredients.items() if info["alcoholic"]]
-        non_alcoholic_items = [(name, info["taste"]) for name, info in all_ingredients.items() if not info["alcoholic"]]
-        
-        # Falls in einer Gruppe nicht genügend Zutaten vorhanden sind, passen wir die Verteilung an.
-        if len(alcoholic_items) < num_alc:
-            num_alc = len(alcoholic_items)
-            num_non_alc = k - num_alc
-        if len(non_alcoholic_items) < num_non_alc:
-            num_non_alc = len(non_alcoholic_items)
-            num_alc = k - num_non_alc
-        
-        # Alkoholische Gruppe
-        alc_names = [x[0] for x in alcoholic_items]
-        alc_profiles = np.array([x[1] for x in alcoholic_items])
-        autoencoder_alc = build_and_train_autoencoder(alc_profiles)
-        reconstructed_profile_alc = autoencoder_alc.predict(np.array([user_profile]))[0]
-        final_mix_alc = create_mix_profile(reconstructed_profile_alc, alc_profiles, alc_names, num_alc, total_volume=total_volume * 0.3)
-        
-        # Nicht-alkoholische Gruppe
-        non_alc_names = [x[0] for x in non_alcoholic_items]
-        non_alc_profiles = np.array([x[1] for x in non_alcoholic_items])
-        autoencoder_non_alc = build_and_train_autoencoder(non_alc_profiles)
-        reconstructed_profile_non_alc = autoencoder_non_alc.predict(np.array([user_profile]))[0]
-        final_mix_non_alc = create_mix_profile(reconstructed_profile_non_alc, non_alc_profiles, non_alc_names, num_non_alc, total_volume=total_volume * 0.7)
-        
-        # Beide Gruppen kombinieren
-        final_mix = {**final_mix_alc, **final_mix_non_alc}
+    # Berechnung des Vorschlags (ohne die Eingaben) als eine Anfrage erfassen
+    with TRACER.request("suggestion"):
+        if groups is None:
+            groups = load_ingredient_groups(data)
+        final_mix, reconstructed_profile_alc, reconstructed_profile = suggest_from_answers(data, groups, answers, alc_pref == "a", k)
+    if final_mix is None:
+        print("Keine passenden Zutaten gefunden!")
+        return
     
     # Ergebnis ausgeben
     print("\n---------- ERGEBNIS ----------")
@@ -300,7 +1005,7 @@ def questionnaire_and_cocktail_generator(data):
         print(f"Rekonstruiertes Profil (Autoencoder): {reconstructed_profile}")
     else:
         print(f"Rekonstruiertes Profil (alkoholisch): {reconstructed_profile_alc}")
-        print(f"Rekonstruiertes Profil (nicht-alkoholisch): {reconstructed_profile_non_alc}")
+        print(f"Rekonstruiertes Profil (nicht-alkoholisch): {reconstructed_profile}")
     print(f"\nVariante: {'alkoholisch' if alc_pref=='a' else 'nicht-alkoholisch'}")
     print(f"Mischung aus genau {k} Zutaten:")
     for ingr, vol in final_mix.items():
@@ -322,11 +1027,72 @@ def questionnaire_and_cocktail_generator(data):
         except ValueError:
             print("Ungültige Eingabe, es wird keine Bewertung gespeichert.")
 
+def report_startup_time(with_ml=False):
+    """
+    Startzeit-Messung: Zeit bis zum Menü und die teuersten Importe
+    (über 'python -X importtime'). Mit with_ml=True wird zusätzlich gemessen,
+    wie lange der Import von TensorFlow/Keras dauert.
+    """
+    import_ms = (time.perf_counter() - _START_TIME) * 1000
+    t = time.perf_counter()
+    data = load_cocktail_data()
+    load_ingredient_groups(data, load_catalog(DATA_PATH))
+    load_ms = (time.perf_counter() - t) * 1000
+    
+    print("\n--- Startzeit ---")
+    print(f"Import cocktail_code:      {import_ms:8.1f} ms")
+    print(f"Daten + Zutatengruppen:    {load_ms:8.1f} ms")
+    print(f"Bis zum Menü:              {import_ms + load_ms:8.1f} ms")
+    
+    # Import-Zeiten pro Modul (kumuliert, in einem frischen Interpreter gemessen)
+    code_dir = os.path.dirname(os.path.abspath(__file__))
+    result = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", "import cocktail_code"],
+        cwd=code_dir, capture_output=True, text=True,
+    )
+    imports = []
+    for line in result.stderr.splitlines():
+        parts = line.split("|")
+        if len(parts) == 3 and parts[1].strip().isdigit():
+            name = parts[2].rstrip()
+            # Nur Module, die cocktail_code direkt importiert (Einrückung: 2 Leerzeichen pro Ebene)
+            depth = (len(name) - len(name.lstrip()) - 1) // 2
+            if depth == 1:
+                imports.append((int(parts[1]) / 1000, name.strip()))
+    print("\nTeuerste Importe von cocktail_code (kumuliert):")
+    for ms, name in sorted(imports, reverse=True)[:10]:
+        print(f"  {name:<30} {ms:8.1f} ms")
+    
+    if with_ml:
+        t = time.perf_counter()
+        importlib.import_module("tensorflow.keras")
+        print(f"\nImport TensorFlow/Keras:   {(time.perf_counter() - t) * 1000:8.1f} ms")
+
+
 ##############################################################################
 # 6) MENÜ INTEGRIEREN (HAUPTTEIL)
 ##############################################################################
 if __name__ == "__main__":
+    if "--startup-time" in sys.argv:
+        report_startup_time(with_ml="--with-ml" in sys.argv)
+        sys.exit(0)
+    
+    if TRACER.export_path:
+        # Messwerte beim Beenden schreiben (COCKTAIL_TRACE, siehe tracing.py)
+        atexit.register(TRACER.export)
+    
     data = load_cocktail_data()
+    groups = load_ingredient_groups(data, load_catalog(DATA_PATH))
+    if "--materialize" in sys.argv:
+        t = time.perf_counter()
+        n = materialize_answer_table(data, groups)
+        print(f"{n} Vorschläge vorberechnet in {time.perf_counter() - t:.1f} s "
+              f"(Antworttabelle: {len(get_answer_table(data))} Einträge)")
+        sys.exit(0)
+    if "--warm-up" in sys.argv:
+        warm_up(groups)
+    # Neu berechnete Vorschläge beim Beenden in der Antworttabelle speichern
+    atexit.register(save_answer_table)
     
     while True:
         print("\n--- Willkommen beim Cocktail-Generator ---")
@@ -338,13 +1104,13 @@ if __name__ == "__main__":
 
         if choice == "1":
             # Neuen Cocktail erstellen
-            questionnaire_and_cocktail_generator(data)
+            questionnaire_and_cocktail_generator(data, groups)
         elif choice == "2":
             # Bewertungen anzeigen
             show_ratings()
         elif choice == "3":
-            # Rezeptdatenbank erweitern (Platzhalter)
-            print("Funktion 'Rezeptdatenbank erweitern' ist noch nicht implementiert.")
+            # Rezeptdatenbank erweitern (neue Zutat)
+            extend_catalog_dialog(data, groups)
         elif choice == "4":
             print("Programm wird beendet. Vielen Dank!")
             break
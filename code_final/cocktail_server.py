@@ -0,0 +1,264 @@
+"""
+Lokaler HTTP-Dienst für Cocktailvorschläge (asyncio, nur Standardbibliothek + NumPy).
+
+Bisher bedeutete jedes Bar-Terminal einen eigenen Prozess mit eigenem Modell.
+Dieser Dienst lädt Katalog und Autoencoder einmal und bedient beliebig viele
+Verbindungen:
+  - Ergebnisse werden über das quantisierte Profil gecacht (result_cache.py),
+    ein Treffer braucht weder Worker noch Batch; gleichzeitige Fehltreffer für
+    denselben Schlüssel warten auf dieselbe laufende Berechnung
+  - gleichzeitige /mix-Anfragen werden zu Micro-Batches zusammengefasst
+    (ein 'predict' und ein Least-Squares pro Zutatengruppe und Batch,
+    siehe micro_batcher.py)
+  - die Berechnung eines Batches läuft in einem Worker-Pool, damit die
+    Event-Loop frei bleibt
+  - Bewertungen werden in einem Thread an den Ratings-Log angehängt
+
+Endpunkte:
+  GET  /questions  Fragen des Fragebogens
+  POST /mix        {"answers": ["1", "2", ...]} oder {"profile": [5 Werte]},
+                   optional "k" (Standard 3) und "alcoholic" (Standard false)
+  POST /rating     {"user_profile": [...], "cocktail_mix": {...}, "rating": 1..5}
+  GET  /stats      Anzahl Anfragen, Füllgrad der Batches, Wartezeiten, Cache-Statistik
+                   (inkl. "coalesced": Anfragen, die auf eine laufende Berechnung gewartet haben)
+  GET  /health
+
+Aufruf (aus dem Projektordner):
+    python code_final/cocktail_server.py --port 8080 --workers 2
+Last erzeugen: python code_final/load_generator.py --port 8080
+"""
+
+import argparse
+import asyncio
+import json
+import logging
+import multiprocessing
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+from datetime import datetime
+
+import numpy as np
+
+from catalog_compiler import load_catalog
+from micro_batcher import MicroBatcher
+from cocktail_code import (
+    DATA_PATH,
+    MODEL_CACHE,
+    get_autoencoders,
+    load_cocktail_data,
+    load_ingredient_groups,
+    profile_from_answers,
+    recommend_batch,
+)
+from ratings_store import append_rating
+from result_cache import ResultCache
+
+
+LOG = logging.getLogger(__name__)
+
+
+##############################################################################
+# Worker-Prozesse
+##############################################################################
+
+_WORKER_STATE = {}
+
+
+def _init_worker():
+    # Jeder Worker mappt denselben kompilierten Katalog, die Autoencoder kommen aus dem Cache
+    data = load_cocktail_data()
+    _WORKER_STATE["data"] = data
+    _WORKER_STATE["groups"] = load_ingredient_groups(data, load_catalog(DATA_PATH))
+
+
+def _solve_batch(items):
+    # items: Liste von (Profil, k, alkoholisch) aus dem MicroBatcher
+    if not _WORKER_STATE:
+        _init_worker()
+    profiles = np.array([item[0] for item in items])
+    ks = np.array([item[1] for item in items])
+    alcoholic = np.array([item[2] for item in items])
+    return recommend_batch(_WORKER_STATE["data"], profiles, ks, alcoholic, groups=_WORKER_STATE["groups"])
+
+
+##############################################################################
+# Dienst
+##############################################################################
+
+class CocktailService:
+    def __init__(self, workers=2, max_batch=32, max_wait=0.005, cache=None):
+        # Der Dienst lädt die Daten nur beim Start: Gecachte Ergebnisse gehören zu
+        # dieser Version, auch wenn die JSON-Datei später bearbeitet wird
+        self.data_version = MODEL_CACHE.data_version()
+        self.data = load_cocktail_data()
+        self.groups = load_ingredient_groups(self.data, load_catalog(DATA_PATH))
+        self.workers = workers
+        self.max_batch = max_batch
+        self.max_wait = max_wait
+        self.pool = None
+        self.batcher = None
+        self.io_pool = ThreadPoolExecutor(max_workers=2)
+        self.cache = cache if cache is not None else ResultCache()
+        self.pending = {}  # Schlüssel -> laufende Berechnung (asyncio.Task)
+        self.coalesced = 0
+        self.requests = 0
+
+    def warm_up(self):
+        """
+        Stellt sicher, dass beide Autoencoder trainiert im Cache liegen (ggf. mit
+        TensorFlow, beide Gruppen parallel), bevor die Worker starten. Danach
+        brauchen Worker kein TensorFlow. Die Worker werden mit 'spawn' gestartet,
+        da TensorFlow hier eventuell schon importiert wurde und einen fork nicht
+        zuverlässig übersteht (wie in parallel_training.py).
+        """
+        get_autoencoders([profiles for names, profiles, _ in self.groups.values() if names])
+        if self.workers > 0:
+            self.pool = ProcessPoolExecutor(
+                max_workers=self.workers,
+                mp_context=multiprocessing.get_context("spawn"),
+                initializer=_init_worker,
+            )
+        else:
+            _WORKER_STATE.update(data=self.data, groups=self.groups)
+            self.pool = ThreadPoolExecutor(max_workers=1)
+        self.batcher = MicroBatcher(_solve_batch, self.max_batch, self.max_wait, executor=self.pool)
+
+    def _parse_mix_request(self, payload):
+        if "profile" in payload:
+            profile = np.asarray(payload["profile"], dtype=float)
+            if profile.shape != (5,):
+                raise ValueError("'profile' muss genau 5 Werte enthalten.")
+        elif "answers" in payload:
+            answers = [str(a) for a in payload["answers"]]
+            if len(answers) != len(self.data["questions"]):
+                raise ValueError(f"'answers' muss {len(self.data['questions'])} Antworten enthalten.")
+            profile = profile_from_answers(self.data["questions"], answers)
+        else:
+            raise ValueError("'answers' oder 'profile' fehlt.")
+        k = int(payload.get("k", 3))
+        if k <= 0:
+            raise ValueError("'k' muss mindestens 1 sein.")
+        return profile, k, bool(payload.get("alcoholic", False))
+
+    async def _compute_mix(self, key, cell, k, alcoholic):
+        try:
+            mix = await asyncio.wrap_future(self.batcher.submit((cell, k, alcoholic)))
+            self.cache.put(key, mix)
+            return mix
+        finally:
+            del self.pending[key]
+
+    async def mix(self, profile, k, alcoholic):
+        """
+        Mischung für ein Profil: aus dem Cache, sonst über den MicroBatcher. Läuft
+        für den Schlüssel bereits eine Berechnung, wird auf deren Ergebnis gewartet.
+        """
+        key, cell = self.cache.quantize(profile, k, alcoholic, self.data_version)
+        mix = self.cache.get(key)
+        if mix is not None:
+            return mix
+        task = self.pending.get(key)
+        if task is None:
+            task = self.pending[key] = asyncio.ensure_future(self._compute_mix(key, cell, k, alcoholic))
+        else:
+            self.coalesced += 1
+        # shield: bricht ein wartender Client ab, läuft die Berechnung für die anderen weiter
+        return await asyncio.shield(task)
+
+    async def route(self, method, path, body):
+        self.requests += 1
+        if method == "GET" and path == "/health":
+            return 200, {"status": "ok"}
+        if method == "GET" and path == "/questions":
+            return 200, {"taste_labels": self.data.get("taste_labels"), "questions": self.data["questions"]}
+        if method == "GET" and path == "/stats":
+            return 200, {"requests": self.requests, **self.batcher.metrics.snapshot(),
+                         "cache": {**self.cache.stats(), "coalesced": self.coalesced}}
+        if method == "POST" and path == "/mix":
+            profile, k, alcoholic = self._parse_mix_request(json.loads(body or b"{}"))
+            mix = await self.mix(profile, k, alcoholic)
+            return 200, {"user_profile": profile.tolist(), "cocktail_mix": mix}
+        if method == "POST" and path == "/rating":
+            payload = json.loads(body or b"{}")
+            rating = int(payload["rating"])
+            if rating < 1 or rating > 5:
+                raise ValueError("'rating' muss zwischen 1 und 5 liegen.")
+            entry = {
+                "timestamp": datetime.now().isoformat(timespec="seconds"),
+                "user_profile": [float(x) for x in payload["user_profile"]],
+                "cocktail_mix": payload["cocktail_mix"],
+                "rating": rating,
+            }
+            await asyncio.get_running_loop().run_in_executor(self.io_pool, append_rating, entry)
+            return 201, {"status": "gespeichert"}
+        return 404, {"error": f"Unbekannter Pfad: {method} {path}"}
+
+    async def handle_connection(self, reader, writer):
+        try:
+            while True:
+                request_line = await reader.readline()
+                if not request_line:
+                    break
+                method, path, _ = request_line.decode("latin-1").split(" ", 2)
+                headers = {}
+                while True:
+                    line = await reader.readline()
+                    if line in (b"\r\n", b"\n", b""):
+                        break
+                    name, _, value = line.decode("latin-1").partition(":")
+                    headers[name.strip().lower()] = value.strip()
+                body = await reader.readexactly(int(headers.get("content-length", 0)))
+
+                try:
+                    status, payload = await self.route(method, path.split("?", 1)[0], body)
+                except (ValueError, KeyError, TypeError) as exc:
+                    status, payload = 400, {"error": str(exc)}
+                except Exception:
+                    # z.B. ein abgestürzter Worker: protokollieren, die Verbindung bleibt nutzbar
+                    LOG.exception("Fehler bei %s %s", method, path)
+                    status, payload = 500, {"error": "Interner Fehler"}
+
+                response = json.dumps(payload, ensure_ascii=False).encode("utf-8")
+                keep_alive = headers.get("connection", "").lower() != "close"
+                writer.write(
+                    f"HTTP/1.1 {status} {'OK' if status < 400 else 'Error'}\r\n"
+                    f"Content-Type: application/json; charset=utf-8\r\n"
+                    f"Content-Length: {len(response)}\r\n"
+                    f"Connection: {'keep-alive' if keep_alive else 'close'}\r\n\r\n".encode("latin-1")
+                    + response
+                )
+                await writer.drain()
+                if not keep_alive:
+                    break
+        except (ConnectionError, asyncio.IncompleteReadError, ValueError):
+            pass
+        finally:
+            writer.close()
+
+    async def serve(self, host="127.0.0.1", port=8080):
+        server = await asyncio.start_server(self.handle_connection, host, port)
+        print(f"Cocktail-Dienst läuft auf http://{host}:{port}")
+        async with server:
+            await server.serve_forever()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Lokaler HTTP-Dienst für Cocktailvorschläge")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8080)
+    parser.add_argument("--workers", type=int, default=2, help="Worker-Prozesse (0 = Thread im Hauptprozess)")
+    parser.add_argument("--max-batch", type=int, default=32)
+    parser.add_argument("--max-wait-ms", type=float, default=5.0)
+    parser.add_argument("--cache-step", type=float, default=0.02, help="Rasterweite für das Profil")
+    parser.add_argument("--cache-size", type=int, default=10000, help="höchstens so viele Ergebnisse")
+    parser.add_argument("--cache-mb", type=float, default=16.0, help="höchstens so viel Speicher (geschätzt)")
+    parser.add_argument("--cache-ttl", type=float, default=None, help="Lebensdauer eines Ergebnisses in s")
+    args = parser.parse_args()
+
+    logging.basicConfig(level=logging.INFO, format="%(asctime)s %(levelname)s %(name)s: %(message)s")
+    cache = ResultCache(args.cache_step, args.cache_size, int(args.cache_mb * 1024 * 1024), args.cache_ttl)
+    service = CocktailService(args.workers, args.max_batch, args.max_wait_ms / 1000, cache)
+    service.warm_up()
+    try:
+        asyncio.run(service.serve(args.host, args.port))
+    except KeyboardInterrupt:
+        print("Dienst beendet.")
@@ -0,0 +1,109 @@
+"""
+Vergleich von Keras-Autoencoder und PCA-Projektion (projection_engine.py).
+
+Für jede Zutatengruppe und jedes Verfahren wird gemessen:
+  - Zeit bis einsatzbereit (Training mit Early Stopping bzw. SVD, ohne Cache)
+  - Rekonstruktionsfehler (MSE) auf den Zutatenprofilen
+  - Qualität der Mischung: RMSE zwischen dem Geschmack der fertigen Mischung
+    und dem Nutzerprofil, für zufällige Fragebogen-Antworten
+
+Mit '--baseline' wird zusätzlich der Autoencoder wie vor dem Early Stopping
+trainiert (500 Epochen, batch_size 4, Lernrate 0.001), um den Loss vorher/nachher
+zu vergleichen. Ist TensorFlow nicht installiert, wird der Autoencoder übersprungen.
+
+Aufruf (aus dem Projektordner):
+    python code_final/compare_encoders.py
+    python code_final/compare_encoders.py --users 1000 --k 4 --epochs 300
+    python code_final/compare_encoders.py --baseline --seed 1
+"""
+
+import argparse
+import time
+
+import numpy as np
+
+from cocktail_code import (
+    MAX_EPOCHS,
+    build_autoencoder,
+    create_mix_profiles,
+    load_cocktail_data,
+    load_ingredient_groups,
+    profile_from_answers,
+    train_numpy_autoencoder,
+)
+from numpy_autoencoder import NumpyAutoencoder
+from projection_engine import PCAProjection
+
+
+def random_user_profiles(questions, n_users, rng):
+    answers = rng.choice(["1", "2"], size=(n_users, len(questions)))
+    return np.array([profile_from_answers(questions, row) for row in answers])
+
+
+def train_baseline_autoencoder(profiles, latent_dim=3, epochs=500, batch_size=4):
+    # Training wie ursprünglich: feste Epochenzahl, Mini-Batches, Lernrate 0.001
+    autoencoder = build_autoencoder(profiles.shape[1], latent_dim)
+    autoencoder.fit(profiles, profiles, epochs=epochs, batch_size=batch_size, verbose=0)
+    return NumpyAutoencoder.from_keras(autoencoder)
+
+
+def mix_rmse(model, user_profiles, names, profiles, solver, k, total_volume=200.0):
+    # Geschmack der Mischung = volumengewichtetes Mittel der Zutatenprofile
+    mixes = create_mix_profiles(model.predict(user_profiles), profiles, names, k, total_volume, solver=solver)
+    index = {name: i for i, name in enumerate(names)}
+    weights = np.zeros((len(mixes), len(names)))
+    for row, mix in enumerate(mixes):
+        for name, ml in mix.items():
+            weights[row, index[name]] = ml / total_volume
+    return float(np.sqrt(np.mean((weights @ profiles - user_profiles) ** 2)))
+
+
+def compare(data, n_users=500, k=3, latent_dim=3, epochs=MAX_EPOCHS, batch_size=None, with_keras=True, seed=0, baseline=False):
+    rng = np.random.default_rng(seed)
+    user_profiles = random_user_profiles(data["questions"], n_users, rng)
+    groups = load_ingredient_groups(data)
+
+    engines = [
+        ("pca", lambda p: PCAProjection.fit(p, latent_dim)),
+        ("pca_sigmoid", lambda p: PCAProjection.fit(p, latent_dim, sigmoid=True)),
+    ]
+    if with_keras:
+        try:
+            import tensorflow
+            tensorflow.keras.utils.set_random_seed(seed)
+            engines.insert(0, ("autoencoder", lambda p: train_numpy_autoencoder(p, latent_dim, epochs, batch_size)))
+            if baseline:
+                engines.insert(0, ("ae_baseline", lambda p: train_baseline_autoencoder(p, latent_dim)))
+        except ImportError:
+            print("TensorFlow ist nicht installiert, der Autoencoder wird übersprungen.")
+
+    results = []
+    for alcoholic, (names, profiles, solver) in groups.items():
+        if not names:
+            continue
+        for engine, fit in engines:
+            start = time.perf_counter()
+            model = fit(profiles)
+            ready_ms = (time.perf_counter() - start) * 1000
+            mse = float(np.mean((model.predict(profiles) - profiles) ** 2))
+            rmse = mix_rmse(model, user_profiles, names, profiles, solver, min(k, len(names)))
+            results.append(("alkoholisch" if alcoholic else "nicht-alkoholisch", engine, ready_ms, mse, rmse))
+    return results
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Vergleich Autoencoder vs. PCA-Projektion")
+    parser.add_argument("--users", type=int, default=500)
+    parser.add_argument("--k", type=int, default=3)
+    parser.add_argument("--latent-dim", type=int, default=3)
+    parser.add_argument("--epochs", type=int, default=MAX_EPOCHS, help="Obergrenze (Early Stopping)")
+    parser.add_argument("--no-keras", action="store_true", help="Autoencoder nicht trainieren")
+    parser.add_argument("--baseline", action="store_true", help="auch wie ursprünglich trainieren (500 Epochen, ohne Early Stopping)")
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args()
+
+    results = compare(load_cocktail_data(), args.users, args.k, args.latent_dim, args.epochs,
+                      with_keras=not args.no_keras, seed=args.seed, baseline=args.baseline)
+    print(f"{'Gruppe':<18} {'Verfahren':<12} {'bereit nach':>12} {'MSE Zutaten':>12} {'RMSE Mischung':>14}")
+    for group, engine, ready_ms, mse, rmse in results:
+        print(f"{group:<18} {engine:<12} {ready_ms:>9.2f} ms {mse:>12.5f} {rmse:>14.4f}")
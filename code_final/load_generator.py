@@ -0,0 +1,101 @@
+"""
+Lastgenerator für den lokalen Cocktail-Dienst (cocktail_server.py).
+
+Öffnet mehrere gleichzeitige Verbindungen (Keep-Alive) und schickt zufällige
+Fragebogen-Antworten an POST /mix. Am Ende werden Durchsatz, Latenzen
+(Median, p95, p99) und die Batch-Statistik des Dienstes ausgegeben.
+
+Aufruf (aus dem Projektordner, Dienst muss laufen):
+    python code_final/load_generator.py --port 8080 --connections 50 --requests 2000
+"""
+
+import argparse
+import asyncio
+import json
+import random
+import time
+
+
+async def _request(reader, writer, method, path, payload=None):
+    body = json.dumps(payload).encode("utf-8") if payload is not None else b""
+    writer.write(
+        f"{method} {path} HTTP/1.1\r\nHost: localhost\r\n"
+        f"Content-Type: application/json\r\nContent-Length: {len(body)}\r\n\r\n".encode("latin-1")
+        + body
+    )
+    await writer.drain()
+    status_line = await reader.readline()
+    headers = {}
+    while True:
+        line = await reader.readline()
+        if line in (b"\r\n", b"\n", b""):
+            break
+        name, _, value = line.decode("latin-1").partition(":")
+        headers[name.strip().lower()] = value.strip()
+    data = await reader.readexactly(int(headers.get("content-length", 0)))
+    return int(status_line.split()[1]), json.loads(data)
+
+
+async def _client(host, port, n_requests, n_questions, latencies, errors, rate_fraction):
+    reader, writer = await asyncio.open_connection(host, port)
+    try:
+        for _ in range(n_requests):
+            payload = {
+                "answers": [random.choice("12") for _ in range(n_questions)],
+                "k": random.randint(2, 6),
+                "alcoholic": random.random() < 0.5,
+            }
+            start = time.perf_counter()
+            status, result = await _request(reader, writer, "POST", "/mix", payload)
+            latencies.append(time.perf_counter() - start)
+            if status != 200:
+                errors.append(result)
+                continue
+            if random.random() < rate_fraction:
+                await _request(reader, writer, "POST", "/rating", {
+                    "user_profile": result["user_profile"],
+                    "cocktail_mix": result["cocktail_mix"],
+                    "rating": random.randint(1, 5),
+                })
+    finally:
+        writer.close()
+
+
+async def run_load(host, port, connections, total_requests, rate_fraction=0.0):
+    reader, writer = await asyncio.open_connection(host, port)
+    _, questionnaire = await _request(reader, writer, "GET", "/questions")
+    n_questions = len(questionnaire["questions"])
+
+    latencies, errors = [], []
+    per_client = max(1, total_requests // connections)
+    start = time.perf_counter()
+    await asyncio.gather(*(
+        _client(host, port, per_client, n_questions, latencies, errors, rate_fraction)
+        for _ in range(connections)
+    ))
+    elapsed = time.perf_counter() - start
+
+    _, stats = await _request(reader, writer, "GET", "/stats")
+    writer.close()
+
+    latencies.sort()
+    def percentile(p):
+        return latencies[min(len(latencies) - 1, int(p * len(latencies)))] * 1000
+
+    print(f"Anfragen:        {len(latencies)} ({len(errors)} Fehler) über {connections} Verbindungen")
+    print(f"Durchsatz:       {len(latencies) / elapsed:.1f} Vorschläge/s")
+    print(f"Latenz Median:   {percentile(0.5):.2f} ms")
+    print(f"Latenz p95:      {percentile(0.95):.2f} ms")
+    print(f"Latenz p99:      {percentile(0.99):.2f} ms")
+    print(f"Dienst:          {json.dumps(stats, ensure_ascii=False)}")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Lastgenerator für cocktail_server.py")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8080)
+    parser.add_argument("--connections", type=int, default=50)
+    parser.add_argument("--requests", type=int, default=2000)
+    parser.add_argument("--rate-fraction", type=float, default=0.0, help="Anteil der Vorschläge, die bewertet werden")
+    args = parser.parse_args()
+    asyncio.run(run_load(args.host, args.port, args.connections, args.requests, args.rate_fraction))
@@ -0,0 +1,173 @@
+"""
+Micro-Batching für die Modell-Inferenz.
+
+Wenn viele Gäste gleichzeitig ihren Fragebogen abschicken, ist ein 'predict'
+mit einem einzelnen Profil die ineffizienteste Art, das Modell zu nutzen.
+'MicroBatcher' sammelt eingehende Anfragen in einer Warteschlange und
+verarbeitet sie gemeinsam, sobald
+  - 'max_batch_size' Anfragen warten (Durchsatz) oder
+  - die älteste Anfrage 'max_wait' Sekunden gewartet hat (Latenz).
+Die Ergebnisse werden über Futures an die jeweiligen Aufrufer verteilt.
+
+'BatchedPredictor' ist ein MicroBatcher für genau ein Modell (eine
+Zutatengruppe): ein 'predict' pro Flush.
+
+Gemessen werden Füllgrad der Batches, Wartezeit in der Schlange und der
+Grund für jeden Flush (voll / Frist abgelaufen).
+"""
+
+import threading
+import time
+from collections import deque
+from concurrent.futures import Future
+
+import numpy as np
+
+
+class BatchMetrics:
+    def __init__(self, max_batch_size, window=10000):
+        self.max_batch_size = max_batch_size
+        self.batches = 0
+        self.items = 0
+        self.full_flushes = 0
+        self.deadline_flushes = 0
+        # Wartezeiten der letzten 'window' Anfragen (für Perzentile)
+        self._queue_delays = deque(maxlen=window)
+        self._lock = threading.Lock()
+
+    def record(self, batch_size, queue_delays, full):
+        with self._lock:
+            self.batches += 1
+            self.items += batch_size
+            if full:
+                self.full_flushes += 1
+            else:
+                self.deadline_flushes += 1
+            self._queue_delays.extend(queue_delays)
+
+    def snapshot(self):
+        with self._lock:
+            delays = np.array(self._queue_delays) * 1000
+            batches = self.batches
+            return {
+                "batches": batches,
+                "items": self.items,
+                "mean_batch_size": self.items / batches if batches else 0.0,
+                "fill_rate": self.items / (batches * self.max_batch_size) if batches else 0.0,
+                "full_flushes": self.full_flushes,
+                "deadline_flushes": self.deadline_flushes,
+                "queue_delay_ms_mean": float(delays.mean()) if delays.size else 0.0,
+                "queue_delay_ms_p95": float(np.percentile(delays, 95)) if delays.size else 0.0,
+            }
+
+
+class MicroBatcher:
+    def __init__(self, run_batch, max_batch_size=32, max_wait=0.005, executor=None, name="micro-batcher"):
+        """
+        run_batch(items) -> Liste der Ergebnisse in derselben Reihenfolge.
+        executor: optionaler Executor (Thread-/Prozesspool), in dem die Batches laufen.
+                  Ohne Executor läuft jeder Batch im Hintergrund-Thread des Batchers.
+        """
+        self.run_batch = run_batch
+        self.max_batch_size = max_batch_size
+        self.max_wait = max_wait
+        self.executor = executor
+        self.metrics = BatchMetrics(max_batch_size)
+        self._queue = deque()
+        self._cond = threading.Condition()
+        self._closed = False
+        self._thread = threading.Thread(target=self._loop, name=name, daemon=True)
+        self._thread.start()
+
+    def submit(self, item):
+        """
+        Reiht eine Anfrage ein. Rückgabe: concurrent.futures.Future mit dem Ergebnis
+        (in asyncio: 'await asyncio.wrap_future(batcher.submit(item))').
+        """
+        future = Future()
+        with self._cond:
+            if self._closed:
+                raise RuntimeError("MicroBatcher wurde bereits geschlossen.")
+            self._queue.append((item, future, time.perf_counter()))
+            if len(self._queue) == 1 or len(self._queue) >= self.max_batch_size:
+                self._cond.notify()
+        return future
+
+    def __call__(self, item):
+        """
+        Blockierende Variante von 'submit'.
+        """
+        return self.submit(item).result()
+
+    def _loop(self):
+        while True:
+            with self._cond:
+                while not self._queue and not self._closed:
+                    self._cond.wait()
+                if not self._queue:
+                    return
+                # Warten, bis der Batch voll ist oder die älteste Anfrage ihre Frist erreicht
+                deadline = self._queue[0][2] + self.max_wait
+                while len(self._queue) < self.max_batch_size and not self._closed:
+                    remaining = deadline - time.perf_counter()
+                    if remaining <= 0:
+                        break
+                    self._cond.wait(remaining)
+                n = min(len(self._queue), self.max_batch_size)
+                batch = [self._queue.popleft() for _ in range(n)]
+            self._dispatch(batch)
+
+    def _dispatch(self, batch):
+        now = time.perf_counter()
+        self.metrics.record(len(batch), [now - submitted for _, _, submitted in batch], len(batch) == self.max_batch_size)
+        items = [item for item, _, _ in batch]
+        if self.executor is not None:
+            try:
+                future = self.executor.submit(self.run_batch, items)
+            except Exception as exc:
+                self._fan_out(batch, None, exc)
+                return
+            future.add_done_callback(lambda f: self._fan_out(batch, *self._outcome(f)))
+        else:
+            try:
+                self._fan_out(batch, self.run_batch(items), None)
+            except Exception as exc:
+                self._fan_out(batch, None, exc)
+
+    @staticmethod
+    def _outcome(future):
+        exc = future.exception()
+        return (None, exc) if exc is not None else (future.result(), None)
+
+    @staticmethod
+    def _fan_out(batch, results, exc):
+        for i, (_, future, _) in enumerate(batch):
+            if exc is not None:
+                future.set_exception(exc)
+            else:
+                future.set_result(results[i])
+
+    def close(self):
+        """
+        Verarbeitet noch wartende Anfragen und beendet den Hintergrund-Thread.
+        """
+        with self._cond:
+            self._closed = True
+            self._cond.notify()
+        self._thread.join()
+
+
+class BatchedPredictor(MicroBatcher):
+    """
+    Fasst einzelne 'predict'-Aufrufe eines Modells zusammen.
+
+        predictor = BatchedPredictor(get_autoencoder(profiles), max_batch_size=64)
+        reconstructed = predictor(user_profile)   # shape=(5,)
+    """
+
+    def __init__(self, model, max_batch_size=32, max_wait=0.005, executor=None):
+        self.model = model
+        super().__init__(self._predict_batch, max_batch_size, max_wait, executor, name="batched-predictor")
+
+    def _predict_batch(self, profiles):
+        return list(self.model.predict(np.stack(profiles)))
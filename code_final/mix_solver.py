@@ -0,0 +1,423 @@
+"""
+Löser für den Mischungsschritt (Least Squares) in 'cocktail_code.py'.
+
+Die Matrix A = ingredient_profiles.T (shape=(features, M)) ist pro Zutatengruppe
+immer dieselbe, nur das Zielprofil b ändert sich. Statt für jede Anfrage
+'np.linalg.lstsq' aufzurufen (und A jedes Mal neu zu zerlegen), wird die
+Pseudoinverse einmalig beim Laden berechnet. Eine Lösung ist danach nur noch
+eine Matrixmultiplikation, auch für viele Zielprofile auf einmal.
+"""
+
+import numpy as np
+
+
+class PinvSolver:
+    """
+    Least-Squares mit vorberechneter Pseudoinverse.
+
+    Liefert dieselbe Lösung wie 'np.linalg.lstsq(A, b, rcond=None)' (bei
+    unterbestimmtem A die Lösung mit minimaler Norm).
+    """
+
+    def __init__(self, ingredient_profiles):
+        A = np.asarray(ingredient_profiles, dtype=float).T  # shape (features, M)
+        # Gleiche Grenze für kleine Singulärwerte wie lstsq mit rcond=None
+        rcond = np.finfo(A.dtype).eps * max(A.shape)
+        self.pinv = np.linalg.pinv(A, rcond)  # shape (M, features)
+        self.A = A
+        self.n_ingredients = A.shape[1]
+
+    def add_profile(self, profile):
+        """
+        Ergänzt eine Zutat (Spalte von A) und aktualisiert die Pseudoinverse
+        inkrementell nach Greville, statt sie neu zu berechnen.
+        """
+        a = np.asarray(profile, dtype=float)
+        d = self.pinv @ a
+        c = a - self.A @ d
+        if np.linalg.norm(c) > 1e-10 * max(1.0, np.linalg.norm(a)):
+            # a liegt nicht im Spaltenraum von A
+            b = c / (c @ c)
+        else:
+            b = (self.pinv.T @ d) / (1.0 + d @ d)
+        self.pinv = np.vstack([self.pinv - np.outer(d, b), b])
+        self.A = np.column_stack([self.A, a])
+        self.n_ingredients += 1
+
+    def solve(self, targets):
+        """
+        targets: Zielprofil shape=(features,) oder mehrere Zielprofile shape=(N, features).
+        Rückgabe: Gewichte shape=(M,) bzw. shape=(N, M).
+        """
+        return np.asarray(targets, dtype=float) @ self.pinv.T
+
+
+##############################################################################
+# Nicht-negative, kardinalitätsbeschränkte Mischung
+##############################################################################
+#
+# Das Geschmacksprofil eines Cocktails ist der volumengewichtete Mittelwert der
+# Zutatenprofile. Gesucht sind daher Gewichte w mit
+#     min ||A w - b||   unter   w >= 0,  sum(w) = 1,  höchstens k Gewichte > 0.
+# Die Bedingung sum(w) = 1 wird als zusätzliche, stark gewichtete Zeile an A
+# angehängt, sodass alle Modi mit einem NNLS-Löser auskommen.
+
+SOLVER_MODES = ("lstsq", "nnls", "greedy", "pool", "beam")
+
+
+def nnls(A, b, tol=None, max_iter=None):
+    """
+    Non-Negative Least Squares nach Lawson-Hanson (Active-Set-Verfahren).
+
+    Löst min ||A x - b|| unter x >= 0 für A shape=(m, n), b shape=(m,).
+    Rückgabe: (x, Residuum ||A x - b||)
+    """
+    m, n = A.shape
+    if tol is None:
+        tol = 10 * np.finfo(float).eps * np.abs(A).sum(axis=0).max(initial=0.0) * max(m, n)
+    if max_iter is None:
+        max_iter = 3 * n
+
+    x = np.zeros(n)
+    passive = np.zeros(n, dtype=bool)
+    w = A.T @ b
+    iterations = 0
+
+    while not passive.all() and (w[~passive] > tol).any():
+        # Schutz vor Zyklen, wenn eine neue Variable numerisch sofort wieder herausfällt
+        iterations += 1
+        if iterations > max_iter:
+            break
+        j = np.argmax(np.where(passive, -np.inf, w))
+        passive[j] = True
+
+        s = np.zeros(n)
+        s[passive] = np.linalg.lstsq(A[:, passive], b, rcond=None)[0]
+
+        # Innere Schleife: Variablen mit s <= 0 aus der passiven Menge entfernen
+        while (s[passive] <= tol).any():
+            iterations += 1
+            if iterations > max_iter:
+                break
+            blocking = passive & (s <= tol)
+            alpha = np.min(x[blocking] / (x[blocking] - s[blocking]))
+            x += alpha * (s - x)
+            passive &= x > tol
+            x[~passive] = 0.0
+            s = np.zeros(n)
+            s[passive] = np.linalg.lstsq(A[:, passive], b, rcond=None)[0]
+
+        x = s
+        w = A.T @ (b - A @ x)
+        if iterations > max_iter:
+            break
+
+    return x, float(np.linalg.norm(A @ x - b))
+
+
+def _augment(ingredient_profiles, target, sum_weight):
+    # A shape (features + 1, M): letzte Zeile erzwingt sum(w) = 1
+    A = np.asarray(ingredient_profiles, dtype=float).T
+    A = np.vstack([A, np.full(A.shape[1], sum_weight)])
+    b = np.append(np.asarray(target, dtype=float), sum_weight)
+    return A, b
+
+
+def _forward_support(A, b, k):
+    """
+    Vorwärtsauswahl (Orthogonal Least Squares): In jedem Schritt wird für alle
+    Kandidaten gleichzeitig berechnet, wie stark das Residuum sinkt, wenn die Spalte
+    zur bisherigen Auswahl hinzukommt (vektorisiert, O(m * n) pro Schritt).
+    Nur Spalten mit positivem Gradienten kommen in Frage (Gewicht muss > 0 sein).
+    """
+    m, n = A.shape
+    support = []
+    x_support = np.zeros(0)
+    residual = b.copy()
+    for _ in range(min(k, n)):
+        if support:
+            Q, _ = np.linalg.qr(A[:, support])
+            A_orth = A - Q @ (Q.T @ A)
+        else:
+            A_orth = A
+        norms = np.einsum("ij,ij->j", A_orth, A_orth)
+        gradient = A.T @ residual
+        corr = A_orth.T @ residual
+        score = np.where((norms > 1e-12) & (gradient > 1e-12), corr ** 2 / np.maximum(norms, 1e-12), -np.inf)
+        score[support] = -np.inf
+        j = int(np.argmax(score))
+        if not np.isfinite(score[j]):
+            break
+        support.append(j)
+        x_support, _ = nnls(A[:, support], b)
+        residual = b - A[:, support] @ x_support
+    return support, x_support
+
+
+def _backward_support(A, b, k):
+    """
+    Rückwärtselimination: Startet mit der NNLS-Lösung ohne Kardinalitätsgrenze (sie
+    nutzt höchstens m Zutaten) und entfernt so lange die Zutat, deren Wegfall das
+    Residuum am wenigsten erhöht, bis nur noch k Zutaten übrig sind.
+    """
+    x, _ = nnls(A, b)
+    support = [int(j) for j in np.flatnonzero(x > 0)]
+    x_support = x[support]
+    while len(support) > k:
+        best = None
+        for i in range(len(support)):
+            reduced = support[:i] + support[i + 1:]
+            x_reduced, res = nnls(A[:, reduced], b)
+            if best is None or res < best[0]:
+                best = (res, reduced, x_reduced)
+        _, support, x_support = best
+    return support, x_support
+
+
+def _residual(A, b, support, x_support):
+    if not support:
+        return float(np.linalg.norm(b))
+    return float(np.linalg.norm(A[:, support] @ x_support - b))
+
+
+def _greedy_support(A, b, k):
+    """
+    Bessere der beiden Heuristiken (Vorwärtsauswahl / Rückwärtselimination).
+    """
+    candidates = [_forward_support(A, b, k), _backward_support(A, b, k)]
+    return min(candidates, key=lambda c: _residual(A, b, *c))
+
+
+def _pool_support(A, b, k, pool_size):
+    """
+    Branch and Bound über alle k-Teilmengen eines kleinen Kandidatenpools.
+
+    Der Pool besteht aus den Zutaten der NNLS-Lösung, der Greedy-Lösung und den
+    'pool_size' besten Zutaten nach Einzelresiduum. Ein Ast wird abgeschnitten,
+    sobald das NNLS-Residuum über (Auswahl + alle restlichen Kandidaten) nicht
+    mehr besser als die bisher beste Lösung sein kann.
+
+    Das ist eine Heuristik: Optimal ist das Ergebnis nur unter den Teilmengen des
+    Pools. Zutaten außerhalb des Pools werden nie betrachtet, die beste Mischung
+    des ganzen Katalogs kann daher fehlen (dann ist oft "beam" besser).
+    """
+    tol = 1e-9
+
+    # Startlösung: Greedy
+    best_support, best_x = _greedy_support(A, b, k)
+    best_res = _residual(A, b, best_support, best_x)
+
+    # Untere Schranke: NNLS ohne Kardinalitätsgrenze
+    x_full, global_bound = nnls(A, b)
+    if best_res <= global_bound + tol:
+        return best_support, best_x
+
+    # Kandidatenpool
+    norms = np.einsum("ij,ij->j", A, A)
+    scale = np.maximum(A.T @ b, 0) / np.maximum(norms, 1e-12)
+    single_res = np.linalg.norm(A * scale - b[:, None], axis=0)
+    pool = [int(j) for j in np.flatnonzero(x_full > 0)] + list(best_support)
+    for j in np.argsort(single_res)[:pool_size]:
+        pool.append(int(j))
+    pool = list(dict.fromkeys(pool))
+
+    def search(chosen, start):
+        nonlocal best_res, best_support, best_x
+        if best_res <= global_bound + tol:
+            return
+        if len(chosen) == k or start == len(pool):
+            if chosen:
+                x, res = nnls(A[:, chosen], b)
+                if res < best_res - tol:
+                    best_res, best_support, best_x = res, list(chosen), x
+            return
+        # Schranke: besser als mit allen restlichen Kandidaten geht es nicht
+        _, bound = nnls(A[:, chosen + pool[start:]], b)
+        if bound >= best_res - tol:
+            return
+        for i in range(start, len(pool)):
+            # Es müssen noch genug Kandidaten für k Zutaten übrig sein
+            if len(pool) - i < k - len(chosen):
+                break
+            search(chosen + [pool[i]], i + 1)
+
+    search([], 0)
+    return best_support, best_x
+
+
+def _solve_subsets(A, b, subsets):
+    """
+    Least Squares für viele kleine Teilmengen gleicher Größe auf einmal
+    (Normalgleichungen, ein gestapeltes np.linalg.solve für alle Teilmengen).
+    Negative Gewichte werden auf 0 gesetzt und die Gewichte auf Summe 1 normiert.
+
+    subsets shape=(N, s) mit Spaltenindizes von A.
+    Rückgabe: (Gewichte shape=(N, s), Residuen shape=(N,), Residuenvektoren b - A_S x shape=(N, m))
+    """
+    s = subsets.shape[1]
+    A_S = A.T[subsets]                        # shape (N, s, m)
+    G = A_S @ A_S.transpose(0, 2, 1)          # shape (N, s, s)
+    rhs = A_S @ b                             # shape (N, s)
+    # Kleine Regularisierung für linear abhängige Zutatenprofile
+    ridge = 1e-10 * np.trace(G, axis1=1, axis2=2)[:, None, None] * np.eye(s)
+    x = np.maximum(np.linalg.solve(G + ridge, rhs[..., None])[..., 0], 0)
+    total = x.sum(axis=1, keepdims=True)
+    x = np.where(total > 0, x / np.where(total > 0, total, 1.0), 1.0 / s)
+    R = b - np.einsum("nsm,ns->nm", A_S, x)
+    # Summe der Gewichte ist 1, die Zusatzzeile trägt also nichts zum Residuum bei
+    return x, np.linalg.norm(R, axis=1), R
+
+
+def _diverse_top(pool, n_results, max_shared):
+    """
+    Wählt die n_results besten Teilmengen, die paarweise höchstens 'max_shared'
+    Zutaten gemeinsam haben. Gibt es nicht genügend solche Teilmengen, wird mit
+    den nächstbesten (verschiedenen) aufgefüllt.
+    """
+    entries = []
+    for subsets, weights, residuals in pool:
+        for subset, x, residual in zip(subsets, weights, residuals):
+            entries.append((float(residual), subset, x))
+    entries.sort(key=lambda e: e[0])
+
+    seen, distinct = set(), []
+    for entry in entries:
+        key = frozenset(entry[1][entry[2] > 1e-9].tolist())
+        if key not in seen:
+            seen.add(key)
+            distinct.append((key, entry))
+
+    chosen = []
+    for key, entry in distinct:
+        if len(chosen) == n_results:
+            break
+        if all(len(key & other) <= max_shared for other, _ in chosen):
+            chosen.append((key, entry))
+    for key, entry in distinct:
+        if len(chosen) == n_results:
+            break
+        if all(key != other for other, _ in chosen):
+            chosen.append((key, entry))
+    chosen.sort(key=lambda c: c[1][0])
+    return [(support, x, residual) for _, (residual, support, x) in chosen]
+
+
+def beam_search_mixes(ingredient_profiles, target, k, n_results=5, beam_width=32, expand=16, max_shared=None, sum_weight=100.0):
+    """
+    Beam Search über Zutaten-Teilmengen mit höchstens k Zutaten.
+
+    Startzustände sind die besten Einzelzutaten und die Zutaten der NNLS-Lösung.
+    In jedem Schritt wird jeder der 'beam_width' besten Zustände um die 'expand'
+    Zutaten erweitert, die am stärksten mit seinem Residuum korrelieren (eine
+    Matrixmultiplikation für alle Zustände). Alle neuen Teilmengen werden
+    gemeinsam gelöst (_solve_subsets), doppelte Teilmengen nur einmal. Der
+    Aufwand pro Schritt hängt daher nur linear von der Größe des Katalogs ab.
+
+    max_shared: höchstens so viele gemeinsame Zutaten zwischen zwei Ergebnissen
+                (Standard: k - 2, mindestens 0)
+    Rückgabe: Liste mit bis zu n_results Tupeln (Zutatenindizes, Gewichte mit
+              Summe 1, Residuum), aufsteigend nach Residuum
+    """
+    A, b = _augment(ingredient_profiles, target, sum_weight)
+    n = A.shape[1]
+    k = min(int(k), n)
+    if k <= 0 or n_results <= 0:
+        return []
+    if max_shared is None:
+        max_shared = max(k - 2, 0)
+    norms = np.maximum(np.einsum("ij,ij->j", A, A), 1e-12)
+
+    # Startzustände: beste Einzelzutaten + Träger der NNLS-Lösung
+    single = np.linalg.norm(A[:-1].T - b[:-1], axis=1)
+    best_single = np.argpartition(single, min(beam_width, n) - 1)[:beam_width]
+    x_full, _ = nnls(A, b)
+    seeds = np.unique(np.concatenate([best_single, np.flatnonzero(x_full > 0)]))
+    subsets = seeds[:, None]
+    weights, residuals, R = _solve_subsets(A, b, subsets)
+    pool = [(subsets, weights, residuals)]
+
+    for size in range(2, k + 1):
+        keep = np.argsort(residuals)[:beam_width]
+        subsets, R = subsets[keep], R[keep]
+        rows = np.arange(len(subsets))[:, None]
+
+        # Nur Zutaten mit positivem Gradienten verringern das Residuum
+        gradient = R @ A
+        score = np.where(gradient > 1e-12, gradient ** 2 / norms, -np.inf)
+        score[rows, subsets] = -np.inf
+        e = min(expand, n - size + 1)
+        top = np.argpartition(-score, e - 1, axis=1)[:, :e]
+        valid = np.isfinite(score[rows, top]).ravel()
+        extended = np.column_stack([np.repeat(subsets, e, axis=0), top.ravel()])[valid]
+        if len(extended) == 0:
+            break
+
+        subsets = np.unique(np.sort(extended, axis=1), axis=0)
+        weights, residuals, R = _solve_subsets(A, b, subsets)
+        pool.append((subsets, weights, residuals))
+
+    # Gewählte Teilmengen mit NNLS nachbessern (Clipping ist für s > m nur eine Näherung)
+    results = []
+    for subset, x, residual in _diverse_top(pool, n_results, max_shared):
+        x_nnls, _ = nnls(A[:, subset], b)
+        if x_nnls.sum() > 0:
+            x_nnls /= x_nnls.sum()
+            residual_nnls = float(np.linalg.norm(A[:, subset] @ x_nnls - b))
+            if residual_nnls < residual:
+                x, residual = x_nnls, residual_nnls
+        active = x > 1e-9
+        results.append((subset[active], x[active], residual))
+    results.sort(key=lambda r: r[2])
+    return results
+
+
+def solve_mix_weights(ingredient_profiles, target, k, mode="greedy", sum_weight=100.0, pool_size=8):
+    """
+    Berechnet nicht-negative Mischgewichte mit höchstens k Zutaten, die sich zu 1 summieren.
+
+    mode:
+      - "nnls":   NNLS ohne Kardinalitätsgrenze, danach Top k (für k >= features + 1
+                  ist das bereits optimal, da NNLS höchstens so viele Zutaten nutzt)
+      - "greedy": Vorwärtsauswahl bzw. Rückwärtselimination ausgehend von NNLS,
+                  NNLS auf der gewählten Teilmenge
+      - "pool":   Branch and Bound über einen kleinen Kandidatenpool ('pool_size'),
+                  Heuristik (optimal nur innerhalb des Pools, siehe _pool_support)
+      - "beam":   beste Teilmenge der Beam Search (beam_search_mixes)
+
+    Rückgabe: (w shape=(M,), Residuum ||A w - b|| der normierten Mischung)
+    """
+    A, b = _augment(ingredient_profiles, target, sum_weight)
+    n = A.shape[1]
+    w = np.zeros(n)
+    k = min(int(k), n)
+    if k <= 0:
+        return w, float(np.linalg.norm(target))
+
+    if mode == "nnls":
+        x, _ = nnls(A, b)
+        support = list(np.flatnonzero(x > 0))
+        if len(support) > k:
+            support = list(np.argsort(-x)[:k])
+            x_support, _ = nnls(A[:, support], b)
+        else:
+            x_support = x[support]
+    elif mode == "greedy":
+        support, x_support = _greedy_support(A, b, k)
+    elif mode == "pool":
+        support, x_support = _pool_support(A, b, k, pool_size)
+    elif mode == "beam":
+        support, x_support, _ = beam_search_mixes(ingredient_profiles, target, k, n_results=1, sum_weight=sum_weight)[0]
+    else:
+        raise ValueError(f"Unbekannter Modus: {mode} (erlaubt: {', '.join(SOLVER_MODES[1:])})")
+
+    w[support] = x_support
+    if w.sum() > 0:
+        w /= w.sum()
+    return w, mix_residual(w, ingredient_profiles, target)
+
+
+def mix_residual(w, ingredient_profiles, target):
+    """
+    Abstand zwischen dem Profil der Mischung (Gewichte w, Summe 1) und dem Zielprofil.
+    """
+    return float(np.linalg.norm(np.asarray(ingredient_profiles).T @ w - target))
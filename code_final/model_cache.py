@@ -0,0 +1,191 @@
+"""
+Cache für trainierte Autoencoder.
+
+Das Training eines Autoencoders dauert mehrere Sekunden. Da sich die
+Zutaten-Profile nur ändern, wenn die JSON-Datei bearbeitet wird, werden trainierte
+Gewichte auf der Festplatte gespeichert und bei Bedarf wieder geladen.
+
+Der Schlüssel eines Modells (Fingerprint) setzt sich zusammen aus:
+  - der Profil-Matrix der Zutatengruppe (Form + Inhalt, immer als float32, damit
+    Profile aus dem JSON (float64) und aus dem kompilierten Katalog (float32)
+    denselben Schlüssel ergeben)
+  - latent_dim, epochs und batch_size
+Der Rest der JSON-Datei gehört nicht zum Schlüssel: Wird eine alkoholische Zutat
+hinzugefügt, bleibt das Modell der nicht-alkoholischen Gruppe gültig.
+
+Zusätzlich hält ein LRU-Speicher die zuletzt benutzten Modelle im Arbeitsspeicher,
+damit ein lange laufender Generator nie zweimal für dieselbe Zutatengruppe trainiert.
+Dateien, die zu keiner aktuellen Zutatengruppe mehr gehören, löscht 'prune'.
+"""
+
+import contextlib
+import hashlib
+import os
+from collections import OrderedDict
+
+import numpy as np
+
+from atomic_file import atomic_write
+
+
+def file_fingerprint(path):
+    """
+    Berechnet den SHA-256 Hash einer Datei (blockweise gelesen).
+    """
+    h = hashlib.sha256()
+    with open(path, "rb") as f:
+        for chunk in iter(lambda: f.read(65536), b""):
+            h.update(chunk)
+    return h.hexdigest()
+
+
+class ModelCache:
+    def __init__(self, cache_dir, data_path, max_models=8):
+        self.cache_dir = cache_dir
+        self.data_path = data_path
+        self.max_models = max_models
+        self._models = OrderedDict()
+        self._data_stat = None
+        self._data_version = None
+
+        # Statistik
+        self.memory_hits = 0
+        self.disk_hits = 0
+        self.misses = 0
+
+    def data_version(self):
+        """
+        Liefert die aktuelle Datenversion (gekürzter Hash der JSON-Datei), z.B.
+        als Schlüssel für Caches von Vorschlägen. Die Modelle selbst hängen nur
+        von den Profilen ihrer Gruppe ab (siehe 'fingerprint').
+
+        Der Hash wird nur neu berechnet, wenn sich Größe oder Änderungszeit der
+        Datei geändert haben.
+        """
+        st = os.stat(self.data_path)
+        stat_key = (st.st_mtime_ns, st.st_size)
+        if stat_key != self._data_stat:
+            self._data_version = file_fingerprint(self.data_path)[:16]
+            self._data_stat = stat_key
+        return self._data_version
+
+    def fingerprint(self, ingredient_profiles, latent_dim, epochs, batch_size):
+        """
+        Erstellt den Schlüssel für eine Zutatengruppe und die Trainingsparameter.
+        """
+        profiles = np.ascontiguousarray(ingredient_profiles, dtype=np.float32)
+        h = hashlib.sha256()
+        h.update(str(profiles.shape).encode())
+        h.update(profiles.tobytes())
+        h.update(f"{latent_dim}/{epochs}/{batch_size}".encode())
+        return h.hexdigest()[:32]
+
+    def _path(self, key):
+        return os.path.join(self.cache_dir, f"{key}.npz")
+
+    def prune(self, keep_keys):
+        """
+        Löscht alle gespeicherten Gewichte, deren Schlüssel nicht in 'keep_keys'
+        enthalten ist (z.B. Modelle einer Zutatengruppe vor dem Erweitern).
+        Rückgabe: Anzahl der gelöschten Dateien.
+        """
+        if not os.path.isdir(self.cache_dir):
+            return 0
+        keep = {f"{key}.npz" for key in keep_keys}
+        removed = 0
+        for filename in os.listdir(self.cache_dir):
+            if filename.endswith(".npz") and filename not in keep:
+                with contextlib.suppress(FileNotFoundError):
+                    os.remove(os.path.join(self.cache_dir, filename))
+                    removed += 1
+        return removed
+
+    def _remember(self, key, model):
+        self._models[key] = model
+        self._models.move_to_end(key)
+        while len(self._models) > self.max_models:
+            self._models.popitem(last=False)
+
+    def load_weights(self, key):
+        """
+        Lädt die Gewichte zu einem Schlüssel von der Festplatte (oder None).
+        """
+        path = self._path(key)
+        if not os.path.exists(path):
+            return None
+        with np.load(path) as f:
+            return [f[f"w{i}"] for i in range(len(f.files))]
+
+    def save_weights(self, key, weights):
+        """
+        Speichert die Gewichte atomar (erst temporäre Datei, dann umbenennen).
+        """
+        os.makedirs(self.cache_dir, exist_ok=True)
+        path = self._path(key)
+        with atomic_write(path) as f:
+            np.savez(f, **{f"w{i}": w for i, w in enumerate(weights)})
+
+    def _lookup(self, key, input_dim, latent_dim, build_fn):
+        # Arbeitsspeicher (LRU) -> Festplatte, sonst None
+        if key in self._models:
+            self._models.move_to_end(key)
+            self.memory_hits += 1
+            return self._models[key]
+
+        weights = self.load_weights(key)
+        if weights is None:
+            return None
+        model = build_fn(input_dim, latent_dim)
+        model.set_weights(weights)
+        self.disk_hits += 1
+        self._remember(key, model)
+        return model
+
+    def get(self, ingredient_profiles, latent_dim, epochs, batch_size, build_fn, train_fn):
+        """
+        Liefert einen trainierten Autoencoder für die übergebenen Profile.
+
+        Reihenfolge: Arbeitsspeicher (LRU) -> Festplatte -> neu trainieren.
+        - build_fn(input_dim, latent_dim) erzeugt ein untrainiertes Modell,
+          in das gespeicherte Gewichte geladen werden.
+        - train_fn(profiles, latent_dim, epochs, batch_size) trainiert ein neues Modell.
+        """
+        key = self.fingerprint(ingredient_profiles, latent_dim, epochs, batch_size)
+        model = self._lookup(key, ingredient_profiles.shape[1], latent_dim, build_fn)
+        if model is None:
+            model = train_fn(ingredient_profiles, latent_dim, epochs, batch_size)
+            self.save_weights(key, model.get_weights())
+            self.misses += 1
+            self._remember(key, model)
+        return model
+
+    def get_many(self, profile_groups, latent_dim, epochs, batch_size, build_fn, train_many_fn):
+        """
+        Wie 'get' für mehrere Zutatengruppen auf einmal. Alle Gruppen, die weder im
+        Speicher noch auf der Festplatte liegen, werden gemeinsam an
+        train_many_fn(Liste von Profilen, latent_dim, epochs, batch_size) übergeben,
+        die sie z.B. parallel trainieren kann (siehe parallel_training.py).
+        Rückgabe: Liste der Modelle in der Reihenfolge von 'profile_groups'.
+        """
+        keys = [self.fingerprint(p, latent_dim, epochs, batch_size) for p in profile_groups]
+        models = [self._lookup(key, p.shape[1], latent_dim, build_fn) for key, p in zip(keys, profile_groups)]
+
+        # Gleiche Gruppen nur einmal trainieren
+        missing = {}
+        for i, model in enumerate(models):
+            if model is None:
+                missing.setdefault(keys[i], i)
+        if missing:
+            trained = dict(zip(missing, train_many_fn([profile_groups[i] for i in missing.values()], latent_dim, epochs, batch_size)))
+            for key, model in trained.items():
+                self.save_weights(key, model.get_weights())
+                self.misses += 1
+                self._remember(key, model)
+            models = [trained[key] if model is None else model for key, model in zip(keys, models)]
+        return models
+
+    def clear(self):
+        """
+        Leert den Arbeitsspeicher-Cache (Dateien bleiben erhalten).
+        """
+        self._models.clear()
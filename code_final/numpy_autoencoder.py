@@ -0,0 +1,124 @@
+"""
+Reine NumPy-Inferenz für den Autoencoder aus 'cocktail_code.py'.
+
+Für einen Vorschlag wird nur ein Vorwärtsdurchlauf durch das kleine Netz
+Dense(relu) -> Dense(sigmoid) benötigt. Dafür muss nicht die komplette
+Keras-Laufzeit geladen werden: Die trainierten Gewichte werden in eine kleine
+.npz-Datei exportiert und hier mit NumPy ausgewertet.
+
+Gerechnet wird wie in Keras in float32, die Ergebnisse stimmen daher bis auf
+Rundungsfehler (ca. 1e-6) mit 'autoencoder.predict' überein.
+
+Dieses Modul importiert absichtlich kein TensorFlow.
+"""
+
+import numpy as np
+
+from atomic_file import atomic_write
+
+
+def _sigmoid(z):
+    # Numerisch stabile Variante (kein Überlauf von exp bei großen |z|)
+    return 0.5 * (1.0 + np.tanh(0.5 * z))
+
+
+class NumpyAutoencoder:
+    """
+    Autoencoder input_dim -> latent_dim (relu) -> input_dim (sigmoid).
+
+    Die Gewichte haben dieselbe Reihenfolge wie 'model.get_weights()' in Keras:
+    [encoder_kernel, encoder_bias, decoder_kernel, decoder_bias].
+    """
+
+    def __init__(self, encoder_kernel, encoder_bias, decoder_kernel, decoder_bias):
+        self.set_weights([encoder_kernel, encoder_bias, decoder_kernel, decoder_bias])
+
+    @classmethod
+    def zeros(cls, input_dim, latent_dim=3):
+        """
+        Leeres Modell, in das anschließend Gewichte geladen werden (set_weights).
+        """
+        return cls(
+            np.zeros((input_dim, latent_dim)),
+            np.zeros(latent_dim),
+            np.zeros((latent_dim, input_dim)),
+            np.zeros(input_dim),
+        )
+
+    @classmethod
+    def from_keras(cls, model):
+        """
+        Übernimmt die Gewichte eines trainierten Keras-Autoencoders.
+        """
+        return cls(*model.get_weights())
+
+    @classmethod
+    def from_npz(cls, path):
+        """
+        Lädt ein mit 'export_npz' gespeichertes Modell.
+        """
+        with np.load(path) as f:
+            return cls(f["encoder_kernel"], f["encoder_bias"], f["decoder_kernel"], f["decoder_bias"])
+
+    @property
+    def input_dim(self):
+        return self.encoder_kernel.shape[0]
+
+    @property
+    def latent_dim(self):
+        return self.encoder_kernel.shape[1]
+
+    def get_weights(self):
+        return [self.encoder_kernel, self.encoder_bias, self.decoder_kernel, self.decoder_bias]
+
+    def set_weights(self, weights):
+        encoder_kernel, encoder_bias, decoder_kernel, decoder_bias = weights
+        self.encoder_kernel = np.asarray(encoder_kernel, dtype=np.float32)
+        self.encoder_bias = np.asarray(encoder_bias, dtype=np.float32)
+        self.decoder_kernel = np.asarray(decoder_kernel, dtype=np.float32)
+        self.decoder_bias = np.asarray(decoder_bias, dtype=np.float32)
+
+    def encode(self, x):
+        x = np.asarray(x, dtype=np.float32)
+        return np.maximum(x @ self.encoder_kernel + self.encoder_bias, 0.0)
+
+    def decode(self, latent):
+        return _sigmoid(latent @ self.decoder_kernel + self.decoder_bias)
+
+    def predict(self, x):
+        """
+        Entspricht 'autoencoder.predict(x)' für x mit shape=(n_samples, input_dim).
+        """
+        return self.decode(self.encode(x))
+
+    def export_npz(self, path):
+        """
+        Speichert die Gewichte kompakt als .npz (atomar über eine temporäre Datei).
+        """
+        with atomic_write(path) as f:
+            np.savez(
+                f,
+                encoder_kernel=self.encoder_kernel,
+                encoder_bias=self.encoder_bias,
+                decoder_kernel=self.decoder_kernel,
+                decoder_bias=self.decoder_bias,
+            )
+
+
+def export_autoencoder(model, path):
+    """
+    Exportiert einen trainierten Keras-Autoencoder als .npz für die NumPy-Inferenz.
+    """
+    numpy_model = NumpyAutoencoder.from_keras(model)
+    numpy_model.export_npz(path)
+    return numpy_model
+
+
+def max_prediction_error(keras_model, numpy_model, inputs):
+    """
+    Größte absolute Abweichung zwischen Keras- und NumPy-Vorhersage
+    (zum Prüfen eines Exports, erwartet wird < 1e-5).
+    """
+    inputs = np.asarray(inputs, dtype=np.float32)
+    expected = keras_model.predict(inputs, verbose=0)
+    return float(np.max(np.abs(expected - numpy_model.predict(inputs))))
@@ -0,0 +1,64 @@
+"""
+Paralleles Training mehrerer Autoencoder (z.B. alkoholische und nicht-alkoholische
+Zutatengruppe) in einem Prozesspool.
+
+Jeder Worker-Prozess bekommt eine feste Anzahl TensorFlow-Threads
+(intra-op / inter-op), damit sich die Trainings nicht gegenseitig die Kerne
+wegnehmen: standardmäßig cpu_count // Anzahl Worker Threads pro Worker.
+
+Die Worker werden mit 'spawn' gestartet, da TensorFlow nach einem fork nicht
+zuverlässig funktioniert. Eine einzelne Gruppe wird direkt im aufrufenden
+Prozess trainiert (kein Start-Overhead).
+"""
+
+import multiprocessing
+import os
+import sys
+from concurrent.futures import ProcessPoolExecutor
+
+import numpy as np
+
+
+def limit_threads(intra_op_threads, inter_op_threads=1):
+    """
+    Begrenzt die Threads von TensorFlow (und BLAS/OpenMP) im aktuellen Prozess.
+    Muss vor dem ersten TensorFlow-Import aufgerufen werden, damit die
+    Umgebungsvariablen greifen.
+    """
+    os.environ["OMP_NUM_THREADS"] = str(intra_op_threads)
+    os.environ["TF_NUM_INTRAOP_THREADS"] = str(intra_op_threads)
+    os.environ["TF_NUM_INTEROP_THREADS"] = str(inter_op_threads)
+    if "tensorflow" in sys.modules:
+        import tensorflow as tf
+        try:
+            tf.config.threading.set_intra_op_parallelism_threads(intra_op_threads)
+            tf.config.threading.set_inter_op_parallelism_threads(inter_op_threads)
+        except RuntimeError:
+            # TensorFlow wurde bereits initialisiert, die Einstellung ist fest
+            pass
+
+
+def train_parallel(train_fn, profile_groups, latent_dim=3, epochs=500, batch_size=None,
+                   max_workers=None, threads_per_worker=None, inter_op_threads=1):
+    """
+    Trainiert für jede Profil-Matrix in 'profile_groups' ein Modell mit
+    train_fn(profiles, latent_dim, epochs, batch_size). 'train_fn' muss auf
+    Modulebene definiert sein (wird an die Worker übergeben).
+    Rückgabe: Liste der Modelle in der Reihenfolge von 'profile_groups'.
+    """
+    # Kopien statt Views auf den gemappten Katalog an die Worker schicken
+    profile_groups = [np.array(p) for p in profile_groups]
+    if len(profile_groups) <= 1 or max_workers == 1:
+        return [train_fn(p, latent_dim, epochs, batch_size) for p in profile_groups]
+
+    cpus = os.cpu_count() or 1
+    workers = min(len(profile_groups), max_workers or cpus)
+    threads = threads_per_worker or max(1, cpus // workers)
+    with ProcessPoolExecutor(
+        max_workers=workers,
+        mp_context=multiprocessing.get_context("spawn"),
+        initializer=limit_threads,
+        initargs=(threads, inter_op_threads),
+    ) as pool:
+        futures = [pool.submit(train_fn, p, latent_dim, epochs, batch_size) for p in profile_groups]
+        return [f.result() for f in futures]
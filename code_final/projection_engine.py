@@ -0,0 +1,83 @@
+"""
+Projektion des Geschmacksraums ohne Training (PCA / abgeschnittene SVD).
+
+Der Autoencoder 5 -> 3 -> 5 lernt mit 500 Epochen Adam im Wesentlichen eine
+Projektion der Nutzerprofile auf einen niedrigdimensionalen Unterraum der
+Zutatenprofile. Eine PCA liefert diese Projektion direkt per SVD in wenigen
+Mikrosekunden:
+  - "pca":         linear, x -> mean + (x - mean) V^T V
+  - "pca_sigmoid": PCA im Logit-Raum, Ausgabe über die Sigmoid-Funktion
+                   (Werte wie beim Autoencoder immer in (0, 1))
+
+'PCAProjection' hat dieselbe Schnittstelle wie 'NumpyAutoencoder'
+(encode, decode, predict, get_weights/set_weights, input_dim, latent_dim)
+und kann überall anstelle des Autoencoders verwendet werden.
+"""
+
+import numpy as np
+
+from numpy_autoencoder import _sigmoid
+
+
+def _logit(x, eps):
+    x = np.clip(x, eps, 1.0 - eps)
+    return np.log(x / (1.0 - x))
+
+
+class PCAProjection:
+    def __init__(self, mean, components, sigmoid=False, eps=0.01):
+        """
+        mean: shape=(input_dim,), components: shape=(latent_dim, input_dim) mit
+        orthonormalen Zeilen. Mit sigmoid=True gelten beide für den Logit-Raum.
+        """
+        self.sigmoid = sigmoid
+        self.eps = eps
+        self.set_weights([mean, components])
+
+    @classmethod
+    def fit(cls, ingredient_profiles, latent_dim=3, sigmoid=False, eps=0.01):
+        """
+        Berechnet die Hauptkomponenten der Zutatenprofile (shape=(M, input_dim)).
+        """
+        X = np.asarray(ingredient_profiles, dtype=np.float64)
+        if sigmoid:
+            X = _logit(X, eps)
+        mean = X.mean(axis=0)
+        _, _, vt = np.linalg.svd(X - mean, full_matrices=False)
+        return cls(mean, vt[:latent_dim], sigmoid, eps)
+
+    @classmethod
+    def zeros(cls, input_dim, latent_dim=3):
+        return cls(np.zeros(input_dim), np.zeros((latent_dim, input_dim)))
+
+    @property
+    def input_dim(self):
+        return self.components.shape[1]
+
+    @property
+    def latent_dim(self):
+        return self.components.shape[0]
+
+    def get_weights(self):
+        return [self.mean, self.components]
+
+    def set_weights(self, weights):
+        mean, components = weights
+        self.mean = np.asarray(mean, dtype=np.float64)
+        self.components = np.asarray(components, dtype=np.float64)
+
+    def encode(self, x):
+        x = np.asarray(x, dtype=np.float64)
+        if self.sigmoid:
+            x = _logit(x, self.eps)
+        return (x - self.mean) @ self.components.T
+
+    def decode(self, latent):
+        x = latent @ self.components + self.mean
+        return _sigmoid(x) if self.sigmoid else x
+
+    def predict(self, x):
+        """
+        Projektion von x mit shape=(n_samples, input_dim) auf den Unterraum.
+        """
+        return self.decode(self.encode(x))
@@ -0,0 +1,193 @@
+"""
+Bewertungsmodell: sagt aus (Nutzerprofil, Mischung) die zu erwartende Bewertung voraus.
+
+Bisher wurden die gespeicherten Bewertungen nicht genutzt. Hier wird offline ein
+lineares Modell (Ridge-Regression, geschlossene Lösung) auf den Bewertungen
+trainiert. Merkmale einer Mischung w (Volumenanteile aller Zutaten des Katalogs):
+  - Nutzerprofil p und Geschmack der Mischung t = w @ Zutatenprofile
+  - |p - t| und p * t (wie gut passt die Mischung zum Profil)
+  - die Anteile w selbst (Vorlieben für einzelne Zutaten)
+
+Beim Servieren bewertet 'RatingModel.score' viele Kandidaten-Mischungen auf
+einmal (eine Matrixmultiplikation, 1000 Kandidaten in deutlich unter 1 ms),
+'rerank' wählt daraus die beste.
+
+Aufruf (aus dem Projektordner):
+    python code_final/rating_model.py train    # Modell aus dem Ratings-Log trainieren
+    python code_final/rating_model.py bench    # Laufzeit für 1000 Kandidaten messen
+"""
+
+import argparse
+import json
+import os
+import time
+
+import numpy as np
+
+from atomic_file import atomic_write
+from ratings_store import RATINGS_LOG, iter_ratings
+
+
+RATING_MODEL_PATH = "code_final/rating_model.npz"
+
+
+def mix_matrix(mixes, names):
+    """
+    Wandelt Mischungen ({Zutat: ml}) in Volumenanteile shape=(N, M) um.
+    Zutaten, die nicht im Katalog stehen, werden ignoriert.
+    """
+    index = {name: i for i, name in enumerate(names)}
+    W = np.zeros((len(mixes), len(names)))
+    for row, mix in enumerate(mixes):
+        total = sum(mix.values())
+        if total <= 0:
+            continue
+        for name, ml in mix.items():
+            i = index.get(name)
+            if i is not None:
+                W[row, i] = ml / total
+    return W
+
+
+class RatingModel:
+    def __init__(self, names, ingredient_profiles, coef, feature_mean, feature_std):
+        self.names = list(names)
+        self.ingredient_profiles = np.asarray(ingredient_profiles, dtype=float)
+        self.coef = np.asarray(coef, dtype=float)  # letzter Eintrag: Achsenabschnitt
+        self.feature_mean = np.asarray(feature_mean, dtype=float)
+        self.feature_std = np.asarray(feature_std, dtype=float)
+
+    @staticmethod
+    def _features(user_profiles, W, ingredient_profiles):
+        taste = W @ ingredient_profiles
+        return np.hstack([user_profiles, taste, np.abs(user_profiles - taste), user_profiles * taste, W])
+
+    @classmethod
+    def fit(cls, user_profiles, mixes, ratings, names, ingredient_profiles, alpha=1.0):
+        """
+        Trainiert das Modell (Ridge-Regression auf standardisierten Merkmalen).
+        user_profiles shape=(N, 5), mixes: Liste von N dicts, ratings shape=(N,).
+        """
+        user_profiles = np.asarray(user_profiles, dtype=float)
+        X = cls._features(user_profiles, mix_matrix(mixes, names), np.asarray(ingredient_profiles, dtype=float))
+        mean = X.mean(axis=0)
+        std = X.std(axis=0)
+        std[std == 0] = 1.0
+        X = np.hstack([(X - mean) / std, np.ones((len(X), 1))])
+        penalty = alpha * np.eye(X.shape[1])
+        penalty[-1, -1] = 0.0  # Achsenabschnitt nicht bestrafen
+        coef = np.linalg.solve(X.T @ X + penalty, X.T @ np.asarray(ratings, dtype=float))
+        return cls(names, ingredient_profiles, coef, mean, std)
+
+    def score(self, user_profile, W):
+        """
+        Vorhergesagte Bewertungen für ein Nutzerprofil shape=(5,) und
+        Kandidaten als Volumenanteile W shape=(N, M). Rückgabe: shape=(N,).
+        """
+        # Standardisierung in die Gewichte falten: X_std @ c = X @ (c / std) - mean/std @ c
+        c = self.coef[:-1] / self.feature_std
+        bias = self.coef[-1] - self.feature_mean @ c
+        p = np.asarray(user_profile, dtype=float)
+        n = len(p)
+        c_user, c_taste, c_diff, c_prod, c_mix = c[:n], c[n:2 * n], c[2 * n:3 * n], c[3 * n:4 * n], c[4 * n:]
+        taste = W @ self.ingredient_profiles
+        return (bias + p @ c_user + taste @ (c_taste + p * c_prod)
+                + np.abs(p - taste) @ c_diff + W @ c_mix)
+
+    def predict(self, user_profiles, mixes):
+        """
+        Vorhergesagte Bewertungen für N Paare (Nutzerprofil, Mischung als dict).
+        """
+        X = self._features(np.asarray(user_profiles, dtype=float), mix_matrix(mixes, self.names), self.ingredient_profiles)
+        return ((X - self.feature_mean) / self.feature_std) @ self.coef[:-1] + self.coef[-1]
+
+    def rerank(self, user_profile, candidates):
+        """
+        Wählt aus Kandidaten-Mischungen ({Zutat: ml}) die mit der höchsten
+        vorhergesagten Bewertung. Rückgabe: (beste Mischung, Bewertungen aller Kandidaten).
+        """
+        scores = self.score(user_profile, mix_matrix(candidates, self.names))
+        return candidates[int(np.argmax(scores))], scores
+
+    def save(self, path=RATING_MODEL_PATH):
+        with atomic_write(path) as f:
+            np.savez(
+                f,
+                names=np.array(self.names),
+                ingredient_profiles=self.ingredient_profiles,
+                coef=self.coef,
+                feature_mean=self.feature_mean,
+                feature_std=self.feature_std,
+            )
+
+    @classmethod
+    def load(cls, path=RATING_MODEL_PATH):
+        """
+        Lädt ein gespeichertes Modell (oder None, falls noch keines trainiert wurde).
+        """
+        if not os.path.exists(path):
+            return None
+        with np.load(path) as f:
+            return cls(f["names"].tolist(), f["ingredient_profiles"], f["coef"], f["feature_mean"], f["feature_std"])
+
+
+def load_training_data(log_path=RATINGS_LOG):
+    profiles, mixes, ratings = [], [], []
+    for entry in iter_ratings(log_path):
+        profiles.append(entry["user_profile"])
+        mixes.append(entry["cocktail_mix"])
+        ratings.append(entry["rating"])
+    return np.array(profiles, dtype=float).reshape(-1, 5), mixes, np.array(ratings, dtype=float)
+
+
+def cross_validate(user_profiles, mixes, ratings, names, ingredient_profiles, alpha=1.0, folds=5, seed=0):
+    """
+    RMSE des Modells und des Mittelwerts (Vergleichswert) per k-facher Kreuzvalidierung.
+    """
+    order = np.random.default_rng(seed).permutation(len(ratings))
+    errors, baseline = [], []
+    for fold in np.array_split(order, folds):
+        train = np.setdiff1d(order, fold)
+        model = RatingModel.fit(user_profiles[train], [mixes[i] for i in train], ratings[train], names, ingredient_profiles, alpha)
+        errors.append(model.predict(user_profiles[fold], [mixes[i] for i in fold]) - ratings[fold])
+        baseline.append(ratings[train].mean() - ratings[fold])
+    return float(np.sqrt(np.mean(np.concatenate(errors) ** 2))), float(np.sqrt(np.mean(np.concatenate(baseline) ** 2)))
+
+
+def _catalog(json_path):
+    with open(json_path, "r", encoding="utf-8") as f:
+        ingredients = json.load(f)["ingredients"]
+    return list(ingredients), np.array([info["taste"] for info in ingredients.values()])
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Bewertungsmodell trainieren und messen")
+    parser.add_argument("command", choices=["train", "bench"])
+    parser.add_argument("--data", default="code_final/cocktail_data_quest.json")
+    parser.add_argument("--alpha", type=float, default=1.0, help="Stärke der Regularisierung")
+    parser.add_argument("--min-ratings", type=int, default=20)
+    args = parser.parse_args()
+
+    names, ingredient_profiles = _catalog(args.data)
+    if args.command == "train":
+        user_profiles, mixes, ratings = load_training_data()
+        if len(ratings) < args.min_ratings:
+            print(f"Nur {len(ratings)} Bewertungen vorhanden, mindestens {args.min_ratings} werden benötigt.")
+        else:
+            rmse, baseline = cross_validate(user_profiles, mixes, ratings, names, ingredient_profiles, args.alpha)
+            RatingModel.fit(user_profiles, mixes, ratings, names, ingredient_profiles, args.alpha).save()
+            print(f"{len(ratings)} Bewertungen, RMSE (Kreuzvalidierung): {rmse:.3f}, Mittelwert als Vorhersage: {baseline:.3f}")
+            print(f"Modell gespeichert in {RATING_MODEL_PATH}")
+    else:
+        rng = np.random.default_rng(0)
+        n = len(names)
+        model = RatingModel(names, ingredient_profiles, rng.normal(size=4 * 5 + n + 1), np.zeros(4 * 5 + n), np.ones(4 * 5 + n))
+        W = np.zeros((1000, n))
+        for row in W:
+            row[rng.choice(n, 4, replace=False)] = rng.dirichlet(np.ones(4))
+        user_profile = rng.random(5)
+        model.score(user_profile, W)
+        start = time.perf_counter()
+        for _ in range(100):
+            model.score(user_profile, W)
+        print(f"1000 Kandidaten: {(time.perf_counter() - start) / 100 * 1000:.3f} ms")
@@ -0,0 +1,439 @@
+"""
+SQLite-Speicher für Mischungen und Bewertungen.
+
+Bisher gab es zwei Formate: 'cocktail_ratings.json' bzw. den Ratings-Log
+'cocktail_ratings.jsonl' (code_final) und 'cocktail_rezepte_db.json' (Conrad),
+in dem die Bewertungen unter str(tuple(cocktail.items())) stehen und die
+komplette Datei bei jeder Bewertung neu geschrieben wird. Hier liegen alle
+Bewertungen normalisiert in einer Datenbank:
+
+  mixes            eine Zeile pro exakter Mischung (Zutaten + Mengen), dazu
+                   laufend gepflegt Anzahl und Summe der Bewertungen
+  mix_ingredients  (Mischung, Zutat, ml), Index über die Zutat
+  profiles         Nutzerprofile (float64-Vektor), jedes nur einmal
+  ratings          (Mischung, Profil, Bewertung, Zeitpunkt, Quelle, Schlüssel)
+  ingredient_stats Anzahl und Summe der Bewertungen pro Zutat
+  sources          importierte Dateien und die bereits gelesene Position
+
+Die Aggregate in 'mixes' und 'ingredient_stats' werden per Trigger beim
+Einfügen und Löschen von Bewertungen aktualisiert. "Durchschnitt pro Zutat"
+und "Bewertungen dieser Mischung" sind daher Index-Zugriffe, deren Laufzeit
+nicht mit der Anzahl der Bewertungen wächst. Die Datenbank läuft im WAL-Modus,
+Leser in anderen Prozessen blockieren den Schreiber nicht (eine Verbindung pro
+Thread bzw. Prozess).
+
+Der Ratings-Log bleibt der Schreibpfad von cocktail_code.py; 'sync_ratings_log'
+übernimmt nur die seit dem letzten Aufruf angehängten Zeilen.
+
+Bewertungen mit Zeitpunkt bekommen einen eindeutigen Schlüssel aus Mischung,
+Profil, Bewertung und Zeitpunkt und werden per INSERT OR IGNORE eingefügt. Steht
+dieselbe Bewertung in mehreren Quellen (z.B. 'cocktail_ratings.json' und der
+daraus erzeugte Ratings-Log), wird sie nur einmal gezählt.
+
+Aufruf (aus dem Projektordner):
+    python code_final/ratings_db.py import                  # Ratings-Log + Conrads Rezept-DB übernehmen
+    python code_final/ratings_db.py stats --ingredient Gin  # Durchschnitt pro Zutat
+    python code_final/ratings_db.py bench --sizes 10000 100000 1000000
+"""
+
+import argparse
+import ast
+import hashlib
+import json
+import os
+import sqlite3
+import tempfile
+import time
+
+import numpy as np
+
+from ratings_store import RATINGS_LOG, migrate_legacy
+
+
+RATINGS_DB = "code_final/cocktail_ratings.db"
+# Conrads Rezept-DB (Conrad/austausch.py liest und schreibt sie im Projektordner)
+REZEPTE_DB_FILE = "cocktail_rezepte_db.json"
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS mixes (
+    id INTEGER PRIMARY KEY,
+    signature TEXT NOT NULL UNIQUE,
+    rating_count INTEGER NOT NULL DEFAULT 0,
+    rating_sum INTEGER NOT NULL DEFAULT 0
+);
+CREATE TABLE IF NOT EXISTS mix_ingredients (
+    mix_id INTEGER NOT NULL REFERENCES mixes(id),
+    position INTEGER NOT NULL,
+    ingredient TEXT NOT NULL,
+    ml REAL NOT NULL,
+    PRIMARY KEY (mix_id, position)
+) WITHOUT ROWID;
+CREATE INDEX IF NOT EXISTS mix_ingredients_by_ingredient ON mix_ingredients (ingredient, mix_id);
+CREATE TABLE IF NOT EXISTS profiles (
+    id INTEGER PRIMARY KEY,
+    vector BLOB NOT NULL UNIQUE
+);
+CREATE TABLE IF NOT EXISTS sources (
+    id INTEGER PRIMARY KEY,
+    name TEXT NOT NULL UNIQUE,
+    position INTEGER NOT NULL DEFAULT 0,
+    file_id TEXT
+);
+CREATE TABLE IF NOT EXISTS ratings (
+    id INTEGER PRIMARY KEY,
+    mix_id INTEGER NOT NULL REFERENCES mixes(id),
+    profile_id INTEGER REFERENCES profiles(id),
+    source_id INTEGER REFERENCES sources(id),
+    rating INTEGER NOT NULL CHECK (rating BETWEEN 1 AND 5),
+    timestamp TEXT,
+    entry_key TEXT
+);
+CREATE INDEX IF NOT EXISTS ratings_by_mix ON ratings (mix_id);
+CREATE INDEX IF NOT EXISTS ratings_by_source ON ratings (source_id);
+CREATE TABLE IF NOT EXISTS ingredient_stats (
+    ingredient TEXT PRIMARY KEY,
+    rating_count INTEGER NOT NULL DEFAULT 0,
+    rating_sum INTEGER NOT NULL DEFAULT 0
+) WITHOUT ROWID;
+
+CREATE TRIGGER IF NOT EXISTS ratings_insert AFTER INSERT ON ratings BEGIN
+    UPDATE mixes SET rating_count = rating_count + 1, rating_sum = rating_sum + NEW.rating
+        WHERE id = NEW.mix_id;
+    INSERT INTO ingredient_stats (ingredient, rating_count, rating_sum)
+        SELECT ingredient, 1, NEW.rating FROM mix_ingredients WHERE mix_id = NEW.mix_id
+        ON CONFLICT (ingredient) DO UPDATE SET
+            rating_count = rating_count + 1, rating_sum = rating_sum + excluded.rating_sum;
+END;
+CREATE TRIGGER IF NOT EXISTS ratings_delete AFTER DELETE ON ratings BEGIN
+    UPDATE mixes SET rating_count = rating_count - 1, rating_sum = rating_sum - OLD.rating
+        WHERE id = OLD.mix_id;
+    UPDATE ingredient_stats SET rating_count = rating_count - 1, rating_sum = rating_sum - OLD.rating
+        WHERE ingredient IN (SELECT ingredient FROM mix_ingredients WHERE mix_id = OLD.mix_id);
+END;
+"""
+
+# Erst nach der Migration älterer Datenbanken ohne Spalte 'entry_key'
+_KEY_INDEX = "CREATE UNIQUE INDEX IF NOT EXISTS ratings_by_key ON ratings (entry_key)"
+
+
+def mix_signature(cocktail_mix):
+    """
+    Kanonische Form einer Mischung {Zutat: ml}: unabhängig von der Reihenfolge,
+    Mengen auf 0.01 ml gerundet.
+    """
+    items = sorted((name, round(float(ml), 2)) for name, ml in cocktail_mix.items())
+    return json.dumps(items, ensure_ascii=False, separators=(",", ":"))
+
+
+def entry_key(entry):
+    """
+    Eindeutiger Schlüssel einer Bewertung, unabhängig von der Quelle, oder None
+    ohne Zeitpunkt (z.B. Conrads Rezept-DB, dort sind gleiche Bewertungen derselben
+    Mischung echte Wiederholungen).
+    """
+    if not entry.get("timestamp"):
+        return None
+    profile = entry.get("user_profile")
+    h = hashlib.sha256(mix_signature(entry["cocktail_mix"]).encode("utf-8"))
+    h.update(b"" if profile is None else np.asarray(profile, dtype="<f8").tobytes())
+    h.update(f"{int(entry['rating'])}/{entry['timestamp']}".encode())
+    return h.hexdigest()[:32]
+
+
+def _summary(count, total):
+    return {"count": count, "mean": total / count if count else None}
+
+
+class RatingsDB:
+    def __init__(self, path=RATINGS_DB):
+        self.path = path
+        self.conn = sqlite3.connect(path)
+        self.conn.execute("PRAGMA journal_mode=WAL")
+        self.conn.execute("PRAGMA synchronous=NORMAL")
+        self.conn.execute("PRAGMA foreign_keys=ON")
+        self.conn.executescript(_SCHEMA)
+        if "entry_key" not in [row[1] for row in self.conn.execute("PRAGMA table_info(ratings)")]:
+            self.conn.execute("ALTER TABLE ratings ADD COLUMN entry_key TEXT")
+        self.conn.execute(_KEY_INDEX)
+        self._mix_ids = {}
+        self._profile_ids = {}
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+    def close(self):
+        self.conn.close()
+
+    def _mix_id(self, cocktail_mix):
+        signature = mix_signature(cocktail_mix)
+        mix_id = self._mix_ids.get(signature)
+        if mix_id is not None:
+            return mix_id
+        row = self.conn.execute("SELECT id FROM mixes WHERE signature = ?", (signature,)).fetchone()
+        if row is None:
+            mix_id = self.conn.execute("INSERT INTO mixes (signature) VALUES (?)", (signature,)).lastrowid
+            self.conn.executemany(
+                "INSERT INTO mix_ingredients (mix_id, position, ingredient, ml) VALUES (?, ?, ?, ?)",
+                [(mix_id, i, name, float(ml)) for i, (name, ml) in enumerate(cocktail_mix.items())],
+            )
+        else:
+            mix_id = row[0]
+        self._mix_ids[signature] = mix_id
+        return mix_id
+
+    def _profile_id(self, user_profile):
+        if user_profile is None:
+            return None
+        vector = np.asarray(user_profile, dtype="<f8").tobytes()
+        profile_id = self._profile_ids.get(vector)
+        if profile_id is not None:
+            return profile_id
+        row = self.conn.execute("SELECT id FROM profiles WHERE vector = ?", (vector,)).fetchone()
+        profile_id = row[0] if row else self.conn.execute("INSERT INTO profiles (vector) VALUES (?)", (vector,)).lastrowid
+        self._profile_ids[vector] = profile_id
+        return profile_id
+
+    def _source_id(self, name):
+        self.conn.execute("INSERT OR IGNORE INTO sources (name) VALUES (?)", (name,))
+        return self.conn.execute("SELECT id FROM sources WHERE name = ?", (name,)).fetchone()[0]
+
+    def add_ratings(self, entries, source_id=None):
+        """
+        Fügt Bewertungen im Format des Ratings-Logs ein ("cocktail_mix", "rating",
+        optional "user_profile" und "timestamp"), alle in einer Transaktion.
+        Bereits vorhandene Bewertungen (gleicher 'entry_key') werden übersprungen.
+        Rückgabe: Anzahl eingefügter Bewertungen.
+        """
+        try:
+            rows = [
+                (self._mix_id(e["cocktail_mix"]), self._profile_id(e.get("user_profile")), source_id, int(e["rating"]),
+                 e.get("timestamp"), entry_key(e))
+                for e in entries
+            ]
+            inserted = self.conn.executemany(
+                "INSERT OR IGNORE INTO ratings (mix_id, profile_id, source_id, rating, timestamp, entry_key) "
+                "VALUES (?, ?, ?, ?, ?, ?)", rows
+            ).rowcount
+        except Exception:
+            # Die Transaktion wird zurückgerollt, gemerkte IDs sind dann ungültig
+            self._mix_ids.clear()
+            self._profile_ids.clear()
+            raise
+        return max(inserted, 0)
+
+    def add_rating(self, user_profile, cocktail_mix, rating, timestamp=None):
+        with self.conn:
+            self.add_ratings([{"user_profile": user_profile, "cocktail_mix": cocktail_mix, "rating": rating, "timestamp": timestamp}])
+
+    def mix_summary(self, cocktail_mix):
+        """
+        Anzahl und Mittelwert der Bewertungen genau dieser Mischung.
+        """
+        row = self.conn.execute(
+            "SELECT rating_count, rating_sum FROM mixes WHERE signature = ?", (mix_signature(cocktail_mix),)
+        ).fetchone()
+        return _summary(*(row or (0, 0)))
+
+    def mix_ratings(self, cocktail_mix, limit=None):
+        """
+        Die einzelnen Bewertungen dieser Mischung: Liste von (Bewertung, Zeitpunkt).
+        """
+        return self.conn.execute(
+            "SELECT r.rating, r.timestamp FROM mixes m JOIN ratings r ON r.mix_id = m.id "
+            "WHERE m.signature = ? ORDER BY r.id LIMIT ?",
+            (mix_signature(cocktail_mix), -1 if limit is None else limit),
+        ).fetchall()
+
+    def ingredient_summary(self, ingredient):
+        """
+        Anzahl und Mittelwert aller Bewertungen von Mischungen mit dieser Zutat.
+        """
+        row = self.conn.execute(
+            "SELECT rating_count, rating_sum FROM ingredient_stats WHERE ingredient = ?", (ingredient,)
+        ).fetchone()
+        return _summary(*(row or (0, 0)))
+
+    def top_ingredients(self, n=5, min_count=1):
+        """
+        Die n Zutaten mit der besten Durchschnittsbewertung.
+        """
+        return self.conn.execute(
+            "SELECT ingredient, CAST(rating_sum AS REAL) / rating_count AS mean FROM ingredient_stats "
+            "WHERE rating_count >= ? ORDER BY mean DESC LIMIT ?",
+            (max(min_count, 1), n),
+        ).fetchall()
+
+    def mixes_with_ingredient(self, ingredient, limit=10):
+        """
+        Die am besten bewerteten Mischungen mit dieser Zutat: Liste von (Signatur, Anzahl, Mittelwert).
+        """
+        return self.conn.execute(
+            "SELECT m.signature, m.rating_count, CAST(m.rating_sum AS REAL) / m.rating_count AS mean "
+            "FROM mix_ingredients mi JOIN mixes m ON m.id = mi.mix_id "
+            "WHERE mi.ingredient = ? AND m.rating_count > 0 ORDER BY mean DESC LIMIT ?",
+            (ingredient, limit),
+        ).fetchall()
+
+    def count(self):
+        return self.conn.execute("SELECT COUNT(*) FROM ratings").fetchone()[0]
+
+
+def import_ratings_json(db, path):
+    """
+    Übernimmt einmalig eine Datei im alten Format {"ratings": [...]} (code_final).
+    Rückgabe: Anzahl übernommener Bewertungen (0, falls schon importiert).
+    """
+    with db.conn:
+        source_id = db._source_id("json:" + os.path.abspath(path))
+        if db.conn.execute("SELECT position FROM sources WHERE id = ?", (source_id,)).fetchone()[0]:
+            return 0
+        with open(path, "r", encoding="utf-8") as f:
+            entries = json.load(f).get("ratings", [])
+        n = db.add_ratings(entries, source_id)
+        db.conn.execute("UPDATE sources SET position = 1 WHERE id = ?", (source_id,))
+    return n
+
+
+def import_rezepte_db(db, path=REZEPTE_DB_FILE):
+    """
+    Übernimmt einmalig Conrads 'cocktail_rezepte_db.json': Schlüssel ist
+    str(tuple(cocktail.items())), Wert die Liste der Bewertungen (ohne Profil
+    und Zeitpunkt). Rückgabe: Anzahl übernommener Bewertungen.
+    """
+    with db.conn:
+        source_id = db._source_id("rezepte:" + os.path.abspath(path))
+        if db.conn.execute("SELECT position FROM sources WHERE id = ?", (source_id,)).fetchone()[0]:
+            return 0
+        with open(path, "r", encoding="utf-8") as f:
+            rezepte = json.load(f)
+        entries = []
+        for key, ratings in rezepte.items():
+            cocktail_mix = dict(ast.literal_eval(key))
+            entries += [{"cocktail_mix": cocktail_mix, "rating": rating} for rating in ratings]
+        n = db.add_ratings(entries, source_id)
+        db.conn.execute("UPDATE sources SET position = 1 WHERE id = ?", (source_id,))
+    return n
+
+
+def sync_ratings_log(db, log_path=RATINGS_LOG, batch_size=10000):
+    """
+    Übernimmt die seit dem letzten Aufruf an den Ratings-Log angehängten Zeilen
+    (ab der gespeicherten Byte-Position). Wurde der Log ersetzt (z.B. durch
+    'compact') oder ist er kürzer geworden, werden seine Bewertungen neu übernommen.
+    Rückgabe: Anzahl übernommener Bewertungen.
+    """
+    if not os.path.exists(log_path):
+        migrate_legacy(log_path)
+    st = os.stat(log_path)
+    file_id = f"{st.st_dev}:{st.st_ino}"
+    with db.conn:
+        source_id = db._source_id("log:" + os.path.abspath(log_path))
+        position, known_id = db.conn.execute("SELECT position, file_id FROM sources WHERE id = ?", (source_id,)).fetchone()
+        if known_id != file_id or st.st_size < position:
+            db.conn.execute("DELETE FROM ratings WHERE source_id = ?", (source_id,))
+            position = 0
+
+    added = 0
+    with open(log_path, "rb") as f:
+        f.seek(position)
+        while True:
+            entries = []
+            for line in f:
+                if not line.endswith(b"\n"):
+                    # Zeile wird gerade noch geschrieben
+                    break
+                position += len(line)
+                try:
+                    entry = json.loads(line)
+                except json.JSONDecodeError:
+                    continue
+                if "cocktail_mix" in entry and entry.get("rating") in (1, 2, 3, 4, 5):
+                    entries.append(entry)
+                if len(entries) == batch_size:
+                    break
+            with db.conn:
+                added += db.add_ratings(entries, source_id)
+                db.conn.execute("UPDATE sources SET position = ?, file_id = ? WHERE id = ?", (position, file_id, source_id))
+            if len(entries) < batch_size:
+                return added
+
+
+def run_benchmark(sizes, n_mixes=5000, repeats=200, seed=0):
+    """
+    Füllt eine temporäre Datenbank schrittweise mit synthetischen Bewertungen und
+    misst nach jedem Schritt die mittlere Dauer der Abfragen in ms.
+    """
+    with open("code_final/cocktail_data_quest.json", "r", encoding="utf-8") as f:
+        names = list(json.load(f)["ingredients"])
+    rng = np.random.default_rng(seed)
+    mixes = []
+    for _ in range(n_mixes):
+        chosen = rng.choice(len(names), rng.integers(2, 6), replace=False)
+        mixes.append({names[i]: round(float(ml), 2) for i, ml in zip(chosen, rng.uniform(10, 80, len(chosen)))})
+    profiles = rng.random((1000, 5))
+
+    results = []
+    with tempfile.TemporaryDirectory() as tmp:
+        with RatingsDB(os.path.join(tmp, "bench.db")) as db:
+            for size in sorted(sizes):
+                start = time.perf_counter()
+                while db.count() < size:
+                    n = min(50000, size - db.count())
+                    with db.conn:
+                        db.add_ratings([
+                            {"cocktail_mix": mixes[m], "user_profile": profiles[p], "rating": int(r)}
+                            for m, p, r in zip(rng.integers(0, n_mixes, n), rng.integers(0, len(profiles), n), rng.integers(1, 6, n))
+                        ])
+                insert_s = time.perf_counter() - start
+
+                queries = {
+                    "ingredient_summary": lambda i: db.ingredient_summary(names[i % len(names)]),
+                    "mix_summary": lambda i: db.mix_summary(mixes[i % n_mixes]),
+                    "mix_ratings(10)": lambda i: db.mix_ratings(mixes[i % n_mixes], limit=10),
+                    "top_ingredients": lambda i: db.top_ingredients(5),
+                    "mixes_with_ingredient": lambda i: db.mixes_with_ingredient(names[i % len(names)]),
+                }
+                timings = {}
+                for name, query in queries.items():
+                    start = time.perf_counter()
+                    for i in range(repeats):
+                        query(i)
+                    timings[name] = (time.perf_counter() - start) / repeats * 1000
+                results.append((size, insert_s, timings))
+    return results
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="SQLite-Speicher für Bewertungen")
+    parser.add_argument("command", choices=["import", "stats", "bench"])
+    parser.add_argument("--db", default=RATINGS_DB)
+    parser.add_argument("--ingredient", help="Durchschnitt für diese Zutat")
+    parser.add_argument("--rezepte", default=REZEPTE_DB_FILE, help="Conrads Rezept-Datenbank")
+    parser.add_argument("--sizes", type=int, nargs="+", default=[10000, 100000, 1000000])
+    args = parser.parse_args()
+
+    if args.command == "import":
+        with RatingsDB(args.db) as db:
+            print(f"Ratings-Log: {sync_ratings_log(db)} Bewertungen übernommen")
+            if os.path.exists(args.rezepte):
+                print(f"Rezept-Datenbank: {import_rezepte_db(db, args.rezepte)} Bewertungen übernommen")
+            print(f"Insgesamt {db.count()} Bewertungen in {args.db}")
+    elif args.command == "stats":
+        with RatingsDB(args.db) as db:
+            if args.ingredient:
+                summary = db.ingredient_summary(args.ingredient)
+                print(f"{args.ingredient}: {summary['count']} Bewertungen, Durchschnitt {summary['mean']}")
+                for signature, count, mean in db.mixes_with_ingredient(args.ingredient):
+                    print(f"  {mean:.2f} Sterne ({count}x): {signature}")
+            else:
+                print(f"{db.count()} Bewertungen, beste Zutaten:")
+                for name, mean in db.top_ingredients(10):
+                    print(f"  {name:<25} {mean:.2f} Sterne")
+    else:
+        for size, insert_s, timings in run_benchmark(args.sizes):
+            print(f"\n{size} Bewertungen (Einfügen: {insert_s:.1f} s)")
+            for name, ms in timings.items():
+                print(f"  {name:<24} {ms:8.3f} ms")
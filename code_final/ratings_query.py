@@ -0,0 +1,197 @@
+"""
+Abfragen und Statistiken über den Ratings-Log (siehe ratings_store.py).
+
+  - 'query_ratings' liest den Log zeilenweise und filtert nach Zeitraum,
+    Bewertung und enthaltener Zutat, mit Seitenaufteilung (offset/limit).
+  - 'RatingStats' führt laufende Aggregate (Anzahl, Mittelwert, Histogramm)
+    gesamt, pro Zutat und pro Mix. Die Aggregate werden zusammen mit der
+    gelesenen Byte-Position des Logs in 'cocktail_ratings_stats.json'
+    gespeichert. Beim nächsten Aufruf werden nur neu angehängte Zeilen gelesen,
+    Übersichten kosten daher keinen kompletten Durchlauf mehr.
+"""
+
+import json
+import os
+from datetime import date, datetime
+from itertools import islice
+
+from atomic_file import atomic_write
+from ratings_store import LEGACY_RATINGS_FILE, RATINGS_LOG, iter_ratings, migrate_legacy
+
+
+RATINGS_STATS_FILE = "code_final/cocktail_ratings_stats.json"
+
+
+def _iso(value):
+    if isinstance(value, (datetime, date)):
+        return value.isoformat()
+    return value
+
+
+def matches(entry, start=None, end=None, min_rating=None, max_rating=None, ingredient=None):
+    """
+    Prüft, ob eine Bewertung alle angegebenen Filter erfüllt.
+    start/end: datetime, date oder ISO-String (end ist exklusiv).
+    """
+    timestamp = entry.get("timestamp", "")
+    if start is not None and timestamp < _iso(start):
+        return False
+    if end is not None and timestamp >= _iso(end):
+        return False
+    if min_rating is not None and entry["rating"] < min_rating:
+        return False
+    if max_rating is not None and entry["rating"] > max_rating:
+        return False
+    if ingredient is not None and ingredient not in entry["cocktail_mix"]:
+        return False
+    return True
+
+
+def query_ratings(offset=0, limit=None, log_path=RATINGS_LOG, **filters):
+    """
+    Liefert die passenden Bewertungen als Generator (Streaming).
+    Filter siehe 'matches', z.B. query_ratings(min_rating=4, ingredient="Gin", limit=10).
+    """
+    entries = (entry for entry in iter_ratings(log_path) if matches(entry, **filters))
+    stop = None if limit is None else offset + limit
+    return islice(entries, offset, stop)
+
+
+def ratings_page(page, page_size=10, log_path=RATINGS_LOG, **filters):
+    """
+    Seite 'page' (ab 1) der passenden Bewertungen als Liste.
+    """
+    return list(query_ratings(offset=(page - 1) * page_size, limit=page_size, log_path=log_path, **filters))
+
+
+def mix_key(cocktail_mix):
+    """
+    Schlüssel eines Mixes unabhängig von Mengen und Reihenfolge der Zutaten.
+    """
+    return " + ".join(sorted(cocktail_mix))
+
+
+def _new_aggregate():
+    # [Anzahl, Summe, Histogramm der Sterne 1..5]
+    return [0, 0, [0, 0, 0, 0, 0]]
+
+
+def _add(aggregate, rating):
+    aggregate[0] += 1
+    aggregate[1] += rating
+    aggregate[2][rating - 1] += 1
+
+
+def _summary(aggregate):
+    count, total, histogram = aggregate
+    return {
+        "count": count,
+        "mean": total / count if count else None,
+        "histogram": dict(zip(range(1, 6), histogram)),
+    }
+
+
+class RatingStats:
+    def __init__(self, log_path=RATINGS_LOG, stats_path=RATINGS_STATS_FILE):
+        self.log_path = log_path
+        self.stats_path = stats_path
+        self._reset()
+
+    def _reset(self):
+        self.offset = 0
+        self.log_id = None
+        self.total = _new_aggregate()
+        self.by_ingredient = {}
+        self.by_mix = {}
+
+    @classmethod
+    def load(cls, log_path=RATINGS_LOG, stats_path=RATINGS_STATS_FILE):
+        """
+        Lädt die gespeicherten Aggregate und liest nur die seitdem angehängten Zeilen nach.
+        """
+        stats = cls(log_path, stats_path)
+        if os.path.exists(stats_path):
+            with open(stats_path, "r", encoding="utf-8") as f:
+                snapshot = json.load(f)
+            stats.offset = snapshot["offset"]
+            stats.log_id = snapshot["log_id"]
+            stats.total = snapshot["total"]
+            stats.by_ingredient = snapshot["by_ingredient"]
+            stats.by_mix = snapshot["by_mix"]
+        if stats.refresh():
+            stats.save()
+        return stats
+
+    def add(self, entry):
+        """
+        Nimmt eine einzelne Bewertung in die Aggregate auf (O(Anzahl Zutaten)).
+        Der Eintrag wird vollständig geprüft, bevor ein Aggregat verändert wird:
+        KeyError bei fehlenden Feldern, ValueError bei ungültigen Werten.
+        """
+        rating, cocktail_mix = entry["rating"], entry["cocktail_mix"]
+        if isinstance(rating, bool) or not isinstance(rating, int) or not 1 <= rating <= 5:
+            raise ValueError(f"Ungültige Bewertung: {rating!r}")
+        if not isinstance(cocktail_mix, dict):
+            raise ValueError("'cocktail_mix' muss ein Objekt {Zutat: ml} sein.")
+
+        _add(self.total, rating)
+        for ingredient in cocktail_mix:
+            _add(self.by_ingredient.setdefault(ingredient, _new_aggregate()), rating)
+        _add(self.by_mix.setdefault(mix_key(cocktail_mix), _new_aggregate()), rating)
+
+    def refresh(self):
+        """
+        Liest neue Zeilen ab der gespeicherten Byte-Position. Wurde der Log ersetzt
+        (z.B. durch 'compact') oder ist er kürzer geworden, wird neu aufgebaut.
+        Rückgabe: True, falls sich die Aggregate geändert haben.
+        """
+        if not os.path.exists(self.log_path):
+            migrate_legacy(self.log_path, LEGACY_RATINGS_FILE)
+        st = os.stat(self.log_path)
+        log_id = [st.st_dev, st.st_ino]
+        if log_id != self.log_id or st.st_size < self.offset:
+            self._reset()
+            self.log_id = log_id
+        if st.st_size == self.offset:
+            return False
+
+        with open(self.log_path, "rb") as f:
+            f.seek(self.offset)
+            for line in f:
+                if not line.endswith(b"\n"):
+                    # Zeile wird gerade noch geschrieben
+                    break
+                self.offset += len(line)
+                try:
+                    self.add(json.loads(line))
+                except (KeyError, TypeError, ValueError):
+                    # ungültige JSON-Zeile (JSONDecodeError ist ein ValueError) oder Bewertung
+                    continue
+        return True
+
+    def save(self):
+        snapshot = {
+            "offset": self.offset,
+            "log_id": self.log_id,
+            "total": self.total,
+            "by_ingredient": self.by_ingredient,
+            "by_mix": self.by_mix,
+        }
+        with atomic_write(self.stats_path, "w") as f:
+            json.dump(snapshot, f, ensure_ascii=False)
+
+    def summary(self):
+        return _summary(self.total)
+
+    def ingredient_summary(self, ingredient):
+        return _summary(self.by_ingredient.get(ingredient, _new_aggregate()))
+
+    def mix_summary(self, cocktail_mix):
+        return _summary(self.by_mix.get(mix_key(cocktail_mix), _new_aggregate()))
+
+    def top_ingredients(self, n=5, min_count=1):
+        """
+        Die n Zutaten mit der besten Durchschnittsbewertung.
+        """
+        rated = [(name, agg[1] / agg[0]) for name, agg in self.by_ingredient.items() if agg[0] >= min_count]
+        return sorted(rated, key=lambda x: -x[1])[:n]
@@ -0,0 +1,146 @@
+"""
+Append-only Speicher für Cocktail-Bewertungen (JSON-Lines).
+
+Bisher wurde für jede Bewertung die komplette Datei 'cocktail_ratings.json'
+gelesen und neu geschrieben. Hier steht jede Bewertung in einer eigenen Zeile
+von 'cocktail_ratings.jsonl':
+  - Neue Bewertungen werden nur angehängt (eine Zeile, ein write-Aufruf).
+  - Eine Sperrdatei ('.lock') schützt vor gleichzeitigen Schreibern aus
+    mehreren Prozessen.
+  - Beim ersten Zugriff werden vorhandene Bewertungen aus dem alten
+    JSON-Format einmalig übernommen.
+  - Lesen erfolgt zeilenweise (Streaming), die Datei wird nie komplett geladen.
+
+Kommandozeile (aus dem Projektordner):
+    python code_final/ratings_store.py migrate   # altes Format übernehmen
+    python code_final/ratings_store.py compact   # defekte Zeilen entfernen
+"""
+
+import json
+import os
+import sys
+from contextlib import contextmanager
+
+from atomic_file import atomic_write
+
+try:
+    import fcntl
+except ImportError:  # Windows
+    fcntl = None
+    import msvcrt
+
+
+RATINGS_LOG = "code_final/cocktail_ratings.jsonl"
+LEGACY_RATINGS_FILE = "code_final/cocktail_ratings.json"
+
+
+@contextmanager
+def locked(log_path, exclusive=True):
+    """
+    Sperrt den Ratings-Log über eine separate Sperrdatei. Die Sperrdatei bleibt
+    bestehen, auch wenn der Log beim Komprimieren ersetzt wird.
+    """
+    with open(log_path + ".lock", "a+b") as lock_file:
+        if fcntl is not None:
+            fcntl.flock(lock_file, fcntl.LOCK_EX if exclusive else fcntl.LOCK_SH)
+        else:
+            lock_file.seek(0)
+            msvcrt.locking(lock_file.fileno(), msvcrt.LK_LOCK, 1)
+        try:
+            yield
+        finally:
+            if fcntl is not None:
+                fcntl.flock(lock_file, fcntl.LOCK_UN)
+            else:
+                lock_file.seek(0)
+                msvcrt.locking(lock_file.fileno(), msvcrt.LK_UNLCK, 1)
+
+
+def _encode(entry):
+    return json.dumps(entry, ensure_ascii=False, separators=(",", ":")) + "\n"
+
+
+def _write_atomic(path, entries):
+    with atomic_write(path, "w", fsync=True) as f:
+        for entry in entries:
+            f.write(_encode(entry))
+
+
+def migrate_legacy(log_path=RATINGS_LOG, legacy_path=LEGACY_RATINGS_FILE):
+    """
+    Übernimmt einmalig die Bewertungen aus dem alten Format {"ratings": [...]}.
+    Passiert nur, solange noch kein Log existiert. Die alte Datei bleibt unverändert.
+    Rückgabe: Anzahl übernommener Bewertungen.
+    """
+    with locked(log_path):
+        if os.path.exists(log_path):
+            return 0
+        entries = []
+        if os.path.exists(legacy_path):
+            with open(legacy_path, "r", encoding="utf-8") as f:
+                entries = json.load(f).get("ratings", [])
+        _write_atomic(log_path, entries)
+    return len(entries)
+
+
+def append_rating(entry, log_path=RATINGS_LOG, legacy_path=LEGACY_RATINGS_FILE):
+    """
+    Hängt eine Bewertung als neue Zeile an den Log an.
+    """
+    if not os.path.exists(log_path):
+        migrate_legacy(log_path, legacy_path)
+    line = _encode(entry).encode("utf-8")
+    with locked(log_path):
+        # O_APPEND: jede Zeile landet vollständig am Dateiende
+        fd = os.open(log_path, os.O_WRONLY | os.O_APPEND | os.O_CREAT, 0o644)
+        try:
+            os.write(fd, line)
+        finally:
+            os.close(fd)
+
+
+def iter_ratings(log_path=RATINGS_LOG, legacy_path=LEGACY_RATINGS_FILE):
+    """
+    Liefert die gespeicherten Bewertungen nacheinander (Generator).
+    Unvollständige oder defekte Zeilen (z.B. nach einem Absturz) werden übersprungen.
+    """
+    if not os.path.exists(log_path):
+        migrate_legacy(log_path, legacy_path)
+    with open(log_path, "r", encoding="utf-8") as f:
+        for line in f:
+            if not line.endswith("\n"):
+                # Zeile wird gerade noch geschrieben
+                break
+            try:
+                yield json.loads(line)
+            except json.JSONDecodeError:
+                continue
+
+
+def compact(log_path=RATINGS_LOG):
+    """
+    Schreibt den Log neu und entfernt dabei leere und defekte Zeilen.
+    Rückgabe: (Anzahl behaltener, Anzahl entfernter Zeilen)
+    """
+    with locked(log_path):
+        kept, dropped = [], 0
+        if os.path.exists(log_path):
+            with open(log_path, "r", encoding="utf-8") as f:
+                for line in f:
+                    try:
+                        kept.append(json.loads(line))
+                    except json.JSONDecodeError:
+                        dropped += 1
+        _write_atomic(log_path, kept)
+    return len(kept), dropped
+
+
+if __name__ == "__main__":
+    command = sys.argv[1] if len(sys.argv) > 1 else ""
+    if command == "migrate":
+        print(f"{migrate_legacy()} Bewertungen übernommen.")
+    elif command == "compact":
+        kept, dropped = compact()
+        print(f"{kept} Bewertungen behalten, {dropped} defekte Zeilen entfernt.")
+    else:
+        print("Aufruf: python code_final/ratings_store.py [migrate|compact]")
@@ -0,0 +1,334 @@
+"""
+Kompakte Datensätze für Zutaten und Bewertungen.
+
+Zutaten stehen in der JSON-Datei als verschachtelte dicts, Bewertungen als
+dicts mit einer Liste von Python-floats (Profil) und einem dict {Zutat: ml}.
+Bei Millionen Bewertungen kostet das pro Bewertung fast ein Kilobyte und jeder
+Durchlauf (z.B. Durchschnitt pro Zutat) erzeugt unzählige Python-Objekte.
+
+  - 'Ingredient' und 'Rating' sind Datensätze mit __slots__ (kein __dict__ pro Objekt)
+  - 'RatingArrays' speichert alle Bewertungen spaltenweise:
+        profiles        float32 (N, F)   Nutzerprofil (NaN, falls unbekannt)
+        ingredient_ids  int16/int32 (N, K)  Index in 'names', -1 = leer
+        volumes         float32 (N, K)   Menge in ml
+        ratings         uint8 (N,)
+        timestamps      int64 (N,)       Sekunden seit 1970 (NO_TIMESTAMP = unbekannt)
+    Auswertungen laufen vektorisiert über die Spalten (np.bincount).
+
+Lader gibt es für den Ratings-Log (cocktail_ratings.jsonl, inkl. altem Format)
+und für Conrads 'cocktail_rezepte_db.json'.
+
+Aufruf (aus dem Projektordner):
+    python code_final/records.py bench --n 100000   # Speicher pro Bewertung vorher/nachher
+    python code_final/records.py stats              # Durchschnitt pro Zutat aus dem Ratings-Log
+"""
+
+import argparse
+import ast
+import json
+import time
+import tracemalloc
+from dataclasses import dataclass
+from datetime import datetime, timezone
+
+import numpy as np
+
+from atomic_file import atomic_write
+from ratings_store import RATINGS_LOG, iter_ratings
+
+
+NO_TIMESTAMP = -1
+
+
+@dataclass
+class Ingredient:
+    __slots__ = ("name", "taste", "alcoholic")
+    name: str
+    taste: tuple
+    alcoholic: bool
+
+
+@dataclass
+class Rating:
+    __slots__ = ("timestamp", "user_profile", "ingredient_ids", "volumes", "rating")
+    timestamp: int
+    user_profile: tuple
+    ingredient_ids: tuple
+    volumes: tuple
+    rating: int
+
+
+def load_ingredients(json_path="code_final/cocktail_data_quest.json"):
+    """
+    Zutaten der JSON-Datei als Liste von 'Ingredient' (in JSON-Reihenfolge).
+    """
+    with open(json_path, "r", encoding="utf-8") as f:
+        ingredients = json.load(f)["ingredients"]
+    return [Ingredient(name, tuple(info["taste"]), bool(info["alcoholic"])) for name, info in ingredients.items()]
+
+
+def parse_timestamp(text):
+    """
+    ISO-Zeitstempel (ohne Zeitzone, wie im Ratings-Log) -> Sekunden seit 1970.
+    """
+    if not text:
+        return NO_TIMESTAMP
+    return int(datetime.fromisoformat(text).replace(tzinfo=timezone.utc).timestamp())
+
+
+def format_timestamp(seconds):
+    if seconds == NO_TIMESTAMP:
+        return None
+    return datetime.fromtimestamp(int(seconds), timezone.utc).replace(tzinfo=None).isoformat()
+
+
+class RatingArrays:
+    def __init__(self, names, profiles, ingredient_ids, volumes, ratings, timestamps):
+        self.names = list(names)
+        self.profiles = profiles
+        self.ingredient_ids = ingredient_ids
+        self.volumes = volumes
+        self.ratings = ratings
+        self.timestamps = timestamps
+
+    @classmethod
+    def from_entries(cls, entries, names=None, n_features=5, chunk_size=65536):
+        """
+        Baut die Spalten aus Bewertungen im Format des Ratings-Logs auf ("cocktail_mix",
+        "rating", optional "user_profile" und "timestamp"). 'entries' wird nur einmal
+        durchlaufen (Generator möglich); unbekannte Zutaten werden an 'names' angehängt.
+        """
+        names = list(names or [])
+        index = {name: i for i, name in enumerate(names)}
+        chunks = []
+        rows = []
+
+        def flush():
+            n = len(rows)
+            width = max((len(row[1]) for row in rows), default=0)
+            profiles = np.full((n, n_features), np.nan, dtype=np.float32)
+            ids = np.full((n, width), -1, dtype=np.int32)
+            volumes = np.zeros((n, width), dtype=np.float32)
+            for r, (profile, mix, _, _) in enumerate(rows):
+                if profile is not None:
+                    profiles[r] = profile
+                ids[r, :len(mix)] = [i for i, _ in mix]
+                volumes[r, :len(mix)] = [ml for _, ml in mix]
+            ratings = np.array([row[2] for row in rows], dtype=np.uint8)
+            timestamps = np.array([row[3] for row in rows], dtype=np.int64)
+            chunks.append((profiles, ids, volumes, ratings, timestamps))
+            rows.clear()
+
+        for entry in entries:
+            mix = []
+            for name, ml in entry["cocktail_mix"].items():
+                i = index.get(name)
+                if i is None:
+                    i = index[name] = len(names)
+                    names.append(name)
+                mix.append((i, ml))
+            rows.append((entry.get("user_profile"), mix, entry["rating"], parse_timestamp(entry.get("timestamp"))))
+            if len(rows) == chunk_size:
+                flush()
+        if rows or not chunks:
+            flush()
+
+        width = max(chunk[1].shape[1] for chunk in chunks)
+        id_dtype = np.int16 if len(names) < np.iinfo(np.int16).max else np.int32
+
+        def padded(array, fill, dtype):
+            out = np.full((len(array), width), fill, dtype=dtype)
+            out[:, :array.shape[1]] = array
+            return out
+
+        return cls(
+            names,
+            np.concatenate([c[0] for c in chunks]),
+            np.concatenate([padded(c[1], -1, id_dtype) for c in chunks]),
+            np.concatenate([padded(c[2], 0.0, np.float32) for c in chunks]),
+            np.concatenate([c[3] for c in chunks]),
+            np.concatenate([c[4] for c in chunks]),
+        )
+
+    @classmethod
+    def from_ratings_log(cls, log_path=RATINGS_LOG, names=None):
+        return cls.from_entries(iter_ratings(log_path), names)
+
+    @classmethod
+    def from_rezepte_db(cls, path="code_final/cocktail_rezepte_db.json", names=None):
+        """
+        Conrads Format: {str(tuple(cocktail.items())): [Bewertungen]}, ohne Profil und Zeitpunkt.
+        """
+        with open(path, "r", encoding="utf-8") as f:
+            rezepte = json.load(f)
+        entries = (
+            {"cocktail_mix": dict(ast.literal_eval(key)), "rating": rating}
+            for key, ratings in rezepte.items()
+            for rating in ratings
+        )
+        return cls.from_entries(entries, names)
+
+    def __len__(self):
+        return len(self.ratings)
+
+    def __getitem__(self, i):
+        used = self.ingredient_ids[i] >= 0
+        return Rating(
+            int(self.timestamps[i]),
+            tuple(self.profiles[i].tolist()),
+            tuple(self.ingredient_ids[i][used].tolist()),
+            tuple(self.volumes[i][used].tolist()),
+            int(self.ratings[i]),
+        )
+
+    def mix(self, i):
+        """
+        Mischung der i-ten Bewertung als dict {Zutat: ml}.
+        """
+        return {
+            self.names[j]: round(float(ml), 2)
+            for j, ml in zip(self.ingredient_ids[i], self.volumes[i])
+            if j >= 0
+        }
+
+    def entry(self, i):
+        """
+        i-te Bewertung im Format des Ratings-Logs.
+        """
+        return {
+            "timestamp": format_timestamp(self.timestamps[i]),
+            "user_profile": self.profiles[i].astype(float).tolist(),
+            "cocktail_mix": self.mix(i),
+            "rating": int(self.ratings[i]),
+        }
+
+    @property
+    def nbytes(self):
+        return sum(a.nbytes for a in (self.profiles, self.ingredient_ids, self.volumes, self.ratings, self.timestamps))
+
+    def summary(self):
+        """
+        Anzahl, Mittelwert und Histogramm (Sterne 1..5) aller Bewertungen.
+        """
+        histogram = np.bincount(self.ratings, minlength=6)[1:6]
+        count = len(self)
+        return {
+            "count": count,
+            "mean": float(self.ratings.mean()) if count else None,
+            "histogram": dict(zip(range(1, 6), histogram.tolist())),
+        }
+
+    def ingredient_summary(self):
+        """
+        Anzahl und Mittelwert der Bewertungen pro Zutat: dict {Zutat: (Anzahl, Mittelwert)}.
+        """
+        used = self.ingredient_ids >= 0
+        ids = self.ingredient_ids[used]
+        ratings = np.broadcast_to(self.ratings[:, None], used.shape)[used]
+        counts = np.bincount(ids, minlength=len(self.names))
+        sums = np.bincount(ids, weights=ratings, minlength=len(self.names))
+        return {
+            name: (int(c), s / c)
+            for name, c, s in zip(self.names, counts.tolist(), sums.tolist())
+            if c
+        }
+
+    def save(self, path):
+        with atomic_write(path) as f:
+            np.savez(
+                f,
+                names=np.array(self.names),
+                profiles=self.profiles,
+                ingredient_ids=self.ingredient_ids,
+                volumes=self.volumes,
+                ratings=self.ratings,
+                timestamps=self.timestamps,
+            )
+
+    @classmethod
+    def load(cls, path):
+        with np.load(path) as f:
+            return cls(f["names"].tolist(), f["profiles"], f["ingredient_ids"], f["volumes"], f["ratings"], f["timestamps"])
+
+
+def _synthetic_lines(n, names, seed=0):
+    rng = np.random.default_rng(seed)
+    lines = []
+    for _ in range(n):
+        chosen = rng.choice(len(names), rng.integers(3, 6), replace=False)
+        entry = {
+            "timestamp": datetime(2025, 1, 1, 12, 0, int(rng.integers(0, 60))).isoformat(),
+            "user_profile": rng.random(5).tolist(),
+            "cocktail_mix": {names[i]: round(float(ml), 2) for i, ml in zip(chosen, rng.uniform(10, 80, len(chosen)))},
+            "rating": int(rng.integers(1, 6)),
+        }
+        lines.append(json.dumps(entry, ensure_ascii=False))
+    return lines
+
+
+def _traced(build):
+    # Speicher, den das Ergebnis von build() nach dem Aufbau noch belegt
+    tracemalloc.start()
+    result = build()
+    size = tracemalloc.get_traced_memory()[0]
+    tracemalloc.stop()
+    return result, size
+
+
+def _ingredient_means_dicts(entries):
+    # Auswertung wie bisher: ein Durchlauf über die dicts
+    totals = {}
+    for entry in entries:
+        for name in entry["cocktail_mix"]:
+            total = totals.setdefault(name, [0, 0])
+            total[0] += 1
+            total[1] += entry["rating"]
+    return {name: (count, s / count) for name, (count, s) in totals.items()}
+
+
+def run_benchmark(n):
+    """
+    Speicher pro Bewertung und Dauer einer Auswertung pro Zutat für n synthetische
+    Bewertungen: dicts (wie aus dem Log gelesen), Datensätze mit __slots__, Spalten.
+    """
+    names = [ingredient.name for ingredient in load_ingredients()]
+    lines = _synthetic_lines(n, names)
+
+    entries, dict_bytes = _traced(lambda: [json.loads(line) for line in lines])
+    arrays, array_bytes = _traced(lambda: RatingArrays.from_entries(entries, names))
+    records, record_bytes = _traced(lambda: [arrays[i] for i in range(len(arrays))])
+    del records
+
+    start = time.perf_counter()
+    expected = _ingredient_means_dicts(entries)
+    dict_s = time.perf_counter() - start
+    start = time.perf_counter()
+    result = arrays.ingredient_summary()
+    array_s = time.perf_counter() - start
+    assert all(result[name][0] == count and abs(result[name][1] - mean) < 1e-9 for name, (count, mean) in expected.items())
+
+    return [
+        ("dicts (JSON)", dict_bytes / n, dict_s),
+        ("Rating (__slots__)", record_bytes / n, None),
+        ("RatingArrays", array_bytes / n, array_s),
+    ]
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Kompakte Datensätze für Bewertungen")
+    parser.add_argument("command", choices=["bench", "stats"])
+    parser.add_argument("--n", type=int, default=100000, help="Anzahl synthetischer Bewertungen")
+    args = parser.parse_args()
+
+    if args.command == "bench":
+        print(f"{args.n} Bewertungen")
+        print(f"{'Darstellung':<20} {'Bytes/Bewertung':>16} {'Mittel pro Zutat':>17}")
+        for name, bytes_per_rating, seconds in run_benchmark(args.n):
+            timing = f"{seconds * 1000:>14.1f} ms" if seconds is not None else f"{'-':>17}"
+            print(f"{name:<20} {bytes_per_rating:>16.1f} {timing}")
+    else:
+        arrays = RatingArrays.from_ratings_log()
+        summary = arrays.summary()
+        print(f"{summary['count']} Bewertungen, Durchschnitt {summary['mean']}, {arrays.nbytes} Bytes")
+        for name, (count, mean) in sorted(arrays.ingredient_summary().items(), key=lambda x: -x[1][1]):
+            print(f"  {name:<25} {mean:.2f} Sterne ({count}x)")
@@ -0,0 +1,115 @@
+"""
+Ergebnis-Cache für Vorschläge, geschlüsselt über das quantisierte Nutzerprofil.
+
+Viele Gäste landen bei fast identischen gemittelten Profilen. Statt für jeden
+'predict' und Mischung neu zu berechnen, wird das Profil auf ein Raster der
+Schrittweite 'step' gerundet; Schlüssel ist (Rasterpunkt, k, alkoholisch,
+Katalogversion). Berechnet wird bei einem Fehltreffer für den Rasterpunkt
+selbst ('quantize' liefert ihn mit), damit das Ergebnis nicht davon abhängt,
+welcher Gast zuerst kam.
+
+Einträge werden verdrängt, wenn
+  - mehr als 'max_entries' Einträge oder mehr als 'max_bytes' (geschätzt) im
+    Speicher liegen (LRU: der am längsten nicht benutzte Eintrag zuerst)
+  - sie älter als 'ttl' Sekunden sind (optional)
+
+Alle Methoden sind durch ein Lock geschützt, der Cache kann also von mehreren
+Threads gemeinsam benutzt werden. Ein Treffer kostet wenige Mikrosekunden.
+"""
+
+import sys
+import threading
+import time
+from collections import OrderedDict
+
+import numpy as np
+
+
+def mix_size(mix):
+    """
+    Geschätzter Speicherbedarf einer Mischung {Zutat: ml} in Bytes.
+    """
+    return sys.getsizeof(mix) + sum(sys.getsizeof(name) + sys.getsizeof(ml) for name, ml in mix.items())
+
+
+class ResultCache:
+    def __init__(self, step=0.02, max_entries=10000, max_bytes=16 * 1024 * 1024, ttl=None, size_fn=mix_size):
+        self.step = step
+        self.max_entries = max_entries
+        self.max_bytes = max_bytes
+        self.ttl = ttl
+        self.size_fn = size_fn
+        self._entries = OrderedDict()  # Schlüssel -> (Ergebnis, Ablaufzeit, Bytes)
+        self._bytes = 0
+        self._lock = threading.Lock()
+
+        # Statistik
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.expirations = 0
+
+    def quantize(self, profile, k, alcoholic, version):
+        """
+        Rückgabe: (Schlüssel, Rasterpunkt als np.array), der Rasterpunkt ist das
+        Profil, für das bei einem Fehltreffer gerechnet werden sollte.
+        """
+        cell = np.rint(np.asarray(profile, dtype=float) / self.step).astype(np.int32)
+        return (cell.tobytes(), int(k), bool(alcoholic), version), cell * self.step
+
+    def get(self, key):
+        """
+        Liefert das gespeicherte Ergebnis oder None. Das Ergebnis wird geteilt
+        und darf nicht verändert werden.
+        """
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                self.misses += 1
+                return None
+            if entry[1] is not None and entry[1] < time.monotonic():
+                self._remove(key)
+                self.expirations += 1
+                self.misses += 1
+                return None
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return entry[0]
+
+    def put(self, key, result):
+        size = self.size_fn(result) + sys.getsizeof(key[0])
+        expires = time.monotonic() + self.ttl if self.ttl is not None else None
+        with self._lock:
+            if key in self._entries:
+                self._remove(key)
+            self._entries[key] = (result, expires, size)
+            self._bytes += size
+            while self._entries and (len(self._entries) > self.max_entries
+                                     or (self.max_bytes is not None and self._bytes > self.max_bytes)):
+                self._remove(next(iter(self._entries)))
+                self.evictions += 1
+
+    def _remove(self, key):
+        _, _, size = self._entries.pop(key)
+        self._bytes -= size
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+            self._bytes = 0
+
+    def __len__(self):
+        return len(self._entries)
+
+    def stats(self):
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                "entries": len(self._entries),
+                "bytes": self._bytes,
+                "hits": self.hits,
+                "misses": self.misses,
+                "hit_rate": self.hits / lookups if lookups else 0.0,
+                "evictions": self.evictions,
+                "expirations": self.expirations,
+            }
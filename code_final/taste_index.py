@@ -0,0 +1,216 @@
+"""
+Nächste-Nachbarn-Index im Geschmacksraum (süß, sauer, bitter, fruchtig, würzig).
+
+Für "ähnliche Zutat"- oder Ersatz-Abfragen wurde bisher über alle Zutaten per
+np.argmin gesucht. 'TasteIndex' bietet dafür:
+  - k-nächste Nachbarn und Radius-Abfragen, einzeln oder für viele Punkte
+  - Filter nach dem 'alcoholic'-Flag der Zutaten
+  - einen KD-Baum für große Kataloge und eine vektorisierte Brute-Force-Suche
+    für kleine Kataloge (bis etwa 20.000 Zutaten ist Brute Force schneller als der Baum)
+
+Die Punkte liegen im Baum blattweise zusammenhängend im Speicher, sodass ein
+Blatt mit einer einzigen NumPy-Operation durchsucht wird.
+"""
+
+import heapq
+
+import numpy as np
+
+
+def _brute_knn(points, queries, k, chunk_entries=4_000_000):
+    """
+    Vektorisierte Brute-Force-Suche. Rückgabe: (Distanzen, Indizes) shape=(N, k).
+    """
+    n = points.shape[0]
+    k = min(k, n)
+    point_sq = np.einsum("ij,ij->i", points, points)
+    chunk = max(1, chunk_entries // max(n, 1))
+    all_dist = np.empty((queries.shape[0], k))
+    all_idx = np.empty((queries.shape[0], k), dtype=np.int64)
+    for start in range(0, queries.shape[0], chunk):
+        q = queries[start:start + chunk]
+        d2 = np.einsum("ij,ij->i", q, q)[:, None] + point_sq[None, :] - 2.0 * (q @ points.T)
+        np.maximum(d2, 0.0, out=d2)
+        if k == 1:
+            # wie np.argmin: bei gleichen Distanzen gewinnt die erste Zutat
+            idx = np.argmin(d2, axis=1)[:, None]
+        elif k < n:
+            idx = np.argpartition(d2, k - 1, axis=1)[:, :k]
+        else:
+            idx = np.broadcast_to(np.arange(n), (q.shape[0], n)).copy()
+        part = np.take_along_axis(d2, idx, axis=1)
+        order = np.argsort(part, axis=1)
+        all_idx[start:start + chunk] = np.take_along_axis(idx, order, axis=1)
+        all_dist[start:start + chunk] = np.sqrt(np.take_along_axis(part, order, axis=1))
+    return all_dist, all_idx
+
+
+class _KDTree:
+    """
+    Einfacher KD-Baum über Arrays (Knoten als Listen von Indizes statt Objekten).
+    """
+
+    def __init__(self, points, leaf_size=256):
+        self.leaf_size = leaf_size
+        self.points = np.array(points, dtype=float)
+        self.perm = np.arange(len(points))
+        self.start, self.end, self.left, self.right = [], [], [], []
+        self.lo, self.hi = [], []
+        self._build(0, len(points))
+        self.lo = np.array(self.lo)
+        self.hi = np.array(self.hi)
+
+    def _build(self, start, end):
+        node = len(self.start)
+        pts = self.points[start:end]
+        lo, hi = pts.min(axis=0), pts.max(axis=0)
+        self.start.append(start)
+        self.end.append(end)
+        self.lo.append(lo)
+        self.hi.append(hi)
+        self.left.append(-1)
+        self.right.append(-1)
+        if end - start > self.leaf_size:
+            dim = int(np.argmax(hi - lo))
+            mid = (start + end) // 2
+            order = np.argpartition(pts[:, dim], mid - start)
+            self.points[start:end] = pts[order]
+            self.perm[start:end] = self.perm[start:end][order]
+            self.left[node] = self._build(start, mid)
+            self.right[node] = self._build(mid, end)
+        return node
+
+    def _box_dist2(self, q, node):
+        d = np.maximum(self.lo[node] - q, 0.0) + np.maximum(q - self.hi[node], 0.0)
+        return float(d @ d)
+
+    def knn(self, q, k):
+        best_d2 = np.full(k, np.inf)
+        best_idx = np.full(k, -1, dtype=np.int64)
+        heap = [(0.0, 0)]
+        while heap:
+            box_d2, node = heapq.heappop(heap)
+            if box_d2 > best_d2[-1]:
+                break
+            if self.left[node] < 0:
+                s, e = self.start[node], self.end[node]
+                diff = self.points[s:e] - q
+                d2 = np.einsum("ij,ij->i", diff, diff)
+                cand_d2 = np.concatenate([best_d2, d2])
+                cand_idx = np.concatenate([best_idx, self.perm[s:e]])
+                order = np.argsort(cand_d2, kind="stable")[:k]
+                best_d2, best_idx = cand_d2[order], cand_idx[order]
+            else:
+                for child in (self.left[node], self.right[node]):
+                    child_d2 = self._box_dist2(q, child)
+                    if child_d2 <= best_d2[-1]:
+                        heapq.heappush(heap, (child_d2, child))
+        return np.sqrt(best_d2), best_idx
+
+    def radius(self, q, r):
+        r2 = r * r
+        found = []
+        stack = [0]
+        while stack:
+            node = stack.pop()
+            if self._box_dist2(q, node) > r2:
+                continue
+            if self.left[node] < 0:
+                s, e = self.start[node], self.end[node]
+                diff = self.points[s:e] - q
+                d2 = np.einsum("ij,ij->i", diff, diff)
+                found.append(self.perm[s:e][d2 <= r2])
+            else:
+                stack.append(self.left[node])
+                stack.append(self.right[node])
+        return np.concatenate(found) if found else np.zeros(0, dtype=np.int64)
+
+
+class TasteIndex:
+    def __init__(self, profiles, names=None, alcoholic=None, leaf_size=256, brute_force_below=20000):
+        """
+        profiles: np.array shape=(M, 5); names/alcoholic optional (Listen der Länge M).
+        Unterhalb von 'brute_force_below' Zutaten wird kein Baum gebaut.
+        """
+        self.profiles = np.asarray(profiles, dtype=float)
+        self.names = list(names) if names is not None else None
+        self.alcoholic = np.asarray(alcoholic, dtype=bool) if alcoholic is not None else None
+        self.leaf_size = leaf_size
+        self.brute_force_below = brute_force_below
+        # Teilindizes je Filter (None = alle, True/False = alkoholisch ja/nein)
+        self._subsets = {}
+
+    @classmethod
+    def from_catalog(cls, data, **kwargs):
+        """
+        Index über alle Zutaten aus 'cocktail_data_quest.json'.
+        """
+        ingredients = data["ingredients"]
+        names = list(ingredients)
+        profiles = [ingredients[name]["taste"] for name in names]
+        alcoholic = [ingredients[name]["alcoholic"] for name in names]
+        return cls(profiles, names, alcoholic, **kwargs)
+
+    def _subset(self, alcoholic):
+        # Liefert (Punkte, Abbildung auf Originalindizes, Baum oder None)
+        if alcoholic not in self._subsets:
+            if alcoholic is None:
+                mapping = np.arange(len(self.profiles))
+            else:
+                if self.alcoholic is None:
+                    raise ValueError("Der Index wurde ohne 'alcoholic'-Flags erstellt.")
+                mapping = np.flatnonzero(self.alcoholic == alcoholic)
+            points = self.profiles[mapping]
+            tree = _KDTree(points, self.leaf_size) if len(points) >= self.brute_force_below else None
+            self._subsets[alcoholic] = (points, mapping, tree)
+        return self._subsets[alcoholic]
+
+    def query(self, profiles, k=1, alcoholic=None):
+        """
+        k nächste Zutaten für ein Profil shape=(5,) oder viele Profile shape=(N, 5).
+        Rückgabe: (Distanzen, Indizes) mit shape=(k,) bzw. shape=(N, k),
+        aufsteigend nach Distanz sortiert.
+        """
+        queries = np.atleast_2d(np.asarray(profiles, dtype=float))
+        points, mapping, tree = self._subset(alcoholic)
+        k = min(k, len(points))
+        if k == 0:
+            dist, idx = np.zeros((len(queries), 0)), np.zeros((len(queries), 0), dtype=np.int64)
+        elif tree is None:
+            dist, idx = _brute_knn(points, queries, k)
+        else:
+            results = [tree.knn(q, k) for q in queries]
+            dist = np.array([r[0] for r in results])
+            idx = np.array([r[1] for r in results])
+        idx = mapping[idx]
+        if np.ndim(profiles) == 1:
+            return dist[0], idx[0]
+        return dist, idx
+
+    def query_radius(self, profiles, radius, alcoholic=None):
+        """
+        Alle Zutaten im Abstand <= radius. Rückgabe: Array der Indizes (unsortiert)
+        bzw. eine Liste solcher Arrays für mehrere Profile.
+        """
+        queries = np.atleast_2d(np.asarray(profiles, dtype=float))
+        points, mapping, tree = self._subset(alcoholic)
+        if tree is None:
+            results = []
+            for start in range(0, len(queries), 256):
+                q = queries[start:start + 256]
+                d2 = ((q[:, None, :] - points[None, :, :]) ** 2).sum(axis=2)
+                results.extend(mapping[np.flatnonzero(row <= radius * radius)] for row in d2)
+        else:
+            results = [mapping[tree.radius(q, radius)] for q in queries]
+        if np.ndim(profiles) == 1:
+            return results[0]
+        return results
+
+    def similar(self, name, k=3, alcoholic=None):
+        """
+        Die k ähnlichsten Zutaten zu einer Zutat aus dem Katalog (ohne sie selbst).
+        Rückgabe: Liste von (Name, Distanz).
+        """
+        i = self.names.index(name)
+        dist, idx = self.query(self.profiles[i], k + 1, alcoholic=alcoholic)
+        return [(self.names[j], float(d)) for d, j in zip(dist, idx) if j != i][:k]
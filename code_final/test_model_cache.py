@@ -0,0 +1,75 @@
+"""
+Tests für den Autoencoder-Cache (aus dem Projektordner ausführen):
+    python -m pytest code_final/test_model_cache.py
+
+Das Training wird durch ein leeres Modell ersetzt, geprüft wird nur, wann der
+Cache trifft und wann neu trainiert wird.
+"""
+
+import os
+import shutil
+
+import pytest
+
+import cocktail_code
+from catalog_compiler import compile_catalog
+from model_cache import ModelCache
+from numpy_autoencoder import NumpyAutoencoder
+
+
+@pytest.fixture
+def catalog(tmp_path, monkeypatch):
+    json_path = str(tmp_path / "cocktail_data_quest.json")
+    shutil.copy(cocktail_code.DATA_PATH, json_path)
+    cache_dir = str(tmp_path / "model_cache")
+    trained = []
+
+    def train_many(profile_groups, latent_dim=3, epochs=None, batch_size=None):
+        trained.extend(len(p) for p in profile_groups)
+        return [NumpyAutoencoder.zeros(p.shape[1], latent_dim) for p in profile_groups]
+
+    def fine_tune(model, profiles, epochs=None):
+        trained.append(len(profiles))
+        return NumpyAutoencoder.zeros(model.input_dim, model.latent_dim)
+
+    monkeypatch.setattr(cocktail_code, "ENCODER", "autoencoder")
+    monkeypatch.setattr(cocktail_code, "MODEL_CACHE", ModelCache(cache_dir, json_path))
+    monkeypatch.setattr(cocktail_code, "train_numpy_autoencoders", train_many)
+    monkeypatch.setattr(cocktail_code, "_train_traced", lambda p, *args: train_many([p], *args)[0])
+    monkeypatch.setattr(cocktail_code, "fine_tune_autoencoder", fine_tune)
+    monkeypatch.setattr(cocktail_code, "compile_catalog", lambda path: compile_catalog(path, str(tmp_path / "catalog.bin")))
+
+    data = cocktail_code.load_cocktail_data(json_path)
+    groups = cocktail_code.load_ingredient_groups(data)
+    cocktail_code.warm_up(groups)
+    return json_path, cache_dir, data, groups, trained
+
+
+def test_other_group_hits_cache_after_extension(catalog):
+    json_path, cache_dir, data, groups, trained = catalog
+    assert len(trained) == 2
+    alcoholic_profiles = groups[True][1]
+
+    cocktail_code.extend_catalog(data, groups, {"Testsirup": {"taste": [0.9, 0.1, 0.0, 0.5, 0.1], "alcoholic": False}}, json_path)
+    # Nur die erweiterte (nicht-alkoholische) Gruppe wurde nachtrainiert
+    assert trained[2:] == [len(groups[False][1])]
+
+    # Auch ein neuer Prozess lädt das alkoholische Modell von der Festplatte
+    cache = ModelCache(cache_dir, json_path)
+    cocktail_code.MODEL_CACHE = cache
+    cocktail_code.get_autoencoders([groups[True][1], groups[False][1]])
+    assert (cache.disk_hits, cache.misses) == (2, 0)
+    assert len(trained) == 3
+    assert cache.fingerprint(alcoholic_profiles, 3, cocktail_code.MAX_EPOCHS, None) in cocktail_code._model_keys(groups)
+
+
+def test_prune_removes_only_stale_entries(catalog):
+    json_path, cache_dir, data, groups, trained = catalog
+    before = set(os.listdir(cache_dir))
+    assert len(before) == 2
+
+    cocktail_code.extend_catalog(data, groups, {"Testlikör": {"taste": [0.7, 0.1, 0.3, 0.2, 0.4], "alcoholic": True}}, json_path)
+    after = set(os.listdir(cache_dir))
+    assert after == {f"{key}.npz" for key in cocktail_code._model_keys(groups)}
+    # Die Datei der nicht betroffenen Gruppe ist dieselbe geblieben
+    assert len(before & after) == 1
@@ -0,0 +1,55 @@
+"""
+Vergleich der NumPy-Inferenz mit Keras (aus dem Projektordner ausführen):
+    python -m pytest code_final/test_numpy_autoencoder.py
+
+Ohne installiertes TensorFlow werden die Tests übersprungen.
+"""
+
+import numpy as np
+import pytest
+
+tf = pytest.importorskip("tensorflow")
+
+import cocktail_code  # noqa: E402
+from numpy_autoencoder import NumpyAutoencoder, export_autoencoder, max_prediction_error  # noqa: E402
+
+
+TOLERANCE = 1e-5
+
+
+@pytest.fixture(scope="module")
+def groups():
+    return cocktail_code.load_ingredient_groups(cocktail_code.load_cocktail_data())
+
+
+@pytest.fixture(scope="module")
+def inputs():
+    # Zutatenprofile und zufällige Nutzerprofile im Bereich [0, 1]
+    return np.random.default_rng(0).random((64, 5)).astype(np.float32)
+
+
+@pytest.mark.parametrize("alcoholic", [False, True])
+def test_prediction_matches_keras(groups, inputs, alcoholic, tmp_path):
+    profiles = groups[alcoholic][1]
+    keras_model = cocktail_code.build_and_train_autoencoder(profiles, epochs=50)
+    numpy_model = export_autoencoder(keras_model, str(tmp_path / "model.npz"))
+
+    assert max_prediction_error(keras_model, numpy_model, profiles) < TOLERANCE
+    assert max_prediction_error(keras_model, numpy_model, inputs) < TOLERANCE
+    assert max_prediction_error(keras_model, NumpyAutoencoder.from_npz(str(tmp_path / "model.npz")), inputs) < TOLERANCE
+
+
+def test_fine_tune_matches_keras(groups, inputs):
+    profiles = groups[False][1]
+    model = cocktail_code.train_numpy_autoencoder(profiles[:-5], epochs=50)
+    tuned = cocktail_code.fine_tune_autoencoder(model, profiles, epochs=20)
+
+    # Das weitertrainierte Modell rechnet wie ein Keras-Modell mit denselben Gewichten
+    keras_model = cocktail_code.build_autoencoder(tuned.input_dim, tuned.latent_dim)
+    keras_model.set_weights(tuned.get_weights())
+    assert max_prediction_error(keras_model, tuned, profiles) < TOLERANCE
+    assert max_prediction_error(keras_model, tuned, inputs) < TOLERANCE
+
+    # und beginnt bei den bisherigen Gewichten statt bei einer neuen Initialisierung
+    start_loss = float(np.mean((model.predict(profiles) - profiles) ** 2))
+    assert tuned.final_loss <= start_loss + 1e-6
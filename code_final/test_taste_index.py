@@ -0,0 +1,63 @@
+"""
+Vergleich des Geschmacks-Index mit einer direkten Suche über alle Zutaten
+(aus dem Projektordner ausführen):
+    python -m pytest code_final/test_taste_index.py
+"""
+
+import numpy as np
+import pytest
+
+from taste_index import TasteIndex
+
+
+def brute_force(profiles, queries, k):
+    # Referenz: alle quadrierten Abstände, stabil sortiert (wie np.argmin in Flo/mix.py)
+    d2 = np.sum(np.square(profiles[None, :, :] - queries[:, None, :]), axis=2)
+    idx = np.argsort(d2, axis=1, kind="stable")[:, :k]
+    return np.sqrt(np.take_along_axis(d2, idx, axis=1)), idx
+
+
+@pytest.fixture(scope="module")
+def catalog():
+    rng = np.random.default_rng(0)
+    profiles = rng.random((3000, 5))
+    alcoholic = rng.random(3000) < 0.3
+    queries = rng.random((200, 5))
+    return profiles, alcoholic, queries
+
+
+@pytest.mark.parametrize("brute_force_below", [20000, 100])
+@pytest.mark.parametrize("k", [1, 5])
+def test_knn_matches_brute_force(catalog, brute_force_below, k):
+    profiles, alcoholic, queries = catalog
+    index = TasteIndex(profiles, alcoholic=alcoholic, leaf_size=32, brute_force_below=brute_force_below)
+
+    dist, idx = index.query(queries, k)
+    expected_dist, expected_idx = brute_force(profiles, queries, k)
+    np.testing.assert_allclose(dist, expected_dist, atol=1e-9)
+    np.testing.assert_array_equal(idx, expected_idx)
+
+    # Nur alkoholische Zutaten
+    mapping = np.flatnonzero(alcoholic)
+    dist, idx = index.query(queries, k, alcoholic=True)
+    expected_dist, expected_idx = brute_force(profiles[mapping], queries, k)
+    np.testing.assert_allclose(dist, expected_dist, atol=1e-9)
+    np.testing.assert_array_equal(idx, mapping[expected_idx])
+
+
+@pytest.mark.parametrize("brute_force_below", [20000, 100])
+def test_radius_matches_brute_force(catalog, brute_force_below):
+    profiles, alcoholic, queries = catalog
+    index = TasteIndex(profiles, leaf_size=32, brute_force_below=brute_force_below)
+    d2 = np.sum(np.square(profiles[None, :, :] - queries[:, None, :]), axis=2)
+    for found, row in zip(index.query_radius(queries, 0.2), d2):
+        np.testing.assert_array_equal(np.sort(found), np.flatnonzero(row <= 0.2 ** 2))
+
+
+def test_nearest_ingredient_like_argmin():
+    # Zutaten mit gleichem Profil (wie Martini und Kaffee in Flo/mix.py): die erste gewinnt
+    profiles = np.array([[0.8, 0.1, 0.2, 0.1, 0.6], [0.1, 0.1, 0.9, 0.1, 0.1], [0.1, 0.1, 0.9, 0.1, 0.1]])
+    index = TasteIndex(profiles, ["Rum", "Martini", "Kaffee"])
+    for query in np.random.default_rng(1).random((100, 5)):
+        _, idx = index.query(query, k=1)
+        assert idx[0] == np.argmin(np.sum(np.square(profiles - query), axis=1))
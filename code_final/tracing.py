@@ -0,0 +1,187 @@
+"""
+Leichtgewichtiges Tracing der Pipeline-Stufen (Training, Inferenz, Mischung, Ratings-I/O).
+
+Erfasst werden:
+  - Zeitmessungen pro Stufe (Anzahl, Summe, Maximum)
+  - Zähler (z.B. tatsächlich gelaufene Trainings-Epochen)
+  - Beobachtungen (z.B. Residuum der Mischung: Anzahl, Summe, Minimum, Maximum)
+  - Messwerte, die erst beim Export abgefragt werden (z.B. Cache-Treffer)
+  - optional pro Anfrage ein cProfile-Profil und die tracemalloc-Spitze
+
+Ist das Tracing ausgeschaltet (Standard), liefert 'span' einen gemeinsamen
+Null-Kontext und 'count'/'observe' kehren sofort zurück.
+
+Einschalten über Umgebungsvariablen:
+    COCKTAIL_TRACE=code_final/cocktail_trace.prom   Export beim Beenden (.prom = Prometheus-Text, sonst JSON)
+    COCKTAIL_TRACE_PROFILE=code_final/profiles      zusätzlich cProfile + tracemalloc pro Anfrage
+"""
+
+import contextlib
+import cProfile
+import json
+import os
+import re
+import threading
+import time
+import tracemalloc
+
+from atomic_file import atomic_write
+
+_NULL_SPAN = contextlib.nullcontext()
+
+
+class Tracer:
+    def __init__(self, enabled=False, export_path=None, profile_dir=None):
+        self.enabled = enabled
+        self.export_path = export_path
+        self.profile_dir = profile_dir
+        self.timers = {}        # Name -> [Anzahl, Summe s, Maximum s]
+        self.counters = {}      # Name -> Wert
+        self.observations = {}  # Name -> [Anzahl, Summe, Minimum, Maximum]
+        self.gauges = {}        # Name -> Funktion ohne Argumente
+        self._requests = 0
+        self._lock = threading.Lock()
+
+    @classmethod
+    def from_env(cls):
+        export_path = os.environ.get("COCKTAIL_TRACE")
+        profile_dir = os.environ.get("COCKTAIL_TRACE_PROFILE")
+        return cls(bool(export_path or profile_dir), export_path, profile_dir)
+
+    def span(self, name):
+        """
+        Kontextmanager, der die Laufzeit des Blocks unter 'name' erfasst.
+        """
+        if not self.enabled:
+            return _NULL_SPAN
+        return self._timed(name)
+
+    @contextlib.contextmanager
+    def _timed(self, name):
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self._add_time(name, time.perf_counter() - start)
+
+    def _add_time(self, name, seconds):
+        with self._lock:
+            entry = self.timers.setdefault(name, [0, 0.0, 0.0])
+            entry[0] += 1
+            entry[1] += seconds
+            entry[2] = max(entry[2], seconds)
+
+    def count(self, name, n=1):
+        if not self.enabled:
+            return
+        with self._lock:
+            self.counters[name] = self.counters.get(name, 0) + n
+
+    def observe(self, name, value):
+        if not self.enabled:
+            return
+        value = float(value)
+        with self._lock:
+            entry = self.observations.get(name)
+            if entry is None:
+                self.observations[name] = [1, value, value, value]
+            else:
+                entry[0] += 1
+                entry[1] += value
+                entry[2] = min(entry[2], value)
+                entry[3] = max(entry[3], value)
+
+    def gauge(self, name, fn):
+        """
+        Registriert einen Messwert, der erst beim Export über fn() abgefragt wird.
+        """
+        self.gauges[name] = fn
+
+    def request(self, name):
+        """
+        Wie 'span' für eine ganze Anfrage. Mit 'profile_dir' wird zusätzlich ein
+        cProfile-Profil (.prof) gespeichert und die Speicherspitze erfasst.
+        """
+        if not self.enabled:
+            return _NULL_SPAN
+        if not self.profile_dir:
+            return self._timed(name)
+        return self._profiled(name)
+
+    @contextlib.contextmanager
+    def _profiled(self, name):
+        with self._lock:
+            self._requests += 1
+            number = self._requests
+        profiler = cProfile.Profile()
+        tracing_memory = not tracemalloc.is_tracing()
+        if tracing_memory:
+            tracemalloc.start()
+        tracemalloc.reset_peak()
+        start = time.perf_counter()
+        profiler.enable()
+        try:
+            yield
+        finally:
+            profiler.disable()
+            self._add_time(name, time.perf_counter() - start)
+            self.observe(f"{name}_peak_bytes", tracemalloc.get_traced_memory()[1])
+            if tracing_memory:
+                tracemalloc.stop()
+            os.makedirs(self.profile_dir, exist_ok=True)
+            profiler.dump_stats(os.path.join(self.profile_dir, f"{name}_{os.getpid()}_{number}.prof"))
+
+    def snapshot(self):
+        with self._lock:
+            return {
+                "timers": {name: {"count": c, "seconds": s, "max_seconds": m} for name, (c, s, m) in self.timers.items()},
+                "counters": dict(self.counters),
+                "observations": {
+                    name: {"count": c, "sum": s, "min": lo, "max": hi}
+                    for name, (c, s, lo, hi) in self.observations.items()
+                },
+                "gauges": {name: fn() for name, fn in self.gauges.items()},
+            }
+
+    def prometheus_text(self, prefix="cocktail"):
+        """
+        Alle Werte im Textformat von Prometheus.
+        """
+        def metric(name):
+            return f"{prefix}_{re.sub(r'[^a-zA-Z0-9_]', '_', name)}"
+
+        snap = self.snapshot()
+        lines = []
+        for name, t in snap["timers"].items():
+            m = metric(name) + "_seconds"
+            lines += [f"# TYPE {m} summary", f"{m}_count {t['count']}", f"{m}_sum {t['seconds']:.9f}",
+                      f"# TYPE {m}_max gauge", f"{m}_max {t['max_seconds']:.9f}"]
+        for name, value in snap["counters"].items():
+            m = metric(name) + "_total"
+            lines += [f"# TYPE {m} counter", f"{m} {value}"]
+        for name, o in snap["observations"].items():
+            m = metric(name)
+            lines += [f"# TYPE {m} summary", f"{m}_count {o['count']}", f"{m}_sum {o['sum']:.9g}",
+                      f"# TYPE {m}_min gauge", f"{m}_min {o['min']:.9g}",
+                      f"# TYPE {m}_max gauge", f"{m}_max {o['max']:.9g}"]
+        for name, value in snap["gauges"].items():
+            m = metric(name)
+            lines += [f"# TYPE {m} gauge", f"{m} {value}"]
+        return "\n".join(lines) + "\n"
+
+    def export(self, path=None):
+        """
+        Schreibt alle Werte in eine Datei (.prom = Prometheus-Text, sonst JSON).
+        """
+        path = path or self.export_path
+        if not path:
+            return
+        if path.endswith(".prom"):
+            content = self.prometheus_text()
+        else:
+            content = json.dumps(self.snapshot(), indent=2)
+        with atomic_write(path, "w") as f:
+            f.write(content)
+
+
+TRACER = Tracer.from_env()